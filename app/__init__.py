@@ -1,21 +1,54 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from config import Config, TestConfig
+from config import Config, TestConfig, config_by_name
 import os
 from datetime import datetime
 
 db = SQLAlchemy()
 
-def create_app(testing=False):
+def create_app(testing=False, config_name=None, database_uri=None):
     app = Flask(__name__)
 
+    # La configuración se elige con APP_CONFIG (development, production, testing)
     if testing:
         app.config.from_object(TestConfig)
     else:
-        app.config.from_object(Config)
+        config_name = config_name or os.environ.get('APP_CONFIG', 'development')
+        app.config.from_object(config_by_name.get(config_name, Config))
+
+    # Permite apuntar a otra base de datos (p. ej. flask seed --database)
+    if database_uri:
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+
+    if app.config['PROXY_FIX_X_FOR']:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+
+    if app.config.get('LOG_LEVEL'):
+        app.logger.setLevel(app.config['LOG_LEVEL'])
 
     db.init_app(app)
 
+    # Primero, para que la latencia medida cubra los demás hooks del request
+    from app.metrics import init_metrics
+    init_metrics(app)
+
+    from app.sql_monitor import init_sql_monitor
+    with app.app_context():
+        init_sql_monitor(app, db.engine)
+
+    from app.current_user import init_current_user
+    init_current_user(app)
+
+    from app.password_hasher import init_password_hasher
+    init_password_hasher(app)
+
+    from app.login_throttle import init_login_throttle
+    init_login_throttle(app)
+
+    from app.fragment_cache import init_fragment_cache
+    init_fragment_cache(app)
+
     from app.auth.routes import auth_bp
     from app.tasks.routes import tasks_bp
 
@@ -25,6 +58,12 @@ def create_app(testing=False):
     from app.main_routes import main_bp
     app.register_blueprint(main_bp)
 
+    from app.api.routes import api_bp
+    app.register_blueprint(api_bp, url_prefix='/api/v1')
+
+    from app.commands import register_commands
+    register_commands(app)
+
     # Agregar función now al contexto de Jinja2
     @app.context_processor
     def inject_now():
@@ -33,8 +72,27 @@ def create_app(testing=False):
     with app.app_context():
         if not os.path.exists('instance'):
             os.makedirs('instance')
+
+        from app.database import configure_sqlite_pragmas
+        configure_sqlite_pragmas(app, db.engine)
+
         db.create_all()
 
+        # create_all no añade índices a tablas existentes; crear los que falten
+        from app.models import Task, User
+        for index in Task.__table__.indexes | User.__table__.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+        # Índice de búsqueda de texto completo (FTS5) si el motor lo soporta
+        from app.services.search_service import SearchService
+        SearchService.setup()
+
+        # Poblar los contadores si la tabla task_stats es nueva y ya hay tareas
+        from app.models import TaskStat
+        from app.services.task_stats_service import TaskStatsService
+        if TaskStat.query.first() is None and Task.query.first() is not None:
+            TaskStatsService.rebuild()
+
         # Crear usuario admin por defecto si no existe
         from app.models import User
         from werkzeug.security import generate_password_hash
@@ -44,7 +102,7 @@ def create_app(testing=False):
             admin_user = User(
                 name='Administrator',
                 email='admin@example.com',
-                password_hash=generate_password_hash('admin123'),
+                password_hash=generate_password_hash('admin123', method=app.config['PASSWORD_HASH_METHOD']),
                 role='admin'
             )
             db.session.add(admin_user)
@@ -0,0 +1 @@
+# API package
\ No newline at end of file
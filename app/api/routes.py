@@ -0,0 +1,281 @@
+import io
+from datetime import date
+from flask import Blueprint, request, jsonify, g, current_app
+from app.api.serializers import TASK_FIELDS, parse_fields, project_task_query, serialize_task_row
+from app.fragment_cache import get_fragment_cache
+from app.login_throttle import get_login_throttle
+from app.services.import_service import ImportService
+from app.services.search_service import SearchService
+from app.services.task_service import TaskService
+from app.services.user_service import UserService
+from app.sql_monitor import query_budget
+from app.tasks.routes import get_filters_from_request, get_per_page_from_request
+from app.models import User, Task
+from app import db
+
+api_bp = Blueprint('api', __name__)
+
+PRIORITIES = ('low', 'medium', 'high')
+
+
+def error_response(message, status_code, errors=None):
+    """Respuesta JSON de error con el formato del resto de endpoints"""
+    payload = {'success': False, 'message': message}
+    if errors:
+        payload['errors'] = errors
+    return jsonify(payload), status_code
+
+
+@api_bp.before_request
+def before_request():
+    """Verificar autenticación antes de cada request"""
+    if g.user is None:
+        return error_response('Autenticación requerida', 401)
+
+
+@api_bp.errorhandler(404)
+def not_found(error):
+    return error_response('Tarea no encontrada', 404)
+
+
+def get_fields():
+    """Campos pedidos con ?fields=; ValueError si alguno no existe"""
+    return parse_fields(request.args.get('fields'))
+
+
+def get_task_row(user, task_id, fields):
+    """Obtiene una tarea visible para el usuario como fila de columnas"""
+    query = TaskService._build_user_tasks_query(user, eager=False).filter(Task.id == task_id)
+    return project_task_query(query, fields).first()
+
+
+def parse_task_payload(data, user, task=None):
+    """Valida el JSON de alta o edición de una tarea
+
+    En una edición los campos ausentes conservan su valor actual. Devuelve
+    (valores, errores).
+    """
+    errors = []
+    values = {
+        'title': data.get('title', task.title if task else None),
+        'description': data.get('description', task.description if task else None),
+        'priority': data.get('priority', task.priority if task else 'medium'),
+        'due_date': task.due_date if task else None,
+        'assigned_to': None,
+    }
+
+    if not isinstance(values['title'], (str, type(None))):
+        errors.append('El título debe ser un texto')
+    if not isinstance(values['description'], (str, type(None))):
+        errors.append('La descripción debe ser un texto')
+
+    if values['priority'] not in PRIORITIES:
+        errors.append('La prioridad debe ser low, medium o high')
+
+    if 'due_date' in data:
+        try:
+            values['due_date'] = date.fromisoformat(data['due_date']) if data['due_date'] else None
+        except (TypeError, ValueError):
+            errors.append('La fecha límite debe tener formato AAAA-MM-DD')
+
+    # Sólo un administrador puede asignar tareas a otros usuarios
+    if user.can_assign_tasks() and data.get('assigned_to') is not None:
+        try:
+            assignee = db.session.get(User, int(data['assigned_to']))
+        except (TypeError, ValueError):
+            assignee = None
+        if assignee:
+            values['assigned_to'] = assignee.id
+        else:
+            errors.append('El usuario asignado no existe')
+    elif task is None:
+        values['assigned_to'] = user.id
+
+    if not errors:
+        is_valid, validation_errors = TaskService.validate_task_data(
+            title=values['title'],
+            due_date=values['due_date'] if 'due_date' in data else None
+        )
+        errors.extend(validation_errors)
+
+    return values, errors
+
+
+@api_bp.route('/tasks', methods=['GET'])
+@query_budget(2)
+def list_tasks():
+    user = g.user
+    try:
+        fields = get_fields()
+    except ValueError as e:
+        return error_response(f'Campos desconocidos: {e}', 400)
+
+    filters = get_filters_from_request()
+    per_page = get_per_page_from_request()
+
+    ranked = SearchService.is_ranked(filters)
+    query = project_task_query(TaskService._build_user_tasks_query(user, filters, eager=False), fields)
+    if ranked:
+        query = query.add_columns(SearchService.rank_column().label('search_rank'))
+
+    page = TaskService.paginate_query(query, ranked, request.args.get('cursor'), per_page)
+    today = date.today()
+
+    return jsonify({
+        'success': True,
+        'tasks': [serialize_task_row(row, fields, today) for row in page['items']],
+        'next_cursor': page['next_cursor'],
+        'prev_cursor': page['prev_cursor'],
+        'per_page': per_page
+    })
+
+
+@api_bp.route('/tasks/import', methods=['POST'])
+def import_tasks():
+    """Importa tareas desde el cuerpo del request (text/csv o application/x-ndjson)
+
+    El cuerpo se lee en streaming; las líneas inválidas (también las que no
+    son UTF-8) se devuelven en el informe sin detener la importación.
+    """
+    user = g.user
+    mimetype = request.mimetype
+    if mimetype not in ('text/csv', 'application/x-ndjson'):
+        return error_response('Content-Type debe ser text/csv o application/x-ndjson', 415)
+
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8-sig', errors='replace', newline='')
+    records = ImportService.iter_csv(stream) if mimetype == 'text/csv' else ImportService.iter_ndjson(stream)
+    report = ImportService.import_records(
+        user, records,
+        chunk_size=current_app.config['TASKS_IMPORT_CHUNK_SIZE'],
+        max_errors=current_app.config['TASKS_IMPORT_MAX_ERRORS']
+    )
+    return jsonify({'success': True, **report})
+
+
+@api_bp.route('/tasks/<int:task_id>', methods=['GET'])
+@query_budget(2)
+def get_task(task_id):
+    user = g.user
+    try:
+        fields = get_fields()
+    except ValueError as e:
+        return error_response(f'Campos desconocidos: {e}', 400)
+
+    row = get_task_row(user, task_id, fields)
+    if row is None:
+        return error_response('Tarea no encontrada', 404)
+
+    return jsonify({'success': True, 'task': serialize_task_row(row, fields)})
+
+
+@api_bp.route('/tasks', methods=['POST'])
+def create_task():
+    user = g.user
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return error_response('Se esperaba un objeto JSON', 400)
+
+    values, errors = parse_task_payload(data, user)
+    if errors:
+        return error_response('Datos de tarea inválidos', 400, errors)
+
+    task, error = TaskService.create_task(created_by=user.id, **values)
+    if not task:
+        return error_response(error, 500)
+
+    fields = list(TASK_FIELDS)
+    return jsonify({'success': True, 'task': serialize_task_row(get_task_row(user, task.id, fields), fields)}), 201
+
+
+@api_bp.route('/tasks/<int:task_id>', methods=['PUT', 'PATCH'])
+def update_task(task_id):
+    user = g.user
+    task = TaskService.get_task_by_id(task_id, user)
+    if not task:
+        return error_response('Tarea no encontrada', 404)
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return error_response('Se esperaba un objeto JSON', 400)
+
+    values, errors = parse_task_payload(data, user, task)
+    if errors:
+        return error_response('Datos de tarea inválidos', 400, errors)
+
+    success, message = TaskService.update_task(task=task, **values)
+    if not success:
+        return error_response(message, 500)
+
+    fields = list(TASK_FIELDS)
+    return jsonify({'success': True, 'message': message,
+                    'task': serialize_task_row(get_task_row(user, task_id, fields), fields)})
+
+
+@api_bp.route('/tasks/<int:task_id>/toggle', methods=['POST'])
+def toggle_task(task_id):
+    user = g.user
+    new_status, error = TaskService.toggle_task_status_by_id(task_id, user)
+    if error:
+        return error_response(error, 500)
+    if new_status is None:
+        return error_response('Tarea no encontrada', 404)
+
+    return jsonify({'success': True, 'message': f"Tarea marcada como {new_status}", 'new_status': new_status})
+
+
+@api_bp.route('/tasks/<int:task_id>', methods=['DELETE'])
+def delete_task(task_id):
+    user = g.user
+    task = TaskService.get_task_by_id(task_id, user)
+    if not task:
+        return error_response('Tarea no encontrada', 404)
+
+    # Solo el creador o admin pueden eliminar
+    if task.created_by != user.id and user.role != 'admin':
+        return error_response('No tienes permisos para eliminar esta tarea', 403)
+
+    success, message = TaskService.delete_task(task)
+    if not success:
+        return error_response(message, 500)
+
+    return jsonify({'success': True, 'message': message})
+
+
+@api_bp.route('/users', methods=['GET'])
+def search_users():
+    """Búsqueda por prefijo de nombre para el selector de usuario asignado"""
+    user = g.user
+    if not user.can_assign_tasks():
+        return error_response('No tienes permisos para listar usuarios', 403)
+
+    limit = current_app.config['ASSIGNEE_SEARCH_LIMIT']
+    limit_param = request.args.get('limit')
+    if limit_param and limit_param.isdigit() and int(limit_param) > 0:
+        limit = min(int(limit_param), current_app.config['ASSIGNEE_SEARCH_LIMIT'])
+
+    return jsonify({
+        'success': True,
+        'users': UserService.search_assignees(request.args.get('q'), limit)
+    })
+
+
+@api_bp.route('/login-throttle', methods=['GET'])
+def login_throttle_stats():
+    """Contadores del limitador de intentos de login de este proceso"""
+    if not g.user.can_assign_tasks():
+        return error_response('No tienes permisos para ver estas estadísticas', 403)
+
+    throttle = get_login_throttle()
+    return jsonify({'success': True, 'enabled': throttle is not None,
+                    'stats': throttle.stats() if throttle else {}})
+
+
+@api_bp.route('/fragment-cache', methods=['GET'])
+def fragment_cache_stats():
+    """Tamaño y ratio de aciertos por tipo de la caché de fragmentos de este proceso"""
+    if not g.user.can_assign_tasks():
+        return error_response('No tienes permisos para ver estas estadísticas', 403)
+
+    cache = get_fragment_cache()
+    return jsonify({'success': True, 'enabled': cache is not None,
+                    'stats': cache.stats() if cache else {}})
@@ -0,0 +1,84 @@
+from datetime import date, datetime
+from sqlalchemy.orm import aliased
+from app.models import Task, User
+
+TASK_FIELDS = (
+    'id', 'title', 'description', 'status', 'priority', 'due_date',
+    'created_by', 'creator_name', 'assigned_to', 'assignee_name',
+    'created_at', 'updated_at', 'is_overdue'
+)
+
+# Columnas necesarias para calcular campos derivados o paginar
+DERIVED_FIELDS = {'is_overdue': ('status', 'due_date')}
+PAGINATION_FIELDS = ('id', 'created_at')
+
+
+def parse_fields(param):
+    """Convierte el parámetro ?fields= en una lista de campos
+
+    Devuelve todos los campos si no se indica ninguno y lanza ValueError
+    con los nombres desconocidos.
+    """
+    if not param:
+        return list(TASK_FIELDS)
+    fields = [name.strip() for name in param.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in TASK_FIELDS]
+    if unknown:
+        raise ValueError(', '.join(unknown))
+    return [name for name in TASK_FIELDS if name in fields]
+
+
+def project_task_query(query, fields):
+    """Sustituye las entidades de la consulta por las columnas de los campos pedidos
+
+    Sólo se une con users si se pide el nombre del creador o del asignado.
+    """
+    creator = aliased(User)
+    assignee = aliased(User)
+    columns = {
+        'id': Task.id,
+        'title': Task.title,
+        'description': Task.description,
+        'status': Task.status,
+        'priority': Task.priority,
+        'due_date': Task.due_date,
+        'created_by': Task.created_by,
+        'creator_name': creator.name,
+        'assigned_to': Task.assigned_to,
+        'assignee_name': assignee.name,
+        'created_at': Task.created_at,
+        'updated_at': Task.updated_at,
+    }
+
+    needed = set(fields) | set(PAGINATION_FIELDS)
+    for name, dependencies in DERIVED_FIELDS.items():
+        if name in needed:
+            needed.discard(name)
+            needed.update(dependencies)
+
+    query = query.with_entities(*[
+        columns[name].label(name) for name in TASK_FIELDS if name in needed
+    ])
+    if 'creator_name' in needed:
+        query = query.outerjoin(creator, creator.id == Task.created_by)
+    if 'assignee_name' in needed:
+        query = query.outerjoin(assignee, assignee.id == Task.assigned_to)
+    return query
+
+
+def serialize_task_row(row, fields, today=None):
+    """Construye el diccionario de una tarea a partir de una fila de columnas"""
+    values = row._mapping
+    result = {}
+    for name in fields:
+        if name == 'is_overdue':
+            due_date = values['due_date']
+            result[name] = bool(
+                due_date and values['status'] == 'pending' and due_date < (today or date.today())
+            )
+            continue
+        value = values[name]
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        result[name] = value
+    return result
@@ -1,8 +1,10 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, session
+import math
+from flask import Blueprint, render_template, request, flash, redirect, url_for, session, make_response
 from app.forms import RegistrationForm, LoginForm, ProfileForm, ChangePasswordForm
 from app.services.auth_service import AuthService
+from app.login_throttle import get_login_throttle
+from app.password_hasher import PasswordHashingUnavailable
 from app.models import User
-from app import db
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -41,7 +43,21 @@ def login():
 
     form = LoginForm()
     if form.validate_on_submit():
-        user = AuthService.validate_user_credentials(form.email.data, form.password.data)
+        # Rechazar el exceso de intentos antes de calcular ningún hash
+        throttle = get_login_throttle()
+        if throttle is not None:
+            allowed, retry_after = throttle.check(request.remote_addr, form.email.data)
+            if not allowed:
+                flash('Demasiados intentos de inicio de sesión. Inténtalo de nuevo más tarde.', 'error')
+                response = make_response(render_template('auth/login.html', form=form), 429)
+                response.headers['Retry-After'] = str(math.ceil(retry_after))
+                return response
+
+        try:
+            user = AuthService.validate_user_credentials(form.email.data, form.password.data)
+        except PasswordHashingUnavailable:
+            flash('El servicio está saturado, inténtalo de nuevo en unos segundos.', 'error')
+            return render_template('auth/login.html', form=form), 503
 
         if user:
             session['user_id'] = user.id
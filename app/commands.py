@@ -0,0 +1,138 @@
+import os
+import time
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from werkzeug.security import generate_password_hash
+from app.models import User
+from app.services.import_service import ImportService
+from app.services.seed_service import SeedService, parse_mix, parse_range
+from app.services.task_stats_service import TaskStatsService
+
+
+@click.command('rebuild-task-stats')
+@click.option('--verify', 'verify_only', is_flag=True,
+              help='Solo comprobar los contadores, sin modificarlos.')
+@with_appcontext
+def rebuild_task_stats_command(verify_only):
+    """Reconstruye (o verifica) la tabla de contadores task_stats"""
+    mismatches = TaskStatsService.verify()
+
+    if verify_only:
+        for (user_id, status, priority), stored, expected in mismatches:
+            click.echo(f'user_id={user_id} {status}/{priority}: almacenado={stored} calculado={expected}')
+        if mismatches:
+            raise click.ClickException(f'{len(mismatches)} contadores no coinciden')
+        click.echo('Contadores correctos')
+        return
+
+    rows = TaskStatsService.rebuild()
+    click.echo(f'Contadores reconstruidos: {rows} filas ({len(mismatches)} corregidas)')
+
+
+@click.command('import-tasks')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--as', 'email', required=True, help='Email del usuario que figurará como creador.')
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'ndjson']),
+              help='Formato del fichero (por defecto, según la extensión).')
+@click.option('--chunk-size', type=int, default=None,
+              help='Filas por lote insertado (por defecto TASKS_IMPORT_CHUNK_SIZE).')
+@with_appcontext
+def import_tasks_command(path, email, file_format, chunk_size):
+    """Importa tareas desde un fichero CSV o NDJSON"""
+    user = User.query.filter_by(email=email).first()
+    if user is None:
+        raise click.ClickException(f'No existe ningún usuario con el email {email}')
+
+    if file_format is None:
+        file_format = 'ndjson' if os.path.splitext(path)[1].lower() in ('.ndjson', '.jsonl') else 'csv'
+
+    started = time.perf_counter()
+    with open(path, encoding='utf-8-sig', errors='replace', newline='') as stream:
+        records = ImportService.iter_csv(stream) if file_format == 'csv' else ImportService.iter_ndjson(stream)
+        report = ImportService.import_records(
+            user, records,
+            chunk_size=chunk_size or current_app.config['TASKS_IMPORT_CHUNK_SIZE'],
+            max_errors=current_app.config['TASKS_IMPORT_MAX_ERRORS']
+        )
+    elapsed = time.perf_counter() - started
+
+    for error in report['errors']:
+        click.echo(f"Línea {error['line']}: {'; '.join(error['errors'])}", err=True)
+    click.echo(f"Importadas {report['imported']} tareas en {elapsed:.1f}s ({report['failed']} con errores)")
+
+
+def _parsed(parser):
+    """Callback de click que convierte la opción con parser (ValueError -> BadParameter)"""
+    def callback(ctx, param, value):
+        try:
+            return parser(value)
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+    return callback
+
+
+@click.command('seed')
+@click.option('--users', type=click.IntRange(min=1), default=100, show_default=True,
+              help='Usuarios a generar.')
+@click.option('--tasks', type=click.IntRange(min=0), default=10000, show_default=True,
+              help='Tareas a generar.')
+@click.option('--seed', 'seed', type=int, default=42, show_default=True,
+              help='Semilla del generador; la misma semilla produce los mismos datos.')
+@click.option('--base-date', type=click.DateTime(formats=['%Y-%m-%d']),
+              help='Fecha de referencia para vencimientos y altas (por defecto, hoy).')
+@click.option('--done-ratio', type=click.FloatRange(0, 1), default=0.3, show_default=True,
+              help='Proporción de tareas completadas.')
+@click.option('--priority-mix', default='high=20,medium=50,low=30', show_default=True,
+              callback=_parsed(parse_mix), help='Pesos de cada prioridad.')
+@click.option('--due-spread', default='-30:90', show_default=True, callback=_parsed(parse_range),
+              help='Días respecto a la fecha base entre los que cae el vencimiento (mín:máx).')
+@click.option('--no-due-ratio', type=click.FloatRange(0, 1), default=0.2, show_default=True,
+              help='Proporción de tareas sin fecha límite.')
+@click.option('--description-length', default='0:400', show_default=True, callback=_parsed(parse_range),
+              help='Longitud de la descripción en caracteres (mín:máx; 0 = sin descripción).')
+@click.option('--skew', type=click.FloatRange(min=0), default=1.0, show_default=True,
+              help='Exponente de Zipf del reparto de tareas por usuario (0 = uniforme).')
+@click.option('--self-assigned-ratio', type=click.FloatRange(0, 1), default=0.6, show_default=True,
+              help='Proporción de tareas asignadas a su creador.')
+@click.option('--chunk-size', type=click.IntRange(min=1), default=10000, show_default=True,
+              help='Filas por lote insertado.')
+@click.option('--password', default='seed1234', show_default=True,
+              help='Contraseña de todos los usuarios generados.')
+@click.option('--database', type=click.Path(dir_okay=False),
+              help='Fichero SQLite destino en lugar de la base de datos configurada (se crea si no existe).')
+@with_appcontext
+def seed_command(users, tasks, seed, base_date, password, database, **distribution):
+    """Genera usuarios y tareas sintéticos para pruebas de carga"""
+    def run():
+        started = time.perf_counter()
+        # Un único hash compartido: calcularlo por usuario dominaría el tiempo de carga
+        password_hash = generate_password_hash(password, method=current_app.config['PASSWORD_HASH_METHOD'])
+        try:
+            report = SeedService.seed(
+                users, tasks, password_hash, seed=seed,
+                base_date=base_date.date() if base_date else None,
+                progress=lambda done: click.echo(f'  {done}/{tasks} tareas', err=True),
+                **distribution
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        elapsed = time.perf_counter() - started
+        click.echo(f"Generados {report['users']} usuarios y {report['tasks']} tareas en {elapsed:.1f}s "
+                   f"({report['tasks'] / elapsed if elapsed else 0:.0f} tareas/s)")
+
+    if database is None:
+        run()
+        return
+
+    from app import create_app
+    target = create_app(database_uri='sqlite:///' + os.path.abspath(database))
+    with target.app_context():
+        run()
+
+
+def register_commands(app):
+    """Registra los comandos de la CLI de flask"""
+    app.cli.add_command(rebuild_task_stats_command)
+    app.cli.add_command(import_tasks_command)
+    app.cli.add_command(seed_command)
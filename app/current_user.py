@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, g, session
+from app.models import User
+from app import db
+
+
+class UserSnapshot:
+    """Copia inmutable de los datos del usuario que necesitan las vistas
+
+    Expone la misma interfaz de autorización que User para poder usarse en
+    los servicios y formularios sin cargar la fila completa.
+    """
+    __slots__ = ('id', 'name', 'role')
+
+    def __init__(self, id, name, role):
+        object.__setattr__(self, 'id', id)
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'role', role)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('UserSnapshot es inmutable')
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.id} {self.role}>'
+
+    def can_access_task(self, task):
+        """Verifica si el usuario puede acceder a una tarea específica"""
+        return self.role == 'admin' or task.created_by == self.id or task.assigned_to == self.id
+
+    def can_assign_tasks(self):
+        """Verifica si el usuario puede asignar tareas a otros usuarios"""
+        return self.role == 'admin'
+
+
+class UserCache:
+    """Caché LRU con caducidad (TTL) de instantáneas de usuario, segura entre hilos"""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            snapshot, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return snapshot
+
+    def set(self, snapshot):
+        with self._lock:
+            self._entries[snapshot.id] = (snapshot, time.monotonic() + self.ttl)
+            self._entries.move_to_end(snapshot.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def get_user_cache():
+    """Caché de usuarios de la aplicación actual"""
+    return current_app.extensions['user_cache']
+
+
+def get_user_snapshot(user_id):
+    """Obtiene la instantánea de un usuario desde la caché o la base de datos"""
+    cache = get_user_cache()
+    snapshot = cache.get(user_id)
+    if snapshot is None:
+        row = db.session.query(User.id, User.name, User.role).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        snapshot = UserSnapshot(*row)
+        cache.set(snapshot)
+    return snapshot
+
+
+def invalidate_user(user_id):
+    """Descarta la instantánea cacheada de un usuario tras modificarlo"""
+    cache = current_app.extensions.get('user_cache')
+    if cache is not None:
+        cache.invalidate(user_id)
+
+
+def load_current_user():
+    """Resuelve una sola vez por request el usuario de la sesión en g.user"""
+    g.user = None
+    user_id = session.get('user_id')
+    if user_id is not None:
+        g.user = get_user_snapshot(user_id)
+
+
+def init_current_user(app):
+    """Registra la caché de usuarios y el hook load_current_user"""
+    app.extensions['user_cache'] = UserCache(
+        maxsize=app.config['CURRENT_USER_CACHE_SIZE'],
+        ttl=app.config['CURRENT_USER_CACHE_TTL']
+    )
+    app.before_request(load_current_user)
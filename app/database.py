@@ -0,0 +1,28 @@
+from sqlalchemy import event
+
+
+def configure_sqlite_pragmas(app, engine):
+    """Aplica SQLITE_PRAGMAS en cada conexión nueva y registra los valores efectivos"""
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    if not pragmas or engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+
+    app.logger.info('PRAGMAs SQLite efectivos: %s', get_sqlite_pragmas(engine, pragmas))
+
+
+def get_sqlite_pragmas(engine, names):
+    """Lee el valor actual de los PRAGMAs indicados en una conexión del pool"""
+    with engine.connect() as connection:
+        return {
+            name: connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+            for name in names
+        }
@@ -1,8 +1,31 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, TextAreaField, SelectField, DateField, PasswordField, SubmitField
 from wtforms.validators import DataRequired, Email, Length, EqualTo, Optional
-from wtforms.widgets import TextArea
-from app.models import User
+from wtforms.widgets import Select, html_params
+from flask import url_for
+from markupsafe import Markup
+from app.services.user_service import UserService
+
+
+class LazySelect(Select):
+    """Select que sólo incluye las opciones vacías y la seleccionada
+
+    El resto de usuarios se carga bajo demanda desde la búsqueda JSON
+    (data-typeahead-url), así el HTML no crece con el número de usuarios.
+    Las opciones completas siguen en field.choices para validar el envío.
+    """
+
+    def __call__(self, field, **kwargs):
+        kwargs.setdefault('id', field.id)
+        kwargs.setdefault('data-typeahead-url', url_for('api.search_users'))
+        if field.flags.required:
+            kwargs.setdefault('required', True)
+        html = ['<select %s>' % html_params(name=field.name, **kwargs)]
+        for value, label, selected, render_kw in field.iter_choices():
+            if selected or value in (None, ''):
+                html.append(self.render_option(value, label, selected, **render_kw))
+        html.append('</select>')
+        return Markup(''.join(html))
 
 class RegistrationForm(FlaskForm):
     name = StringField('Nombre', validators=[DataRequired(), Length(min=2, max=100)])
@@ -42,10 +65,12 @@ class TaskForm(FlaskForm):
     def __init__(self, current_user, *args, **kwargs):
         super(TaskForm, self).__init__(*args, **kwargs)
 
-        # Si es admin, puede asignar a cualquier usuario
+        # Si es admin, puede asignar a cualquier usuario (lista cacheada)
         if current_user.role == 'admin':
-            users = User.query.all()
-            self.assigned_to.choices = [(user.id, user.name) for user in users]
+            self.assigned_to.choices = UserService.get_assignee_choices()
+            self.assigned_to.widget = LazySelect()
+            if self.assigned_to.data is None and not self.is_submitted():
+                self.assigned_to.data = current_user.id
         else:
             # Usuario normal solo puede asignarse a sí mismo
             self.assigned_to.choices = [(current_user.id, current_user.name)]
@@ -69,8 +94,8 @@ class TaskFilterForm(FlaskForm):
 
         # Configurar opciones de asignado según el rol del usuario
         if current_user.role == 'admin':
-            users = User.query.all()
-            self.assigned_to.choices = [(None, 'Todos')] + [(user.id, user.name) for user in users]
+            self.assigned_to.choices = [(None, 'Todos')] + UserService.get_assignee_choices()
+            self.assigned_to.widget = LazySelect()
         else:
             # Usuario normal solo ve sus tareas
             self.assigned_to.choices = [(None, 'Mis tareas'), (current_user.id, current_user.name)]
\ No newline at end of file
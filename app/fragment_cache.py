@@ -0,0 +1,146 @@
+import threading
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from markupsafe import Markup
+
+
+class FragmentCache:
+    """Caché LRU de fragmentos HTML ya renderizados, segura entre hilos
+
+    Cada entrada pertenece a un tipo de fragmento ('task_row',
+    'dashboard_stats'...) con sus propios aciertos y fallos, y puede llevar
+    etiquetas ('task:<id>', 'user:<id>', 'admins') para invalidar de una vez
+    todas las entradas afectadas por una escritura.
+    """
+
+    def __init__(self, maxsize=5000):
+        self.maxsize = maxsize
+        self.evicted = 0
+        self.invalidated = 0
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind, key):
+        with self._lock:
+            counters = self._counters.setdefault(kind, {'hits': 0, 'misses': 0})
+            entry = self._entries.get((kind, key))
+            if entry is None:
+                counters['misses'] += 1
+                return None
+            counters['hits'] += 1
+            self._entries.move_to_end((kind, key))
+            return entry[0]
+
+    def set(self, kind, key, value, tags=()):
+        with self._lock:
+            self._discard((kind, key))
+            self._entries[(kind, key)] = (value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add((kind, key))
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+                self.evicted += 1
+
+    def invalidate(self, *tags):
+        """Elimina las entradas con alguna de las etiquetas; devuelve cuántas"""
+        with self._lock:
+            removed = 0
+            for tag in tags:
+                for entry_key in self._tags.pop(tag, ()):
+                    if self._discard(entry_key):
+                        removed += 1
+            self.invalidated += removed
+            return removed
+
+    def _discard(self, entry_key):
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return False
+        for tag in entry[1]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(entry_key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        """Tamaño, expulsiones y aciertos/fallos con su ratio por tipo de fragmento"""
+        with self._lock:
+            fragments = {}
+            for kind, counters in self._counters.items():
+                lookups = counters['hits'] + counters['misses']
+                fragments[kind] = dict(counters, hit_ratio=counters['hits'] / lookups if lookups else 0.0)
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'evicted': self.evicted,
+                'invalidated': self.invalidated,
+                'fragments': fragments,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def get_fragment_cache():
+    """Caché de fragmentos de la aplicación actual (None si está desactivada)"""
+    return current_app.extensions.get('fragment_cache')
+
+
+def render_fragment(template_name, **context):
+    """Renderiza una plantilla parcial sin context processors ni señales
+
+    El fragmento sólo puede depender de lo que recibe en context (y de los
+    globales de Jinja como url_for), que es lo que forma su clave de caché.
+    """
+    return Markup(current_app.jinja_env.get_template(template_name).render(**context))
+
+
+def cached_fragment(kind, key, render, tags=()):
+    """Devuelve el fragmento cacheado bajo (kind, key) o lo genera con render()"""
+    cache = get_fragment_cache()
+    if cache is None:
+        return render()
+    fragment = cache.get(kind, key)
+    if fragment is None:
+        fragment = render()
+        cache.set(kind, key, fragment, tags)
+    return fragment
+
+
+def dashboard_tags(user):
+    """Etiquetas del panel de estadísticas de un usuario"""
+    return ('admins',) if user.role == 'admin' else (f'user:{user.id}',)
+
+
+def invalidate_task_fragments(task_ids=(), user_ids=()):
+    """Descarta las filas de las tareas y los paneles de los usuarios afectados
+
+    Se llama desde los métodos de escritura de TaskService (y las operaciones
+    masivas) tras el commit. Los paneles de admin ven todas las tareas, así
+    que cualquier escritura los invalida.
+    """
+    if not has_app_context():
+        return
+    cache = get_fragment_cache()
+    if cache is None:
+        return
+    tags = [f'task:{task_id}' for task_id in task_ids]
+    tags.extend(f'user:{user_id}' for user_id in set(user_ids) if user_id is not None)
+    tags.append('admins')
+    cache.invalidate(*tags)
+
+
+def init_fragment_cache(app):
+    """Registra la caché de fragmentos configurada con FRAGMENT_CACHE_*"""
+    if not app.config['FRAGMENT_CACHE_ENABLED']:
+        return
+    app.extensions['fragment_cache'] = FragmentCache(maxsize=app.config['FRAGMENT_CACHE_SIZE'])
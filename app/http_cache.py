@@ -0,0 +1,33 @@
+import hashlib
+from flask import current_app, request, session
+
+
+def compute_etag(*parts):
+    """Calcula un ETag fuerte a partir de las partes que determinan la página"""
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    return digest
+
+
+def not_modified_response(etag, last_modified=None):
+    """Devuelve una respuesta 304 si If-None-Match coincide con el ETag, o None
+
+    Si hay mensajes flash pendientes siempre se renderiza, porque la
+    página cacheada por el navegador no los contiene.
+    """
+    if session.get('_flashes'):
+        return None
+    if not request.if_none_match.contains(etag):
+        return None
+
+    response = current_app.response_class(status=304)
+    return add_validators(response, etag, last_modified)
+
+
+def add_validators(response, etag, last_modified=None):
+    """Añade ETag, Last-Modified y Cache-Control a una respuesta"""
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    # El navegador puede guardar la página pero debe revalidarla siempre
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,214 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from itertools import count
+from flask import current_app
+
+
+def refill(tokens, updated_at, now, capacity, rate):
+    """Tokens disponibles tras rellenar el cubo desde updated_at hasta now"""
+    return min(capacity, tokens + (now - updated_at) * rate)
+
+
+class MemoryBucketStore:
+    """Cubos de tokens en memoria del proceso, acotados con expulsión LRU
+
+    Cada consume es O(1): un acceso al OrderedDict y, si se supera maxsize,
+    la expulsión del cubo usado hace más tiempo.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.evicted = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, now):
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = refill(tokens, updated_at, now, capacity, rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+                self.evicted += 1
+            return allowed, tokens
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteBucketStore:
+    """Cubos de tokens compartidos entre workers en un fichero SQLite
+
+    Cada consume es una transacción BEGIN IMMEDIATE sobre la clave primaria.
+    Cada sweep_every llamadas se borran los cubos sin uso durante max_idle
+    segundos (ya estarían llenos) y, si aun así quedan más de maxsize, los
+    usados hace más tiempo.
+    """
+
+    def __init__(self, path, maxsize=10000, max_idle=3600, sweep_every=1000):
+        self.path = path
+        self.maxsize = maxsize
+        self.max_idle = max_idle
+        self.sweep_every = sweep_every
+        self.evicted = 0
+        self._calls = count(1)  # next() es atómico con el GIL; consume se llama desde varios hilos
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS login_buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS idx_login_buckets_updated ON login_buckets (updated_at)'
+            )
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+    def consume(self, key, capacity, rate, now):
+        connection = self._connect()
+        try:
+            # Con varios workers compitiendo puede agotar el timeout: OperationalError llega a check
+            connection.execute('BEGIN IMMEDIATE')
+            row = connection.execute(
+                'SELECT tokens, updated_at FROM login_buckets WHERE key = ?', (key,)
+            ).fetchone()
+            tokens = refill(row[0], row[1], now, capacity, rate) if row else capacity
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            connection.execute(
+                'INSERT INTO login_buckets (key, tokens, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at',
+                (key, tokens, now)
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
+
+        if next(self._calls) % self.sweep_every == 0:
+            self.sweep(now)
+        return allowed, tokens
+
+    def sweep(self, now):
+        """Elimina los cubos llenos y limita el número total a maxsize"""
+        connection = self._connect()
+        deleted = connection.execute(
+            'DELETE FROM login_buckets WHERE updated_at < ?', (now - self.max_idle,)
+        ).rowcount
+        deleted += connection.execute(
+            'DELETE FROM login_buckets WHERE key IN ('
+            'SELECT key FROM login_buckets ORDER BY updated_at DESC LIMIT -1 OFFSET ?)',
+            (self.maxsize,)
+        ).rowcount
+        self.evicted += deleted
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM login_buckets').fetchone()[0]
+
+
+class LoginThrottle:
+    """Limita los intentos de login por IP y por email con cubos de tokens
+
+    Cada clave admite ráfagas de hasta burst intentos y recupera per_minute
+    intentos por minuto. Se consulta la IP primero: un atacante que ya agotó
+    su IP no consume los tokens del email que está probando.
+
+    El cubo estricto del email es por (email, IP), de modo que quien agota
+    los intentos contra una dirección desde su IP no bloquea a su dueño
+    cuando entra desde otra. Un segundo cubo por email, más holgado, limita
+    los intentos repartidos entre muchas IPs.
+
+    Si el almacén compartido no responde (bloqueo de SQLite más allá del
+    timeout) el intento se permite y se cuenta en store_errors: el login no
+    falla con un 500 y el pool de hashing sigue acotando el trabajo.
+    """
+
+    def __init__(self, store, ip_burst, ip_per_minute, email_burst, email_per_minute,
+                 email_global_burst=50, email_global_per_minute=20):
+        self.store = store
+        self.limits = {
+            'ip': (ip_burst, ip_per_minute / 60.0),
+            'email': (email_burst, email_per_minute / 60.0),
+            'email_global': (email_global_burst, email_global_per_minute / 60.0),
+        }
+        self.counters = {'allowed': 0, 'rejected_ip': 0, 'rejected_email': 0, 'rejected_email_global': 0,
+                         'store_errors': 0}
+        self._lock = threading.Lock()
+
+    def check(self, ip, email, now=None):
+        """Consume un intento; devuelve (permitido, segundos hasta el siguiente)"""
+        now = time.time() if now is None else now
+        email = (email or '').strip().lower()
+        for scope, value in (('ip', ip), ('email', f'{email}|{ip}'), ('email_global', email)):
+            capacity, rate = self.limits[scope]
+            try:
+                allowed, tokens = self.store.consume(f'{scope}:{value}', capacity, rate, now)
+            except sqlite3.OperationalError as e:
+                self._count('store_errors')
+                current_app.logger.warning('Límite de login no disponible, se permite el intento: %s', e)
+                return True, 0
+            if not allowed:
+                self._count(f'rejected_{scope}')
+                return False, (1 - tokens) / rate
+        self._count('allowed')
+        return True, 0
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        """Contadores para monitorización"""
+        with self._lock:
+            stats = dict(self.counters)
+        stats['evicted'] = self.store.evicted
+        stats['tracked_keys'] = len(self.store)
+        return stats
+
+
+def get_login_throttle():
+    """Limitador de login de la aplicación actual (None si está desactivado)"""
+    return current_app.extensions.get('login_throttle')
+
+
+def init_login_throttle(app):
+    """Registra el limitador configurado con LOGIN_RATE_LIMIT_*"""
+    if not app.config['LOGIN_RATE_LIMIT_ENABLED']:
+        return
+
+    max_keys = app.config['LOGIN_RATE_LIMIT_MAX_KEYS']
+    if app.config['LOGIN_RATE_LIMIT_STORAGE']:
+        # Un cubo sin uso durante el tiempo de rellenado completo ya está lleno
+        max_idle = max(
+            60.0 * app.config['LOGIN_RATE_LIMIT_IP_BURST'] / app.config['LOGIN_RATE_LIMIT_IP_PER_MINUTE'],
+            60.0 * app.config['LOGIN_RATE_LIMIT_EMAIL_BURST'] / app.config['LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE'],
+            60.0 * app.config['LOGIN_RATE_LIMIT_EMAIL_GLOBAL_BURST']
+            / app.config['LOGIN_RATE_LIMIT_EMAIL_GLOBAL_PER_MINUTE']
+        )
+        store = SQLiteBucketStore(app.config['LOGIN_RATE_LIMIT_STORAGE'], maxsize=max_keys, max_idle=max_idle)
+    else:
+        store = MemoryBucketStore(maxsize=max_keys)
+
+    app.extensions['login_throttle'] = LoginThrottle(
+        store,
+        ip_burst=app.config['LOGIN_RATE_LIMIT_IP_BURST'],
+        ip_per_minute=app.config['LOGIN_RATE_LIMIT_IP_PER_MINUTE'],
+        email_burst=app.config['LOGIN_RATE_LIMIT_EMAIL_BURST'],
+        email_per_minute=app.config['LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE'],
+        email_global_burst=app.config['LOGIN_RATE_LIMIT_EMAIL_GLOBAL_BURST'],
+        email_global_per_minute=app.config['LOGIN_RATE_LIMIT_EMAIL_GLOBAL_PER_MINUTE']
+    )
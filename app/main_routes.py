@@ -1,26 +1,46 @@
-from flask import Blueprint, render_template, redirect, url_for, session
-from app.models import User
+from flask import Blueprint, render_template, redirect, url_for, session, make_response, g
+from app.fragment_cache import cached_fragment, dashboard_tags, render_fragment
+from app.http_cache import add_validators, compute_etag, not_modified_response
+from app.read_models import request_today
 from app.services.task_service import TaskService
+from app.sql_monitor import query_budget
 
 main_bp = Blueprint('main', __name__)
 
 @main_bp.route('/')
+@query_budget(5)
 def index():
     if 'user_id' not in session:
         return redirect(url_for('auth.login'))
 
-    user = User.query.get(session['user_id'])
+    user = g.user
     if not user:
         session.clear()
         return redirect(url_for('auth.login'))
 
-    # Obtener estadísticas del dashboard
-    stats = TaskService.get_task_statistics(user)
+    # Si nada ha cambiado desde la última visita, responder 304 sin renderizar
+    count, last_modified, users_version = TaskService.get_tasks_version(user)
+    etag = compute_etag(
+        'main.index', user.id, user.role, user.name, session.get('user_name'),
+        request_today(), count, last_modified, users_version
+    )
+    not_modified = not_modified_response(etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    # Panel de estadísticas: sólo se recalcula si cambió la versión de las tareas
+    stats_panel = cached_fragment(
+        'dashboard_stats', (user.id, user.role, request_today(), count, last_modified),
+        lambda: render_fragment('_dashboard_stats.html', stats=TaskService.get_task_statistics(user)),
+        tags=dashboard_tags(user)
+    )
 
     # Obtener tareas recientes
-    recent_tasks = TaskService.get_user_tasks(user)[:5]
+    recent_tasks = TaskService.paginate_user_tasks(user, per_page=5, read_only=True)['items']
 
-    return render_template('dashboard.html', user=user, stats=stats, recent_tasks=recent_tasks)
+    response = make_response(render_template('dashboard.html', user=user, stats_panel=stats_panel,
+                                             recent_tasks=recent_tasks))
+    return add_validators(response, etag, last_modified)
 
 @main_bp.route('/dashboard')
 def dashboard():
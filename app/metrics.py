@@ -0,0 +1,238 @@
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, abort, current_app, g, request
+from app.sql_monitor import get_request_sql
+
+# Límites superiores (le) de los histogramas
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def observe(histograms, key, buckets, value):
+    """Suma value al histograma key: un contador por tramo, más la suma al final"""
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = [0] * (len(buckets) + 2)
+    histogram[bisect_left(buckets, value)] += 1
+    histogram[-1] += value
+
+
+class _Shard:
+    """Métricas acumuladas por un solo hilo; sólo ese hilo las modifica"""
+    __slots__ = ('thread', 'in_flight', 'requests', 'latency', 'db_time', 'db_queries')
+
+    def __init__(self, thread=None):
+        self.thread = thread
+        self.in_flight = 0
+        self.requests = {}
+        self.latency = {}
+        self.db_time = {}
+        self.db_queries = {}
+
+    def merge(self, other):
+        """Suma other a este shard
+
+        El hilo dueño de other puede estar añadiendo claves mientras tanto: se
+        recorre una copia (dict.copy no ejecuta código Python, así que es
+        atómica con el GIL) para no fallar con "dictionary changed size".
+        """
+        self.in_flight += other.in_flight
+        for name in ('requests', 'latency', 'db_time', 'db_queries'):
+            target = getattr(self, name)
+            for key, value in getattr(other, name).copy().items():
+                if isinstance(value, list):
+                    current = target.setdefault(key, [0] * len(value))
+                    for index, count in enumerate(value):
+                        current[index] += count
+                else:
+                    target[key] = target.get(key, 0) + value
+
+
+class RequestMetrics:
+    """Latencia, códigos de estado, peticiones en curso y SQL por endpoint
+
+    Cada hilo escribe en su propio _Shard sin bloqueos; el lock sólo se toma
+    al crear el shard de un hilo nuevo y al exportar, cuando se suman todos.
+    Los shards de hilos terminados se acumulan en uno retirado para que su
+    número no crezca con servidores que crean un hilo por petición.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _Shard()
+        self._lock = threading.Lock()
+        self.collectors = []
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                if len(self._shards) >= 64:
+                    self._retire_dead_shards()
+                self._shards.append(shard)
+        return shard
+
+    def _retire_dead_shards(self):
+        alive = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                alive.append(shard)
+            else:
+                self._retired.merge(shard)
+        self._shards = alive
+
+    def request_started(self):
+        self._shard().in_flight += 1
+
+    def request_finished(self, endpoint, method, status, duration, db_time, db_queries):
+        shard = self._shard()
+        shard.in_flight -= 1
+        key = (endpoint, method, status)
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+        observe(shard.latency, (endpoint, method), LATENCY_BUCKETS, duration)
+        observe(shard.db_time, (endpoint,), LATENCY_BUCKETS, db_time)
+        observe(shard.db_queries, (endpoint,), QUERY_COUNT_BUCKETS, db_queries)
+
+    def snapshot(self):
+        """Suma de todos los shards"""
+        with self._lock:
+            self._retire_dead_shards()
+            total = _Shard()
+            total.merge(self._retired)
+            for shard in self._shards:
+                total.merge(shard)
+            return total
+
+    def render(self):
+        """Métricas en el formato de exposición de texto de Prometheus"""
+        total = self.snapshot()
+        lines = []
+        lines += _family('http_requests_total', 'counter', 'Peticiones HTTP atendidas', [
+            ({'endpoint': endpoint, 'method': method, 'status': status}, count)
+            for (endpoint, method, status), count in sorted(total.requests.items())
+        ])
+        lines += _family('http_requests_in_flight', 'gauge', 'Peticiones en curso',
+                         [({}, total.in_flight)])
+        lines += _histogram('http_request_duration_seconds', 'Duración de las peticiones',
+                            ('endpoint', 'method'), LATENCY_BUCKETS, total.latency)
+        lines += _histogram('http_request_db_seconds', 'Tiempo en la base de datos por petición',
+                            ('endpoint',), LATENCY_BUCKETS, total.db_time)
+        lines += _histogram('http_request_db_queries', 'Sentencias SQL por petición',
+                            ('endpoint',), QUERY_COUNT_BUCKETS, total.db_queries)
+        for collector in self.collectors:
+            for name, kind, help_text, samples in collector():
+                lines += _family(name, kind, help_text, samples)
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _family(name, kind, help_text, samples):
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    lines.extend(f'{name}{_labels(labels)} {value}' for labels, value in samples)
+    return lines
+
+
+def _histogram(name, help_text, label_names, buckets, histograms):
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for key, counts in sorted(histograms.items()):
+        labels = dict(zip(label_names, key))
+        cumulative = 0
+        for bound, count in zip(buckets + ('+Inf',), counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(dict(labels, le=bound))} {cumulative}')
+        lines.append(f'{name}_sum{_labels(labels)} {counts[-1]}')
+        lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+    return lines
+
+
+def get_request_metrics():
+    """Métricas de la aplicación actual (None si están desactivadas)"""
+    return current_app.extensions.get('request_metrics')
+
+
+def _start_request():
+    g.request_started_at = time.perf_counter()
+    g.response_status = None
+    get_request_metrics().request_started()
+
+
+def _store_status(response):
+    g.response_status = response.status_code
+    return response
+
+
+def _finish_request(exc):
+    started_at = g.pop('request_started_at', None)
+    if started_at is None:
+        return
+    status = g.pop('response_status', None) or 500
+    db_queries, db_time = get_request_sql()
+    get_request_metrics().request_finished(
+        request.endpoint or '<unmatched>', request.method, str(status),
+        time.perf_counter() - started_at, db_time, db_queries
+    )
+
+
+def _extension_collector(app):
+    """Contadores de la caché de fragmentos y del limitador de login"""
+    def collect():
+        cache = app.extensions.get('fragment_cache')
+        if cache is not None:
+            stats = cache.stats()
+            fragments = sorted(stats['fragments'].items())
+            yield ('fragment_cache_hits_total', 'counter', 'Aciertos de la caché de fragmentos',
+                   [({'fragment': kind}, counters['hits']) for kind, counters in fragments])
+            yield ('fragment_cache_misses_total', 'counter', 'Fallos de la caché de fragmentos',
+                   [({'fragment': kind}, counters['misses']) for kind, counters in fragments])
+            yield ('fragment_cache_entries', 'gauge', 'Fragmentos cacheados', [({}, stats['size'])])
+        throttle = app.extensions.get('login_throttle')
+        if throttle is not None:
+            stats = throttle.stats()
+            yield ('login_throttle_decisions_total', 'counter', 'Intentos de login por resultado',
+                   [({'result': name}, stats[name]) for name in ('allowed', 'rejected_ip', 'rejected_email')])
+            yield ('login_throttle_tracked_keys', 'gauge', 'Claves con cubo de tokens',
+                   [({}, stats['tracked_keys'])])
+    return collect
+
+
+def metrics_view():
+    """Exporta las métricas de este proceso; con METRICS_TOKEN exige 'Authorization: Bearer'"""
+    token = current_app.config['METRICS_TOKEN']
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        abort(401)
+    return Response(get_request_metrics().render(), content_type=CONTENT_TYPE)
+
+
+def init_metrics(app):
+    """Registra los hooks de métricas y la ruta /metrics
+
+    Debe llamarse antes que cualquier otro before_request para que la
+    latencia cubra toda la petición. El tiempo y número de sentencias SQL
+    los aporta sql_monitor.
+    """
+    if not app.config['METRICS_ENABLED']:
+        return
+
+    metrics = app.extensions['request_metrics'] = RequestMetrics()
+    metrics.collectors.append(_extension_collector(app))
+
+    app.before_request(_start_request)
+    app.after_request(_store_status)
+    app.teardown_request(_finish_request)
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
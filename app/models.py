@@ -11,6 +11,11 @@ class User(db.Model):
     role = db.Column(db.String(20), nullable=False, default='user')  # 'user' or 'admin'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Índice sin distinción de mayúsculas para la búsqueda por prefijo de nombre
+    __table_args__ = (
+        db.Index('idx_users_name', db.text('name COLLATE NOCASE')),
+    )
+
     # Relaciones
     created_tasks = db.relationship('Task', foreign_keys='Task.created_by', backref='creator', lazy='dynamic')
     assigned_tasks = db.relationship('Task', foreign_keys='Task.assigned_to', backref='assignee', lazy='dynamic')
@@ -44,6 +49,9 @@ class Task(db.Model):
     __table_args__ = (
         db.Index('idx_assigned_status', 'assigned_to', 'status'),
         db.Index('idx_due_date_status', 'due_date', 'status'),
+        db.Index('idx_created_at_id', 'created_at', 'id'),
+        db.Index('idx_created_by_status_created', 'created_by', 'status', 'created_at'),
+        db.Index('idx_updated_at', 'updated_at'),
     )
 
     def __repr__(self):
@@ -71,4 +79,39 @@ class Task(db.Model):
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
             'is_overdue': self.is_overdue()
-        }
\ No newline at end of file
+        }
+
+class TaskStat(db.Model):
+    """Contadores de tareas por usuario, estado y prioridad.
+
+    Cada tarea suma en la fila de su creador, en la de su asignado (una sola
+    vez si son el mismo usuario) y en la fila global con user_id = 0, que es
+    la que consulta el administrador.
+    """
+    __tablename__ = 'task_stats'
+
+    GLOBAL_SCOPE = 0
+
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    status = db.Column(db.String(20), primary_key=True)
+    priority = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<TaskStat {self.user_id} {self.status}/{self.priority}: {self.count}>'
+
+
+class DataVersion(db.Model):
+    """Versiones de datos sin updated_at propio que aparecen en páginas cacheadas
+
+    La fila 'users' se incrementa al crear, renombrar o borrar usuarios (ver
+    UserService) y forma parte de los ETag de las páginas que muestran
+    nombres de otros usuarios. Es una tabla aparte para no alterar users en
+    bases de datos existentes (create_all sólo crea tablas nuevas).
+    """
+    __tablename__ = 'data_versions'
+
+    USERS = 'users'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,106 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+class PasswordHashingUnavailable(Exception):
+    """El pool de hashing está saturado o no respondió a tiempo"""
+
+
+def normalize_method(method):
+    """Completa los parámetros por defecto de werkzeug en un método de hash
+
+    'pbkdf2' -> 'pbkdf2:sha256:600000', 'scrypt' -> 'scrypt:32768:8:1'. Es el
+    mismo prefijo que werkzeug guarda antes del primer '$' del hash.
+    """
+    parts = method.split(':')
+    if parts[0] == 'pbkdf2':
+        digest = parts[1] if len(parts) > 1 else 'sha256'
+        iterations = parts[2] if len(parts) > 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{digest}:{int(iterations)}'
+    if parts[0] == 'scrypt':
+        defaults = ['32768', '8', '1']
+        n, r, p = parts[1:4] + defaults[len(parts[1:4]):]
+        return f'scrypt:{int(n)}:{int(r)}:{int(p)}'
+    return method
+
+
+class PasswordHasher:
+    """Calcula y verifica hashes de contraseña fuera del hilo del request
+
+    Con workers > 0 el trabajo se envía a un ProcessPoolExecutor, de modo que
+    el PBKDF2 no retiene el GIL de los hilos que sirven otras peticiones. La
+    cola está acotada a max_pending tareas en vuelo: si se llena durante
+    timeout segundos, o el resultado no llega a tiempo, se lanza
+    PasswordHashingUnavailable en lugar de acumular peticiones. Con
+    workers = 0 se calcula en línea (tests, scripts).
+    """
+
+    def __init__(self, method, workers=0, max_pending=None, timeout=5):
+        self.method = normalize_method(method)
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending or max(workers, 1) * 4)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn evita heredar locks de los hilos del servidor al hacer fork
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PasswordHashingUnavailable('Cola de hashing llena')
+        try:
+            future = self._get_executor().submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordHashingUnavailable('El hashing de la contraseña superó el tiempo límite')
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True si el hash se generó con un método o parámetros distintos a los actuales"""
+        return normalize_method(pwhash.split('$', 1)[0]) != self.method
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+def get_password_hasher():
+    """Hasher de contraseñas de la aplicación actual"""
+    return current_app.extensions['password_hasher']
+
+
+def init_password_hasher(app):
+    """Registra el hasher configurado con PASSWORD_HASH_*"""
+    app.extensions['password_hasher'] = PasswordHasher(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+        timeout=app.config['PASSWORD_HASH_TIMEOUT']
+    )
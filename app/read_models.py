@@ -0,0 +1,99 @@
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+from flask import g, has_request_context
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
+from app.models import Task, User
+from app.services.search_service import SearchService
+
+# Caracteres de la descripción que se muestran en los listados
+DESCRIPTION_PREVIEW_LENGTH = 100
+
+
+def request_today():
+    """Fecha de hoy fijada una sola vez por request
+
+    Todas las comprobaciones de vencimiento y los ETag de un mismo request
+    usan el mismo valor, aunque el render cruce la medianoche.
+    """
+    if not has_request_context():
+        return date.today()
+    if 'today' not in g:
+        g.today = date.today()
+    return g.today
+
+
+class UserRef(NamedTuple):
+    """Identificador y nombre de un usuario referenciado por una tarea"""
+    id: int
+    name: str
+
+
+class TaskRow(NamedTuple):
+    """Tarea de sólo lectura para listados y dashboard
+
+    Se construye a partir de columnas, sin instancias ORM ni identity map.
+    Es una NamedTuple (inmutable y sin __dict__ por instancia) para que ocupe
+    lo mismo que una dataclass con slots y funcione también en Python 3.8.
+    Expone los mismos nombres que usan las plantillas con Task (assignee.name,
+    is_overdue(), description_preview...), con el vencimiento ya calculado.
+    """
+    id: int
+    title: str
+    status: str
+    priority: str
+    due_date: Optional[date]
+    created_at: datetime
+    updated_at: datetime
+    created_by: int
+    assignee: UserRef
+    description_preview: Optional[str]
+    description_truncated: bool
+    overdue: bool
+    search_rank: Optional[float] = None
+    search_snippet: Optional[str] = None
+
+    @property
+    def assigned_to(self):
+        return self.assignee.id
+
+    def is_overdue(self):
+        return self.overdue
+
+    @staticmethod
+    def project(query):
+        """Sustituye las entidades de una consulta de tareas por las columnas de TaskRow"""
+        assignee = aliased(User)
+        return query.with_entities(
+            Task.id, Task.title, Task.status, Task.priority, Task.due_date,
+            Task.created_at, Task.updated_at, Task.created_by, Task.assigned_to, assignee.name,
+            func.substr(Task.description, 1, DESCRIPTION_PREVIEW_LENGTH),
+            func.length(Task.description) > DESCRIPTION_PREVIEW_LENGTH
+        ).outerjoin(assignee, assignee.id == Task.assigned_to)
+
+    @staticmethod
+    def from_rows(rows, today=None, ranked=False):
+        """Construye TaskRow a partir de las filas de project (más rank y fragmento si ranked)"""
+        today = today or request_today()
+        tasks = []
+        for row in rows:
+            (task_id, title, status, priority, due_date, created_at, updated_at, created_by,
+             assigned_to, assignee_name, preview, truncated) = row[:12]
+            rank, snippet = row[12:14] if ranked else (None, None)
+            tasks.append(TaskRow(
+                id=task_id,
+                title=title,
+                status=status,
+                priority=priority,
+                due_date=due_date,
+                created_at=created_at,
+                updated_at=updated_at,
+                created_by=created_by,
+                assignee=UserRef(assigned_to, assignee_name),
+                description_preview=preview,
+                description_truncated=bool(truncated),
+                overdue=bool(due_date and status == 'pending' and due_date < today),
+                search_rank=rank,
+                search_snippet=SearchService.render_highlight(snippet) if snippet else None,
+            ))
+        return tasks
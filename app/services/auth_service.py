@@ -1,15 +1,32 @@
-from werkzeug.security import check_password_hash, generate_password_hash
+from flask import current_app
 from app.models import User
 from app import db
+from app.current_user import invalidate_user
+from app.password_hasher import PasswordHashingUnavailable, get_password_hasher
 
 class AuthService:
     @staticmethod
     def validate_user_credentials(email, password):
-        """Valida las credenciales del usuario"""
+        """Valida las credenciales del usuario
+
+        Si el hash guardado usa un método o número de iteraciones anterior al
+        configurado, se recalcula con la contraseña recién verificada. Lanza
+        PasswordHashingUnavailable si el pool de hashing está saturado.
+        """
         user = User.query.filter_by(email=email).first()
-        if user and check_password_hash(user.password_hash, password):
-            return user
-        return None
+        hasher = get_password_hasher()
+        if not user or not hasher.verify(user.password_hash, password):
+            return None
+
+        if hasher.needs_rehash(user.password_hash):
+            try:
+                user.password_hash = hasher.hash(password)
+                db.session.commit()
+            except Exception as e:
+                # El login no debe fallar porque no se pudo actualizar el hash
+                db.session.rollback()
+                current_app.logger.warning('No se pudo actualizar el hash del usuario %s: %s', user.id, e)
+        return user
 
     @staticmethod
     def create_user(name, email, password, role='user'):
@@ -19,11 +36,16 @@ class AuthService:
         if existing_user:
             return None, "El email ya está registrado"
 
+        try:
+            password_hash = get_password_hasher().hash(password)
+        except PasswordHashingUnavailable:
+            return None, "El servicio está saturado, inténtalo de nuevo en unos segundos"
+
         # Crear nuevo usuario
         user = User(
             name=name,
             email=email,
-            password_hash=generate_password_hash(password),
+            password_hash=password_hash,
             role=role
         )
 
@@ -47,6 +69,7 @@ class AuthService:
             user.name = name
             user.email = email
             db.session.commit()
+            invalidate_user(user.id)
             return True, "Perfil actualizado exitosamente"
         except Exception as e:
             db.session.rollback()
@@ -55,13 +78,19 @@ class AuthService:
     @staticmethod
     def change_password(user, current_password, new_password):
         """Cambia la contraseña del usuario"""
-        # Verificar contraseña actual
-        if not check_password_hash(user.password_hash, current_password):
-            return False, "La contraseña actual es incorrecta"
+        hasher = get_password_hasher()
+        try:
+            # Verificar contraseña actual
+            if not hasher.verify(user.password_hash, current_password):
+                return False, "La contraseña actual es incorrecta"
+            password_hash = hasher.hash(new_password)
+        except PasswordHashingUnavailable:
+            return False, "El servicio está saturado, inténtalo de nuevo en unos segundos"
 
         try:
-            user.password_hash = generate_password_hash(new_password)
+            user.password_hash = password_hash
             db.session.commit()
+            invalidate_user(user.id)
             return True, "Contraseña cambiada exitosamente"
         except Exception as e:
             db.session.rollback()
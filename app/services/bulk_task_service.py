@@ -0,0 +1,222 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import case, delete, select, true, update
+from app.models import Task, User
+from app import db
+from app.fragment_cache import invalidate_task_fragments
+from app.services.task_stats_service import TaskStatsService
+
+TASKS = Task.__table__
+
+BULK_ACTIONS = {
+    'complete': 'Marcar como completadas',
+    'reopen': 'Marcar como pendientes',
+    'toggle': 'Cambiar estado',
+    'priority': 'Cambiar prioridad',
+    'reassign': 'Reasignar',
+    'delete': 'Eliminar',
+}
+
+PRIORITIES = ('low', 'medium', 'high')
+
+# Ids inválidos que se detallan en los errores de validación
+MAX_INVALID_ID_ERRORS = 5
+
+# Estado que deben tener las tareas para que complete/reopen las modifiquen
+PREVIOUS_STATUS = {'complete': 'pending', 'reopen': 'done'}
+
+
+class BulkTaskService:
+    """Operaciones sobre muchas tareas con una sola sentencia por acción
+
+    Las reglas de permisos de las vistas individuales se expresan en SQL:
+    una tarea es accesible si el usuario es admin, su creador o su asignado
+    (can_access_task), y sólo el creador o un admin pueden eliminarla.
+    """
+
+    @staticmethod
+    def access_condition(user):
+        if user.role == 'admin':
+            return true()
+        return (TASKS.c.created_by == user.id) | (TASKS.c.assigned_to == user.id)
+
+    @staticmethod
+    def delete_condition(user):
+        if user.role == 'admin':
+            return true()
+        return TASKS.c.created_by == user.id
+
+    @staticmethod
+    def validate(user, action, task_ids, value=None, max_ids=500):
+        """Valida la petición; devuelve (ids, valor, errores)
+
+        Los ids se devuelven como enteros sin duplicados y en el orden recibido.
+        Una lista de más de max_ids entradas se rechaza antes de recorrerla y
+        sólo se detallan los primeros MAX_INVALID_ID_ERRORS ids inválidos.
+        """
+        task_ids = task_ids or []
+        if len(task_ids) > max_ids:
+            return [], value, [f'Como máximo se pueden procesar {max_ids} tareas a la vez']
+
+        errors = []
+        ids = []
+        seen = set()
+        invalid = 0
+        for task_id in task_ids:
+            try:
+                task_id = int(task_id)
+            except (TypeError, ValueError):
+                invalid += 1
+                if invalid <= MAX_INVALID_ID_ERRORS:
+                    errors.append(f'Id de tarea inválido: {str(task_id)[:50]}')
+                continue
+            if task_id not in seen:
+                seen.add(task_id)
+                ids.append(task_id)
+        if invalid > MAX_INVALID_ID_ERRORS:
+            errors.append(f'... y {invalid - MAX_INVALID_ID_ERRORS} ids inválidos más')
+
+        if not ids and not errors:
+            errors.append('No se seleccionó ninguna tarea')
+
+        if action not in BULK_ACTIONS:
+            errors.append('Acción desconocida')
+        elif action == 'priority' and value not in PRIORITIES:
+            errors.append('La prioridad debe ser low, medium o high')
+        elif action == 'reassign':
+            if not user.can_assign_tasks():
+                errors.append('No tienes permisos para reasignar tareas')
+            else:
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    value = None
+                if value is None or db.session.get(User, value) is None:
+                    errors.append('El usuario asignado no existe')
+
+        return ids, value, errors
+
+    @staticmethod
+    def execute(user, action, task_ids, value=None):
+        """Aplica la acción a las tareas en una transacción
+
+        Una SELECT obtiene los ids accesibles (y si el usuario puede
+        eliminarlos) para el informe y una única UPDATE o DELETE ... WHERE id IN
+        modifica los permitidos. Los contadores de task_stats no salen de esa
+        SELECT, que no abre transacción y puede quedar desfasada, sino de las
+        filas que devuelve la escritura (ver _write). Devuelve (informe,
+        error); el informe indica para cada id 'ok', 'forbidden' o 'not_found'.
+        """
+        try:
+            rows = db.session.execute(
+                select(TASKS.c.id, BulkTaskService.delete_condition(user).label('can_delete'))
+                .where(TASKS.c.id.in_(task_ids), BulkTaskService.access_condition(user))
+            ).all()
+
+            permitted_ids = [row.id for row in rows if action != 'delete' or row.can_delete]
+            changed = []
+
+            if permitted_ids:
+                condition = TASKS.c.id.in_(permitted_ids) & BulkTaskService.access_condition(user)
+                if action == 'delete':
+                    condition &= BulkTaskService.delete_condition(user)
+                    statement = delete(TASKS).where(condition)
+                else:
+                    if action in PREVIOUS_STATUS:
+                        # Sólo las que cambian: el estado previo queda determinado por el filtro
+                        condition &= TASKS.c.status == PREVIOUS_STATUS[action]
+                    statement = update(TASKS).where(condition).values(
+                        updated_at=datetime.utcnow(), **BulkTaskService._new_values(action, value)
+                    )
+                changed = BulkTaskService._write(action, statement, condition)
+
+                changes = Counter()
+                for old in changed:
+                    changes.subtract(TaskStatsService.deltas(old[1:], 1))
+                    if action != 'delete':
+                        changes.update(TaskStatsService.deltas(BulkTaskService._apply(action, value, old[1:]), 1))
+                TaskStatsService.apply(db.session.connection(), changes)
+
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return None, f'Error al procesar las tareas: {str(e)}'
+
+        if changed:
+            user_ids = {old[3] for old in changed} | {old[4] for old in changed}
+            if action == 'reassign':
+                user_ids.add(value)
+            invalidate_task_fragments([old[0] for old in changed], user_ids)
+
+        # complete/reopen no tocan las que ya estaban en ese estado, pero cuentan como hechas
+        done = set(permitted_ids) if action in PREVIOUS_STATUS else {old[0] for old in changed}
+        found = {row.id for row in rows}
+        results = [
+            {'id': task_id,
+             'result': 'ok' if task_id in done else 'forbidden' if task_id in found else 'not_found'}
+            for task_id in task_ids
+        ]
+        return {
+            'action': action,
+            'processed': len(done),
+            'results': results,
+        }, None
+
+    @staticmethod
+    def _write(action, statement, condition):
+        """Ejecuta la escritura; devuelve (id, status, priority, created_by, assigned_to)
+        previos de las filas que modificó
+
+        Con RETURNING, DELETE devuelve las filas borradas y en complete, reopen
+        y toggle el estado previo se deduce del nuevo, como en
+        TaskService.toggle_task_status_by_id. En priority y reassign (o si el
+        motor no soporta RETURNING) una UPDATE de updated_at toma primero el
+        bloqueo de escritura de SQLite, que dura hasta el commit, y las filas se
+        leen antes de la escritura real sin que otro request pueda cambiarlas.
+        """
+        columns = (TASKS.c.id, TASKS.c.status, TASKS.c.priority, TASKS.c.created_by, TASKS.c.assigned_to)
+        dialect = db.engine.dialect
+        returning = dialect.delete_returning if action == 'delete' else dialect.update_returning
+
+        if returning and action not in ('priority', 'reassign'):
+            rows = db.session.execute(statement.returning(*columns)).all()
+            if action == 'delete':
+                return [tuple(row) for row in rows]
+            return [
+                (task_id, 'done' if status == 'pending' else 'pending', priority, created_by, assigned_to)
+                for task_id, status, priority, created_by, assigned_to in rows
+            ]
+
+        db.session.execute(update(TASKS).where(condition).values(updated_at=datetime.utcnow()))
+        rows = db.session.execute(select(*columns).where(condition)).all()
+        db.session.execute(statement)
+        return [tuple(row) for row in rows]
+
+    @staticmethod
+    def _new_values(action, value):
+        """Valores SET de la UPDATE para cada acción"""
+        if action == 'complete':
+            return {'status': 'done'}
+        if action == 'reopen':
+            return {'status': 'pending'}
+        if action == 'toggle':
+            return {'status': case((TASKS.c.status == 'pending', 'done'), else_='pending')}
+        if action == 'priority':
+            return {'priority': value}
+        return {'assigned_to': value}
+
+    @staticmethod
+    def _apply(action, value, snapshot):
+        """Estado (status, priority, created_by, assigned_to) tras la acción"""
+        status, priority, created_by, assigned_to = snapshot
+        if action == 'complete':
+            status = 'done'
+        elif action == 'reopen':
+            status = 'pending'
+        elif action == 'toggle':
+            status = 'done' if status == 'pending' else 'pending'
+        elif action == 'priority':
+            priority = value
+        elif action == 'reassign':
+            assigned_to = value
+        return (status, priority, created_by, assigned_to)
@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+from datetime import date
+from sqlalchemy.orm import aliased
+from app.models import Task, User
+from app.services.task_service import TaskService
+
+EXPORT_FIELDS = [
+    'id', 'title', 'description', 'status', 'priority', 'due_date',
+    'created_by', 'creator_name', 'assigned_to', 'assignee_name',
+    'created_at', 'updated_at', 'is_overdue'
+]
+
+
+class ExportService:
+    @staticmethod
+    def iter_rows(user, filters=None, batch_size=1000):
+        """Recorre las tareas filtradas como diccionarios sin cargar todo el resultado
+
+        Se seleccionan columnas (no instancias ORM) y se leen en lotes de
+        batch_size con yield_per, por lo que la memoria no depende del
+        número de filas exportadas.
+        """
+        creator = aliased(User)
+        assignee = aliased(User)
+        query = TaskService._build_user_tasks_query(user, filters, eager=False).with_entities(
+            Task.id, Task.title, Task.description, Task.status, Task.priority,
+            Task.due_date, Task.created_by, creator.name, Task.assigned_to,
+            assignee.name, Task.created_at, Task.updated_at
+        ).outerjoin(creator, creator.id == Task.created_by) \
+         .outerjoin(assignee, assignee.id == Task.assigned_to) \
+         .order_by(Task.created_at.desc(), Task.id.desc()) \
+         .execution_options(yield_per=batch_size)
+
+        today = date.today()
+        for row in query:
+            (task_id, title, description, status, priority, due_date, created_by,
+             creator_name, assigned_to, assignee_name, created_at, updated_at) = row
+            yield {
+                'id': task_id,
+                'title': title,
+                'description': description,
+                'status': status,
+                'priority': priority,
+                'due_date': due_date.isoformat() if due_date else None,
+                'created_by': created_by,
+                'creator_name': creator_name,
+                'assigned_to': assigned_to,
+                'assignee_name': assignee_name,
+                'created_at': created_at.isoformat() if created_at else None,
+                'updated_at': updated_at.isoformat() if updated_at else None,
+                'is_overdue': bool(due_date and status == 'pending' and due_date < today)
+            }
+
+    @staticmethod
+    def iter_csv(user, filters=None, batch_size=1000):
+        """Genera el CSV por fragmentos de batch_size filas"""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+
+        for count, row in enumerate(ExportService.iter_rows(user, filters, batch_size), start=1):
+            writer.writerow(row)
+            if count % batch_size == 0:
+                yield ExportService._drain(buffer)
+        yield ExportService._drain(buffer)
+
+    @staticmethod
+    def iter_ndjson(user, filters=None, batch_size=1000):
+        """Genera NDJSON (un objeto JSON por línea) por fragmentos de batch_size filas"""
+        lines = []
+        for row in ExportService.iter_rows(user, filters, batch_size):
+            lines.append(json.dumps(row, ensure_ascii=False))
+            if len(lines) >= batch_size:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _drain(buffer):
+        """Devuelve el contenido del buffer y lo vacía"""
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return chunk
@@ -0,0 +1,180 @@
+import csv
+import json
+from collections import Counter
+from datetime import date, datetime
+from sqlalchemy import insert, select
+from app.models import Task, User
+from app import db
+from app.fragment_cache import invalidate_task_fragments
+from app.services.task_service import TaskService
+from app.services.task_stats_service import TaskStatsService
+
+IMPORT_FIELDS = ['title', 'description', 'status', 'priority', 'due_date', 'assigned_to_email']
+
+PRIORITIES = ('low', 'medium', 'high')
+STATUSES = ('pending', 'done')
+
+# El endpoint decodifica con errors='replace': los bytes que no son UTF-8 llegan como U+FFFD
+INVALID_ENCODING = 'Codificación inválida: el texto debe estar en UTF-8'
+
+
+class ImportService:
+    @staticmethod
+    def iter_csv(stream):
+        """Recorre un CSV con cabecera como (línea, registro) sin cargarlo entero"""
+        reader = csv.DictReader(stream)
+        for record in reader:
+            if any(isinstance(value, str) and '\ufffd' in value for value in record.values()):
+                record = INVALID_ENCODING
+            yield reader.line_num, record
+
+    @staticmethod
+    def iter_ndjson(stream):
+        """Recorre un NDJSON como (línea, registro); las líneas inválidas dan un str de error"""
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            if '\ufffd' in line:
+                yield line_number, INVALID_ENCODING
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, f'JSON inválido: {e}'
+                continue
+            if not isinstance(record, dict):
+                record = 'Se esperaba un objeto JSON'
+            yield line_number, record
+
+    @staticmethod
+    def import_records(user, records, chunk_size=1000, max_errors=100):
+        """Importa tareas creadas por user a partir de (línea, registro)
+
+        Los registros se procesan en bloques de chunk_size: los emails de los
+        asignados del bloque se resuelven con una sola consulta, las filas
+        válidas se insertan con un executemany y los contadores de task_stats
+        se ajustan con la suma del bloque antes de hacer commit. Una línea
+        inválida se anota en el informe (hasta max_errors con detalle) sin
+        detener la importación.
+        """
+        report = {'imported': 0, 'failed': 0, 'errors': []}
+        emails = {}
+
+        def add_error(line_number, messages):
+            report['failed'] += 1
+            if len(report['errors']) < max_errors:
+                report['errors'].append({'line': line_number, 'errors': messages})
+
+        chunk = []
+        for item in records:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                ImportService._import_chunk(user, chunk, emails, report, add_error)
+                chunk = []
+        if chunk:
+            ImportService._import_chunk(user, chunk, emails, report, add_error)
+        return report
+
+    @staticmethod
+    def _import_chunk(user, chunk, emails, report, add_error):
+        pending = {
+            _text(record, 'assigned_to_email')
+            for line_number, record in chunk if isinstance(record, dict)
+        } - set(emails) - {''}
+        if pending:
+            emails.update({email: None for email in pending})
+            emails.update(db.session.execute(
+                select(User.email, User.id).where(User.email.in_(pending))
+            ).all())
+
+        now = datetime.utcnow()
+        rows = []
+        lines = []
+        for line_number, record in chunk:
+            if not isinstance(record, dict):
+                add_error(line_number, [record])
+                continue
+            row, errors = ImportService.parse_record(user, record, emails)
+            if errors:
+                add_error(line_number, errors)
+                continue
+            row.update(created_by=user.id, created_at=now, updated_at=now)
+            rows.append(row)
+            lines.append(line_number)
+
+        if not rows:
+            return
+
+        changes = Counter()
+        for row in rows:
+            changes.update(TaskStatsService.deltas(
+                (row['status'], row['priority'], row['created_by'], row['assigned_to']), 1
+            ))
+
+        try:
+            db.session.execute(insert(Task.__table__), rows)
+            TaskStatsService.apply(db.session.connection(), changes)
+            db.session.commit()
+            report['imported'] += len(rows)
+            invalidate_task_fragments(user_ids={user.id} | {row['assigned_to'] for row in rows})
+        except Exception as e:
+            db.session.rollback()
+            for line_number in lines:
+                add_error(line_number, [f'Error al guardar la tarea: {str(e)}'])
+
+    @staticmethod
+    def parse_record(user, record, emails):
+        """Convierte un registro en los valores de la fila; devuelve (fila, errores)
+
+        Aplica las mismas reglas que el alta de tareas: validate_task_data
+        para título y fecha, y sólo un admin puede asignar a otros usuarios.
+        """
+        errors = []
+        title = _text(record, 'title')
+        description = record.get('description') or None
+        priority = _text(record, 'priority') or 'medium'
+        status = _text(record, 'status') or 'pending'
+
+        due_date = _text(record, 'due_date') or None
+        if due_date:
+            try:
+                due_date = date.fromisoformat(due_date)
+            except ValueError:
+                errors.append('La fecha límite debe tener formato AAAA-MM-DD')
+                due_date = None
+
+        is_valid, validation_errors = TaskService.validate_task_data(title=title, due_date=due_date)
+        errors.extend(validation_errors)
+
+        if description is not None and not isinstance(description, str):
+            errors.append('La descripción debe ser texto')
+        elif description and len(description) > 1000:
+            errors.append('La descripción no puede exceder 1000 caracteres')
+        if priority not in PRIORITIES:
+            errors.append('La prioridad debe ser low, medium o high')
+        if status not in STATUSES:
+            errors.append('El estado debe ser pending o done')
+
+        assigned_to = user.id
+        email = _text(record, 'assigned_to_email')
+        if email:
+            assigned_to = emails.get(email)
+            if assigned_to is None:
+                errors.append(f'No existe ningún usuario con el email {email}')
+            elif assigned_to != user.id and not user.can_assign_tasks():
+                errors.append('No tienes permisos para asignar tareas a otros usuarios')
+
+        return {
+            'title': title,
+            'description': description,
+            'status': status,
+            'priority': priority,
+            'due_date': due_date,
+            'assigned_to': assigned_to,
+        }, errors
+
+
+def _text(record, name):
+    """Valor de un campo como texto sin espacios ('' si falta)"""
+    value = record.get(name)
+    return '' if value is None else str(value).strip()
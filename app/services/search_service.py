@@ -0,0 +1,166 @@
+import re
+from contextlib import contextmanager
+from flask import current_app
+from markupsafe import Markup, escape
+from sqlalchemy import column, false, func, literal_column, or_, table, text
+from sqlalchemy.exc import OperationalError
+from app.models import Task
+from app import db
+
+FTS_TABLE = 'tasks_fts'
+
+# Tabla virtual FTS5 de contenido externo: el texto vive en tasks y el índice
+# se mantiene con triggers, de modo que cualquier escritura (ORM o SQL) lo
+# actualiza en la misma transacción.
+FTS_SETUP = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+        USING fts5(title, description, content='tasks', content_rowid='id')""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+fts_table = table(FTS_TABLE, column('rowid'))
+
+# Marcadores de resaltado devueltos por SQLite; se sustituyen por <mark>
+# después de escapar el texto para no inyectar HTML del usuario.
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+
+class SearchService:
+    @staticmethod
+    def setup():
+        """Crea el índice FTS5 si el motor lo soporta; devuelve si está disponible"""
+        available = False
+        if current_app.config.get('TASK_SEARCH_FTS', True) and db.engine.dialect.name == 'sqlite':
+            try:
+                with db.engine.begin() as connection:
+                    existed = connection.execute(
+                        text("SELECT 1 FROM sqlite_master WHERE name = :name"),
+                        {'name': FTS_TABLE}
+                    ).first() is not None
+                    for statement in FTS_SETUP:
+                        connection.execute(text(statement))
+                    if not existed:
+                        # Indexar las tareas que ya existían
+                        connection.execute(text(
+                            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+                        ))
+                available = True
+            except OperationalError:
+                # SQLite compilado sin FTS5
+                available = False
+
+        current_app.extensions['task_search_fts'] = available
+        return available
+
+    @staticmethod
+    @contextmanager
+    def bulk_indexing():
+        """Suspende el trigger de inserción de FTS5 durante una carga masiva
+
+        Al salir (también si la carga falla a medias) se indexan de una vez
+        las tareas insertadas y se restaura el trigger. Sólo para cargas que
+        no compiten con otras escrituras, como el comando seed.
+        """
+        if not SearchService.is_available():
+            yield
+            return
+
+        with db.engine.begin() as connection:
+            last_id = connection.execute(text('SELECT COALESCE(MAX(id), 0) FROM tasks')).scalar()
+            connection.execute(text(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai'))
+        try:
+            yield
+        finally:
+            with db.engine.begin() as connection:
+                connection.execute(text(
+                    f"INSERT INTO {FTS_TABLE}(rowid, title, description) "
+                    f"SELECT id, title, description FROM tasks WHERE id > :last_id"
+                ), {'last_id': last_id})
+                connection.execute(text(FTS_SETUP[1]))
+
+    @staticmethod
+    def is_available():
+        """Indica si la búsqueda usa el índice FTS5"""
+        return current_app.extensions.get('task_search_fts', False)
+
+    @staticmethod
+    def build_match_query(search):
+        """Convierte el texto del usuario en una consulta FTS5 segura
+
+        Cada palabra se cita como frase con búsqueda por prefijo, para que
+        operadores o comillas del usuario no produzcan errores de sintaxis.
+        """
+        terms = re.findall(r'\w+', search or '')
+        return ' '.join('"{}"*'.format(term) for term in terms)
+
+    @staticmethod
+    def is_ranked(filters):
+        """Indica si la consulta se ordena por relevancia (BM25)"""
+        return bool(filters and filters.get('search')) and SearchService.is_available() \
+            and bool(SearchService.build_match_query(filters['search']))
+
+    @staticmethod
+    def filter_query(query, search):
+        """Aplica el filtro de búsqueda: FTS5 si está disponible, LIKE si no
+
+        Una búsqueda sin palabras indexables (sólo signos, como "%%" o "-")
+        no puede coincidir con el índice y no devuelve ninguna tarea.
+        """
+        if SearchService.is_available():
+            match = SearchService.build_match_query(search)
+            if not match:
+                return query.filter(false())
+            return query.join(fts_table, fts_table.c.rowid == Task.id).filter(
+                literal_column(FTS_TABLE).op('MATCH')(match)
+            )
+
+        search_term = f"%{search}%"
+        return query.filter(
+            or_(
+                Task.title.ilike(search_term),
+                Task.description.ilike(search_term)
+            )
+        )
+
+    @staticmethod
+    def rank_column():
+        """Puntuación BM25 (menor es más relevante)"""
+        return func.bm25(literal_column(FTS_TABLE))
+
+    @staticmethod
+    def with_ranking(query):
+        """Añade la puntuación y el fragmento resaltado de la descripción a la consulta"""
+        return query.add_columns(
+            SearchService.rank_column(),
+            func.snippet(literal_column(FTS_TABLE), 1, MARK_START, MARK_END, '…', 16)
+        )
+
+    @staticmethod
+    def unpack(rows):
+        """Convierte filas (task, rank, fragmento) en tareas con atributos de búsqueda"""
+        tasks = []
+        for task, rank, snippet in rows:
+            task.search_rank = rank
+            task.search_snippet = SearchService.render_highlight(snippet) if snippet else None
+            tasks.append(task)
+        return tasks
+
+    @staticmethod
+    def render_highlight(value):
+        """Escapa el texto y convierte los marcadores de SQLite en <mark>"""
+        escaped = str(escape(value or ''))
+        return Markup(escaped.replace(MARK_START, '<mark>').replace(MARK_END, '</mark>'))
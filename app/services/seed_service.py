@@ -0,0 +1,167 @@
+import random
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate
+from sqlalchemy import insert, select
+from app.models import Task, User
+from app import db
+from app.services.search_service import SearchService
+from app.services.task_stats_service import TaskStatsService
+from app.services.user_service import UserService
+
+FIRST_NAMES = ['Ana', 'Luis', 'María', 'Carlos', 'Lucía', 'Javier', 'Elena', 'Pablo', 'Sara', 'Diego',
+               'Laura', 'Andrés', 'Marta', 'Jorge', 'Paula', 'Raúl', 'Clara', 'Iván', 'Noelia', 'Hugo']
+LAST_NAMES = ['García', 'Martínez', 'López', 'Sánchez', 'Pérez', 'Gómez', 'Fernández', 'Díaz',
+              'Moreno', 'Romero', 'Navarro', 'Torres', 'Ruiz', 'Vega', 'Molina', 'Castro']
+VERBS = ['Revisar', 'Preparar', 'Actualizar', 'Enviar', 'Corregir', 'Diseñar', 'Documentar',
+         'Migrar', 'Probar', 'Organizar', 'Planificar', 'Publicar']
+NOUNS = ['informe', 'presupuesto', 'contrato', 'presentación', 'base de datos', 'manual',
+         'factura', 'campaña', 'servidor', 'inventario', 'propuesta', 'calendario']
+WORDS = ('el la de que en un una para con por los las del se al cliente equipo proyecto fecha '
+         'revisión entrega versión datos cambios pendiente reunión documento prioridad usuario '
+         'sistema error pruebas informe plazo semana mes objetivo tarea nota detalle').split()
+
+
+def parse_range(value):
+    """'mín:máx' -> (mín, máx) enteros"""
+    low, _, high = value.partition(':')
+    low, high = int(low), int(high or low)
+    if low > high:
+        raise ValueError(f'Rango inválido: {value}')
+    return low, high
+
+
+def parse_mix(value):
+    """'high=20,medium=50,low=30' -> {'high': 20.0, ...}"""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight)
+    if set(mix) - {'high', 'medium', 'low'} or not any(mix.values()):
+        raise ValueError(f'Mezcla de prioridades inválida: {value}')
+    return mix
+
+
+class SeedService:
+    """Generación de datos sintéticos reproducibles para pruebas de carga
+
+    Con la misma semilla, parámetros y fecha base se generan exactamente los
+    mismos usuarios y tareas.
+    """
+
+    @staticmethod
+    def generate_users(rng, count, seed, password_hash, created_at):
+        """Filas de usuarios con nombres realistas y emails únicos por semilla"""
+        for number in range(1, count + 1):
+            yield {
+                'name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {number}',
+                'email': f'seed{seed}-{number:07d}@example.com',
+                'password_hash': password_hash,
+                'role': 'user',
+                'created_at': created_at,
+            }
+
+    @staticmethod
+    def generate_tasks(rng, count, user_ids, base_date, done_ratio=0.3, priority_mix=None,
+                       due_spread=(-30, 90), no_due_ratio=0.2, description_length=(0, 400),
+                       skew=1.0, self_assigned_ratio=0.6, history_days=365):
+        """Filas de tareas según las distribuciones indicadas
+
+        El creador de cada tarea sigue una distribución de Zipf con exponente
+        skew sobre los usuarios (0 = uniforme): con skew=1 el primer usuario
+        crea el doble de tareas que el segundo y diez veces más que el décimo.
+        El asignado es el propio creador con probabilidad self_assigned_ratio
+        y, si no, otro usuario con la misma distribución.
+        """
+        priority_mix = priority_mix or {'high': 20, 'medium': 50, 'low': 30}
+        priorities = list(priority_mix)
+        priority_weights = list(accumulate(priority_mix.values()))
+        user_weights = list(accumulate(1.0 / (rank ** skew) for rank in range(1, len(user_ids) + 1)))
+        base = datetime.combine(base_date, time())
+        history_seconds = history_days * 86400
+
+        for number in range(1, count + 1):
+            created_by, assigned_to = rng.choices(user_ids, cum_weights=user_weights, k=2)
+            if rng.random() < self_assigned_ratio:
+                assigned_to = created_by
+
+            due_date = None
+            if rng.random() >= no_due_ratio:
+                due_date = base_date + timedelta(days=rng.randint(*due_spread))
+
+            length = rng.randint(*description_length)
+            description = None
+            if length:
+                # Palabras de al menos 2 letras más el espacio: length // 3 + 1 bastan para llegar
+                description = ' '.join(rng.choices(WORDS, k=length // 3 + 1))[:length].capitalize()
+
+            created_at = base - timedelta(seconds=rng.randrange(history_seconds))
+            yield {
+                'title': f'{rng.choice(VERBS)} {rng.choice(NOUNS)} #{number}',
+                'description': description,
+                'status': 'done' if rng.random() < done_ratio else 'pending',
+                'priority': rng.choices(priorities, cum_weights=priority_weights)[0],
+                'due_date': due_date,
+                'created_by': created_by,
+                'assigned_to': assigned_to,
+                'created_at': created_at,
+                'updated_at': created_at,
+            }
+
+    @staticmethod
+    def seed(users, tasks, password_hash, seed=42, base_date=None, chunk_size=10000, progress=None,
+             **distribution):
+        """Inserta users usuarios y tasks tareas; devuelve un informe con los totales
+
+        Las filas se insertan con executemany en bloques de chunk_size, con un
+        commit por bloque. El índice FTS5 se alimenta una sola vez al final
+        (SearchService.bulk_indexing) y los contadores de task_stats se
+        reconstruyen con una consulta agregada en lugar de fila a fila.
+        progress, si se indica, recibe el número de tareas insertadas.
+        """
+        if users < 1:
+            raise ValueError('Se necesita al menos un usuario')
+        email_prefix = f'seed{seed}-'
+        if db.session.execute(
+            select(User.id).where(User.email.startswith(email_prefix, autoescape=True)).limit(1)
+        ).first():
+            raise ValueError(f'Ya existen usuarios generados con la semilla {seed}')
+
+        rng = random.Random(seed)
+        base_date = base_date or date.today()
+        created_at = datetime.combine(base_date, time())
+
+        db.session.execute(insert(User.__table__),
+                           list(SeedService.generate_users(rng, users, seed, password_hash, created_at)))
+        user_ids = db.session.execute(
+            select(User.id).where(User.email.startswith(email_prefix, autoescape=True)).order_by(User.email)
+        ).scalars().all()
+        db.session.commit()
+        UserService.invalidate_assignee_choices()
+
+        inserted = 0
+        with SearchService.bulk_indexing():
+            chunk = []
+            for row in SeedService.generate_tasks(rng, tasks, user_ids, base_date, **distribution):
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    inserted += SeedService._insert_chunk(chunk)
+                    chunk = []
+                    if progress:
+                        progress(inserted)
+            if chunk:
+                inserted += SeedService._insert_chunk(chunk)
+                if progress:
+                    progress(inserted)
+
+        TaskStatsService.rebuild()
+        return {'users': len(user_ids), 'tasks': inserted}
+
+    @staticmethod
+    def _insert_chunk(rows):
+        try:
+            db.session.execute(insert(Task.__table__), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(rows)
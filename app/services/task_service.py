@@ -1,9 +1,22 @@
+import base64
+import json
+import operator
 from datetime import datetime, date
-from sqlalchemy import and_, or_
-from app.models import Task, User
+from flask import g, has_request_context
+from sqlalchemy import and_, or_, case, func, select, union_all, update
+from sqlalchemy.orm import defer, joinedload
+from app.models import Task, TaskStat
 from app import db
+from app.services.search_service import SearchService
+from app.services.task_stats_service import TaskStatsService
+from app.services.user_service import UserService
+from app.read_models import DESCRIPTION_PREVIEW_LENGTH, TaskRow, request_today
+from app.fragment_cache import invalidate_task_fragments
+
 
 class TaskService:
+    PRIORITIES = ('high', 'medium', 'low')
+
     @staticmethod
     def create_task(title, description, priority, due_date, created_by, assigned_to):
         """Crea una nueva tarea"""
@@ -19,6 +32,7 @@ class TaskService:
             )
             db.session.add(task)
             db.session.commit()
+            invalidate_task_fragments(user_ids=(created_by, assigned_to))
             return task, None
         except Exception as e:
             db.session.rollback()
@@ -28,6 +42,7 @@ class TaskService:
     def update_task(task, title, description, priority, due_date, assigned_to=None):
         """Actualiza una tarea existente"""
         try:
+            previous_assignee = task.assigned_to
             task.title = title
             task.description = description
             task.priority = priority
@@ -36,6 +51,7 @@ class TaskService:
                 task.assigned_to = assigned_to
             task.updated_at = datetime.utcnow()
             db.session.commit()
+            invalidate_task_fragments((task.id,), (task.created_by, previous_assignee, task.assigned_to))
             return True, "Tarea actualizada exitosamente"
         except Exception as e:
             db.session.rollback()
@@ -48,43 +64,258 @@ class TaskService:
             task.status = 'done' if task.status == 'pending' else 'pending'
             task.updated_at = datetime.utcnow()
             db.session.commit()
+            invalidate_task_fragments((task.id,), (task.created_by, task.assigned_to))
             return True, f"Tarea marcada como {task.status}"
         except Exception as e:
             db.session.rollback()
             return False, f"Error al cambiar estado: {str(e)}"
 
+    @staticmethod
+    def toggle_task_status_by_id(task_id, user):
+        """Cambia el estado de una tarea con una sola sentencia UPDATE
+
+        El CASE y el predicado de autorización van en el mismo UPDATE, así que
+        dos clics simultáneos alternan el estado dos veces en lugar de escribir
+        ambos el mismo valor, y no hace falta cargar la tarea antes. Con
+        RETURNING la fila actualizada llega en la misma sentencia; si el motor
+        no lo soporta se lee después dentro de la misma transacción. Como no
+        pasa por el ORM, los contadores de task_stats se ajustan aquí.
+
+        Devuelve (nuevo_estado, None), (None, None) si la tarea no existe o el
+        usuario no tiene acceso, o (None, error).
+        """
+        tasks = Task.__table__
+        condition = tasks.c.id == task_id
+        if user.role != 'admin':
+            condition &= (tasks.c.created_by == user.id) | (tasks.c.assigned_to == user.id)
+
+        statement = update(tasks).where(condition).values(
+            status=case((tasks.c.status == 'pending', 'done'), else_='pending'),
+            updated_at=datetime.utcnow()
+        )
+        columns = (tasks.c.status, tasks.c.priority, tasks.c.created_by, tasks.c.assigned_to)
+
+        try:
+            if db.engine.dialect.update_returning:
+                row = db.session.execute(statement.returning(*columns)).first()
+            else:
+                result = db.session.execute(statement)
+                row = db.session.execute(select(*columns).where(condition)).first() if result.rowcount else None
+
+            if row is None:
+                db.session.rollback()
+                return None, None
+
+            status, priority, created_by, assigned_to = row
+            previous = 'pending' if status == 'done' else 'done'
+            changes = TaskStatsService.deltas((status, priority, created_by, assigned_to), 1)
+            changes.subtract(TaskStatsService.deltas((previous, priority, created_by, assigned_to), 1))
+            TaskStatsService.apply(db.session.connection(), changes)
+
+            db.session.commit()
+            invalidate_task_fragments((task_id,), (created_by, assigned_to))
+            return status, None
+        except Exception as e:
+            db.session.rollback()
+            return None, f"Error al cambiar estado: {str(e)}"
+
     @staticmethod
     def delete_task(task):
         """Elimina una tarea"""
         try:
+            task_id, user_ids = task.id, (task.created_by, task.assigned_to)
             db.session.delete(task)
             db.session.commit()
+            TaskService.forget_task(task_id)
+            invalidate_task_fragments((task_id,), user_ids)
             return True, "Tarea eliminada exitosamente"
         except Exception as e:
             db.session.rollback()
             return False, f"Error al eliminar tarea: {str(e)}"
 
     @staticmethod
-    def get_user_tasks(user, filters=None):
-        """Obtiene las tareas de un usuario con filtros opcionales"""
+    def get_user_tasks(user, filters=None, read_only=False, today=None):
+        """Obtiene las tareas de un usuario con filtros opcionales
+
+        Con búsqueda de texto sobre FTS5 los resultados se ordenan por
+        relevancia (BM25); en otro caso, de más reciente a más antigua.
+        Con read_only=True se devuelven TaskRow construidas desde columnas
+        (sin instancias ORM), con el vencimiento calculado respecto a today.
+        """
+        ranked = SearchService.is_ranked(filters)
+        if read_only:
+            query = TaskRow.project(TaskService._build_user_tasks_query(user, filters, eager=False))
+        else:
+            query = TaskService._build_user_tasks_query(user, filters)
+        if ranked:
+            query = SearchService.with_ranking(query).order_by(SearchService.rank_column(), Task.id)
+        else:
+            query = query.order_by(Task.created_at.desc(), Task.id.desc())
+
+        if read_only:
+            return TaskRow.from_rows(query.all(), today, ranked)
+        return SearchService.unpack(query.all()) if ranked else query.all()
+
+    @staticmethod
+    def paginate_user_tasks(user, filters=None, cursor=None, per_page=20, read_only=False, today=None):
+        """Obtiene una página de tareas usando paginación por cursor (keyset)
+
+        El orden es (created_at, id) descendente, o (bm25, id) ascendente al
+        buscar con FTS5. El cursor es un token opaco que indica la posición y
+        la dirección ('next' o 'prev'); un cursor inválido se ignora y se
+        devuelve la primera página. Con read_only=True los elementos son
+        TaskRow (ver get_user_tasks).
+        """
+        ranked = SearchService.is_ranked(filters)
+        if read_only:
+            query = TaskRow.project(TaskService._build_user_tasks_query(user, filters, eager=False))
+            convert = lambda rows: TaskRow.from_rows(rows, today, ranked)
+        else:
+            query = TaskService.with_description_preview(TaskService._build_user_tasks_query(user, filters))
+            convert = lambda rows: TaskService.unpack_description_preview(rows, ranked)
+        if ranked:
+            query = SearchService.with_ranking(query)
+        return TaskService.paginate_query(query, ranked, cursor, per_page, convert=convert)
+
+    @staticmethod
+    def with_description_preview(query):
+        """Sustituye la descripción completa por un extracto calculado en SQL
+
+        La columna description queda diferida y se seleccionan sus primeros
+        DESCRIPTION_PREVIEW_LENGTH caracteres y si era más larga, de modo que
+        el listado no transfiere textos largos que no muestra.
+        """
+        return query.options(defer(Task.description)).add_columns(
+            func.substr(Task.description, 1, DESCRIPTION_PREVIEW_LENGTH),
+            func.length(Task.description) > DESCRIPTION_PREVIEW_LENGTH
+        )
+
+    @staticmethod
+    def unpack_description_preview(rows, ranked=False):
+        """Convierte filas (task, extracto, truncada[, rank, fragmento]) en tareas"""
+        tasks = []
+        for task, preview, truncated, *search in rows:
+            task.description_preview = preview
+            task.description_truncated = bool(truncated)
+            tasks.append((task, *search) if ranked else task)
+        return SearchService.unpack(tasks) if ranked else tasks
+
+    @staticmethod
+    def paginate_query(query, ranked=False, cursor=None, per_page=20, convert=None):
+        """Aplica la paginación por cursor a una consulta de tareas ya filtrada
+
+        Los elementos devueltos (tras aplicar convert a las filas) deben
+        exponer id y created_at, o search_rank si la consulta es por relevancia.
+        """
+        if ranked:
+            primary, descending = SearchService.rank_column(), False
+        else:
+            primary, descending = Task.created_at, True
+
+        position = TaskService.decode_cursor(cursor) if cursor else None
+        if position and position['ranked'] != ranked:
+            position = None
+        backwards = bool(position) and position['direction'] == 'prev'
+
+        # Al retroceder se recorre en sentido inverso y luego se invierte
+        ascending = backwards == descending
+        if position:
+            compare = operator.gt if ascending else operator.lt
+            query = query.filter(or_(
+                compare(primary, position['key']),
+                and_(primary == position['key'], compare(Task.id, position['id']))
+            ))
+        if ascending:
+            query = query.order_by(primary.asc(), Task.id.asc())
+        else:
+            query = query.order_by(primary.desc(), Task.id.desc())
+
+        # Pedir una fila extra para saber si hay más páginas
+        rows = query.limit(per_page + 1).all()
+        if convert:
+            rows = convert(rows)
+        has_more = len(rows) > per_page
+        items = rows[:per_page]
+
+        next_cursor = None
+        prev_cursor = None
+        if backwards:
+            items.reverse()
+            if items:
+                next_cursor = TaskService.encode_cursor(items[-1], 'next', ranked)
+                if has_more:
+                    prev_cursor = TaskService.encode_cursor(items[0], 'prev', ranked)
+        elif items:
+            if has_more:
+                next_cursor = TaskService.encode_cursor(items[-1], 'next', ranked)
+            if position:
+                prev_cursor = TaskService.encode_cursor(items[0], 'prev', ranked)
+
+        return {
+            'items': items,
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor,
+            'per_page': per_page
+        }
+
+    @staticmethod
+    def encode_cursor(task, direction='next', ranked=False):
+        """Codifica la posición de una tarea como token opaco
+
+        La posición es (created_at, id), o (puntuación BM25, id) si ranked.
+        """
+        payload = {'i': task.id, 'd': direction}
+        if ranked:
+            payload['r'] = task.search_rank
+        else:
+            payload['c'] = task.created_at.isoformat()
+        payload = json.dumps(payload, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Decodifica un token de cursor; devuelve None si no es válido"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            direction = payload.get('d', 'next')
+            if direction not in ('next', 'prev'):
+                return None
+            ranked = 'r' in payload
+            return {
+                'key': float(payload['r']) if ranked else datetime.fromisoformat(payload['c']),
+                'id': int(payload['i']),
+                'direction': direction,
+                'ranked': ranked
+            }
+        except (ValueError, TypeError, KeyError, AttributeError):
+            return None
+
+    @staticmethod
+    def _build_user_tasks_query(user, filters=None, eager=True):
+        """Construye la consulta de tareas visibles para el usuario con filtros
+
+        Con eager=False no se añaden opciones de carga, para poder
+        sustituir las entidades con with_entities().
+        """
         query = Task.query
+        if eager:
+            # Cargar creador y asignado en la misma consulta para evitar N+1
+            # cuando las plantillas o to_dict() acceden a task.creator/task.assignee
+            query = query.options(
+                joinedload(Task.creator),
+                joinedload(Task.assignee)
+            )
 
         # Filtrar por autorización
         if user.role != 'admin':
-            query = query.filter(
-                or_(Task.created_by == user.id, Task.assigned_to == user.id)
-            )
+            status = filters.get('status') if filters else None
+            query = query.filter(Task.id.in_(TaskService._accessible_task_ids(user, status)))
 
         # Aplicar filtros adicionales
         if filters:
             if filters.get('search'):
-                search_term = f"%{filters['search']}%"
-                query = query.filter(
-                    or_(
-                        Task.title.ilike(search_term),
-                        Task.description.ilike(search_term)
-                    )
-                )
+                query = SearchService.filter_query(query, filters['search'])
 
             if filters.get('status'):
                 query = query.filter(Task.status == filters['status'])
@@ -101,47 +332,130 @@ class TaskService:
             if filters.get('due_to'):
                 query = query.filter(Task.due_date <= filters['due_to'])
 
-        return query.order_by(Task.created_at.desc()).all()
+        return query
 
     @staticmethod
-    def get_task_by_id(task_id, user):
-        """Obtiene una tarea por ID verificando permisos"""
-        task = Task.query.get_or_404(task_id)
+    def get_tasks_version(user):
+        """Obtiene (número de tareas, última modificación, versión de usuarios)
+        de las tareas visibles
 
-        # Verificar autorización
-        if not user.can_access_task(task):
-            return None
+        Sirve como validador para respuestas condicionales: cualquier alta,
+        edición, cambio de estado o reasignación cambia updated_at, los
+        borrados cambian el total leído de task_stats y renombrar un usuario
+        (cuyo nombre aparece como asignado) cambia la versión de usuarios. Es
+        una sola consulta agregada.
+        """
+        scope = TaskStat.GLOBAL_SCOPE if user.role == 'admin' else user.id
+        total = db.session.query(func.coalesce(func.sum(TaskStat.count), 0)) \
+            .filter(TaskStat.user_id == scope).scalar_subquery()
+
+        query = db.session.query(func.max(Task.updated_at), total, UserService.users_version())
+        if user.role != 'admin':
+            query = query.filter(Task.id.in_(TaskService._accessible_task_ids(user)))
+        last_modified, count, users_version = query.one()
+        return count, last_modified, users_version
 
+    @staticmethod
+    def _accessible_task_ids(user, status=None):
+        """Subconsulta con los ids de las tareas creadas por o asignadas al usuario
+
+        Se usa UNION ALL de dos búsquedas en lugar de un OR para que SQLite
+        recorra idx_created_by_status_created e idx_assigned_status; el IN
+        del llamador elimina los duplicados. Si se indica el estado, se
+        aplica en cada rama para aprovechar la segunda columna de ambos índices.
+        """
+        created = select(Task.id).where(Task.created_by == user.id)
+        assigned = select(Task.id).where(Task.assigned_to == user.id)
+        if status:
+            created = created.where(Task.status == status)
+            assigned = assigned.where(Task.status == status)
+        return union_all(created, assigned)
+
+    @staticmethod
+    def get_task_by_id(task_id, user, eager=False):
+        """Obtiene una tarea por ID verificando permisos
+
+        La autorización forma parte del WHERE, así que una tarea ajena o
+        inexistente devuelve None sin cargar la fila. Con eager=True se
+        cargan creador y asignado en la misma consulta (vista de detalle).
+        Dentro de un request el resultado se guarda en g, de modo que buscar
+        otra vez la misma tarea no vuelve a consultar la base de datos. La
+        clave incluye eager: una instancia cargada sin relaciones no sirve
+        para la vista de detalle, aunque una cargada con ellas sí vale para
+        una búsqueda sin eager.
+        """
+        cache = g.setdefault('task_cache', {}) if has_request_context() else {}
+        key = (user.id, task_id, eager)
+        for cached in (key, (user.id, task_id, True)):
+            if cached in cache:
+                return cache[cached]
+
+        query = Task.query.filter(Task.id == task_id)
+        if user.role != 'admin':
+            query = query.filter(or_(Task.created_by == user.id, Task.assigned_to == user.id))
+        if eager:
+            query = query.options(joinedload(Task.creator), joinedload(Task.assignee))
+
+        task = cache[key] = query.first()
         return task
 
+    @staticmethod
+    def forget_task(task_id):
+        """Descarta la tarea de la caché del request (tras eliminarla)"""
+        if has_request_context():
+            for key in [key for key in g.get('task_cache', {}) if key[1] == task_id]:
+                del g.task_cache[key]
+
     @staticmethod
     def get_task_statistics(user):
-        """Obtiene estadísticas de tareas para un usuario"""
-        base_query = Task.query
+        """Obtiene estadísticas de tareas para un usuario
+
+        Los totales por estado y prioridad se leen de la tabla task_stats
+        (como mucho una fila por combinación). Las vencidas dependen de la
+        fecha actual y no se pueden mantener como contador, así que se
+        cuentan sólo sobre las tareas pendientes con fecha anterior a hoy.
+        """
+        counters = TaskStatsService.get_counters(user)
 
+        query = db.session.query(Task.priority, func.count(Task.id)).filter(
+            Task.status == 'pending',
+            Task.due_date < request_today()
+        )
         if user.role != 'admin':
-            base_query = base_query.filter(
-                or_(Task.created_by == user.id, Task.assigned_to == user.id)
-            )
+            query = query.filter(Task.id.in_(TaskService._accessible_task_ids(user, 'pending')))
+        overdue = dict(query.group_by(Task.priority).all())
+
+        rows = [
+            (status, priority, count, overdue.pop(priority, 0) if status == 'pending' else 0)
+            for status, priority, count in counters
+        ]
+        rows.extend(('pending', priority, 0, count) for priority, count in overdue.items())
+        return TaskService._build_statistics(rows)
 
-        total_tasks = base_query.count()
-        pending_tasks = base_query.filter(Task.status == 'pending').count()
-        completed_tasks = base_query.filter(Task.status == 'done').count()
+    @staticmethod
+    def _build_statistics(rows):
+        """Construye el diccionario de estadísticas a partir de filas
+        (status, priority, total, vencidas)"""
+        by_priority = {
+            priority: {'total': 0, 'pending': 0, 'completed': 0, 'overdue': 0}
+            for priority in TaskService.PRIORITIES
+        }
+        stats = {'total': 0, 'pending': 0, 'completed': 0, 'overdue': 0}
 
-        # Tareas vencidas
-        overdue_tasks = base_query.filter(
-            and_(
-                Task.status == 'pending',
-                Task.due_date < date.today()
+        for status, priority, count, overdue in rows:
+            overdue = overdue or 0
+            bucket = by_priority.setdefault(
+                priority, {'total': 0, 'pending': 0, 'completed': 0, 'overdue': 0}
             )
-        ).count()
+            key = {'pending': 'pending', 'done': 'completed'}.get(status)
+            for counters in (stats, bucket):
+                counters['total'] += count
+                counters['overdue'] += overdue
+                if key:
+                    counters[key] += count
 
-        return {
-            'total': total_tasks,
-            'pending': pending_tasks,
-            'completed': completed_tasks,
-            'overdue': overdue_tasks
-        }
+        stats['by_priority'] = by_priority
+        return stats
 
     @staticmethod
     def validate_task_data(title, due_date=None):
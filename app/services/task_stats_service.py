@@ -0,0 +1,170 @@
+from collections import Counter
+from sqlalchemy import event, func, insert, inspect, literal, select, union_all, update
+from app.models import Task, TaskStat
+from app import db
+
+STATS_TABLE = TaskStat.__table__
+
+
+class TaskStatsService:
+    """Mantiene la tabla task_stats sincronizada con la tabla tasks"""
+
+    @staticmethod
+    def scopes(created_by, assigned_to):
+        """Filas de contadores afectadas por una tarea"""
+        return {TaskStat.GLOBAL_SCOPE, created_by, assigned_to}
+
+    @staticmethod
+    def deltas(snapshot, delta):
+        """Convierte una instantánea (status, priority, created_by, assigned_to)
+        en cambios por clave (user_id, status, priority)"""
+        status, priority, created_by, assigned_to = snapshot
+        return Counter({
+            (user_id, status, priority): delta
+            for user_id in TaskStatsService.scopes(created_by, assigned_to)
+        })
+
+    @staticmethod
+    def apply(connection, changes):
+        """Aplica los cambios a los contadores usando la conexión de la transacción actual"""
+        for (user_id, status, priority), delta in changes.items():
+            if not delta:
+                continue
+            key = (
+                (STATS_TABLE.c.user_id == user_id)
+                & (STATS_TABLE.c.status == status)
+                & (STATS_TABLE.c.priority == priority)
+            )
+            result = connection.execute(
+                update(STATS_TABLE).where(key).values(count=STATS_TABLE.c.count + delta)
+            )
+            if result.rowcount == 0:
+                connection.execute(insert(STATS_TABLE).values(
+                    user_id=user_id, status=status, priority=priority, count=delta
+                ))
+
+    @staticmethod
+    def get_counters(user):
+        """Obtiene las filas (status, priority, count) del usuario o las globales si es admin"""
+        scope = TaskStat.GLOBAL_SCOPE if user.role == 'admin' else user.id
+        return db.session.query(
+            TaskStat.status, TaskStat.priority, TaskStat.count
+        ).filter(TaskStat.user_id == scope).all()
+
+    @staticmethod
+    def compute_from_tasks():
+        """Calcula los contadores recorriendo la tabla tasks"""
+        creator_rows = select(
+            Task.created_by.label('user_id'), Task.status, Task.priority
+        )
+        assignee_rows = select(
+            Task.assigned_to.label('user_id'), Task.status, Task.priority
+        ).where(Task.assigned_to != Task.created_by)
+        global_rows = select(
+            literal(TaskStat.GLOBAL_SCOPE).label('user_id'), Task.status, Task.priority
+        )
+        rows = union_all(creator_rows, assignee_rows, global_rows).subquery()
+
+        result = db.session.execute(
+            select(rows.c.user_id, rows.c.status, rows.c.priority, func.count())
+            .group_by(rows.c.user_id, rows.c.status, rows.c.priority)
+        )
+        return {
+            (user_id, status, priority): count
+            for user_id, status, priority, count in result
+        }
+
+    @staticmethod
+    def get_stored():
+        """Obtiene los contadores almacenados, ignorando los que están a cero"""
+        return {
+            (stat.user_id, stat.status, stat.priority): stat.count
+            for stat in TaskStat.query.filter(TaskStat.count != 0)
+        }
+
+    @staticmethod
+    def verify():
+        """Compara los contadores almacenados con los calculados
+
+        Devuelve una lista de (clave, almacenado, calculado) para cada diferencia.
+        """
+        expected = TaskStatsService.compute_from_tasks()
+        stored = TaskStatsService.get_stored()
+        return [
+            (key, stored.get(key, 0), expected.get(key, 0))
+            for key in sorted(set(expected) | set(stored), key=str)
+            if stored.get(key, 0) != expected.get(key, 0)
+        ]
+
+    @staticmethod
+    def rebuild():
+        """Reconstruye la tabla task_stats desde cero en una transacción"""
+        try:
+            counters = TaskStatsService.compute_from_tasks()
+            db.session.execute(STATS_TABLE.delete())
+            if counters:
+                db.session.execute(insert(STATS_TABLE), [
+                    {'user_id': user_id, 'status': status, 'priority': priority, 'count': count}
+                    for (user_id, status, priority), count in counters.items()
+                ])
+            db.session.commit()
+            return len(counters)
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+def _snapshot(task, previous=False):
+    """Estado de una tarea que afecta a los contadores
+
+    Con previous=True devuelve los valores anteriores a los cambios pendientes
+    del flush en curso.
+    """
+    state = inspect(task)
+    values = []
+    for name in ('status', 'priority', 'created_by', 'assigned_to'):
+        value = getattr(task, name)
+        if previous:
+            history = state.attrs[name].history
+            if history.deleted:
+                value = history.deleted[0]
+        values.append(value)
+    status, priority, created_by, assigned_to = values
+    return (status or 'pending', priority or 'medium', created_by, assigned_to)
+
+
+def _track_previous_value(target, value, oldvalue, initiator):
+    """Sin efecto; sólo fuerza a cargar el valor anterior (active_history)"""
+
+
+# Con active_history el valor anterior queda en el historial aunque el
+# atributo estuviera expirado (por ejemplo, tras un commit), y así
+# after_update puede restar la combinación antigua.
+for _attribute in (Task.status, Task.priority, Task.created_by, Task.assigned_to):
+    event.listen(_attribute, 'set', _track_previous_value, active_history=True)
+
+
+# Los eventos se ejecutan dentro del flush, por lo que los contadores se
+# actualizan en la misma transacción que la tarea (create_task, update_task,
+# toggle_task_status y delete_task quedan cubiertos sin código adicional).
+# Las sentencias que no pasan por el ORM, como toggle_task_status_by_id,
+# deben llamar a TaskStatsService.apply por su cuenta.
+@event.listens_for(Task, 'after_insert')
+def _task_inserted(mapper, connection, target):
+    TaskStatsService.apply(connection, TaskStatsService.deltas(_snapshot(target), 1))
+
+
+@event.listens_for(Task, 'after_update')
+def _task_updated(mapper, connection, target):
+    old = _snapshot(target, previous=True)
+    new = _snapshot(target)
+    if old == new:
+        return
+    changes = TaskStatsService.deltas(new, 1)
+    changes.subtract(TaskStatsService.deltas(old, 1))
+    TaskStatsService.apply(connection, changes)
+
+
+@event.listens_for(Task, 'after_delete')
+def _task_deleted(mapper, connection, target):
+    TaskStatsService.apply(connection, TaskStatsService.deltas(_snapshot(target, previous=True), -1))
@@ -0,0 +1,116 @@
+import threading
+import time
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.dialects.sqlite import insert
+from app.models import DataVersion, User
+from app import db
+
+
+class AssigneeChoicesCache:
+    """Lista (id, nombre) de usuarios asignables con número de versión
+
+    Cualquier alta, baja o cambio de nombre incrementa la versión y la lista
+    se reconstruye en la siguiente lectura. El TTL acota cuánto tarda otro
+    proceso en ver cambios hechos fuera de éste.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.version = 0
+        self._choices = None
+        self._built_version = None
+        self._expires_at = 0
+        self._lock = threading.Lock()
+
+    def get(self, loader):
+        with self._lock:
+            if self._built_version == self.version and self._expires_at > time.monotonic():
+                return self._choices
+            version = self.version
+
+        choices = loader()
+        with self._lock:
+            # Si hubo cambios mientras se cargaba, no guardar una lista ya obsoleta
+            if version == self.version:
+                self._choices = choices
+                self._built_version = version
+                self._expires_at = time.monotonic() + self.ttl
+        return choices
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self._choices = None
+
+
+class UserService:
+
+    @staticmethod
+    def get_choices_cache():
+        """Caché de opciones de asignación de la aplicación actual"""
+        cache = current_app.extensions.get('assignee_choices')
+        if cache is None:
+            cache = current_app.extensions.setdefault(
+                'assignee_choices',
+                AssigneeChoicesCache(ttl=current_app.config['ASSIGNEE_CHOICES_CACHE_TTL'])
+            )
+        return cache
+
+    @staticmethod
+    def get_assignee_choices():
+        """Lista (id, nombre) de todos los usuarios, ordenada por nombre y cacheada"""
+        def load():
+            rows = db.session.query(User.id, User.name).order_by(User.name.collate('NOCASE'), User.id)
+            return [(user_id, name) for user_id, name in rows]
+        return UserService.get_choices_cache().get(load)
+
+    @staticmethod
+    def search_assignees(prefix, limit=20):
+        """Usuarios cuyo nombre empieza por prefix (sin distinguir mayúsculas)
+
+        El LIKE con prefijo fijo se resuelve como un rango sobre idx_users_name.
+        """
+        query = db.session.query(User.id, User.name)
+        prefix = (prefix or '').strip()
+        if prefix:
+            escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query = query.filter(User.name.like(escaped + '%', escape='\\'))
+        rows = query.order_by(User.name.collate('NOCASE'), User.id).limit(limit)
+        return [{'id': user_id, 'name': name} for user_id, name in rows]
+
+    @staticmethod
+    def bump_users_version(connection):
+        """Incrementa la versión de usuarios dentro de la transacción de connection"""
+        statement = insert(DataVersion.__table__).values(name=DataVersion.USERS, version=1)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=['name'], set_={'version': DataVersion.__table__.c.version + 1}
+        ))
+
+    @staticmethod
+    def users_version():
+        """Subconsulta escalar con la versión de usuarios (0 si aún no ha cambiado)"""
+        return select(func.coalesce(func.max(DataVersion.version), 0)) \
+            .where(DataVersion.name == DataVersion.USERS).scalar_subquery()
+
+    @staticmethod
+    def invalidate_assignee_choices():
+        """Descarta la lista cacheada tras crear, renombrar o borrar usuarios"""
+        if has_app_context():
+            cache = current_app.extensions.get('assignee_choices')
+            if cache is not None:
+                cache.invalidate()
+
+
+@event.listens_for(User, 'after_insert')
+@event.listens_for(User, 'after_delete')
+def _users_changed(mapper, connection, target):
+    UserService.bump_users_version(connection)
+    UserService.invalidate_assignee_choices()
+
+
+@event.listens_for(User, 'after_update')
+def _user_updated(mapper, connection, target):
+    if inspect(target).attrs.name.history.has_changes():
+        UserService.bump_users_version(connection)
+        UserService.invalidate_assignee_choices()
@@ -0,0 +1,154 @@
+import os
+import sys
+import sysconfig
+import time
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVICES_DIR = os.path.join(APP_DIR, 'services')
+LIBRARY_DIRS = tuple({sysconfig.get_paths()[name] for name in ('stdlib', 'platstdlib', 'purelib', 'platlib')})
+
+# Sentencias cuyos parámetros no se escriben en el log
+SENSITIVE_COLUMNS = ('password_hash',)
+
+
+class QueryBudgetExceeded(Exception):
+    """Un endpoint ejecutó más sentencias SQL de las declaradas con query_budget"""
+
+
+def query_budget(max_queries):
+    """Declara el máximo de sentencias SQL que puede ejecutar una vista
+
+    Incluye todo el request (usuario de la sesión, validadores, plantilla).
+    Al superarlo se registra un aviso o, con SQL_QUERY_BUDGET_ENFORCE, falla
+    el request con QueryBudgetExceeded listando las sentencias y sus llamadores.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            return view(*args, **kwargs)
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorator
+
+
+def code_name(frame):
+    """Nombre cualificado de la función de un frame (TaskService.get_task_by_id)
+
+    co_qualname sólo existe desde Python 3.11; antes se busca la clase por el
+    self/cls del frame o, para los @staticmethod de los servicios, entre las
+    clases del módulo que definen esa función.
+    """
+    code = frame.f_code
+    qualname = getattr(code, 'co_qualname', None)
+    if qualname:
+        return qualname
+    owner = frame.f_locals.get('self', frame.f_locals.get('cls'))
+    if owner is not None:
+        owner = owner if isinstance(owner, type) else type(owner)
+        return f'{owner.__name__}.{code.co_name}'
+    for value in list(frame.f_globals.values()):
+        member = getattr(value, '__dict__', {}).get(code.co_name) if isinstance(value, type) else None
+        if getattr(getattr(member, '__func__', member), '__code__', None) is code:
+            return f'{value.__name__}.{code.co_name}'
+    return code.co_name
+
+
+def find_caller():
+    """Código que lanzó la sentencia
+
+    El método de servicio si lo hay (TaskService.get_task_by_id...); si no, la
+    primera línea de la app o, fuera de ella (tests, scripts), la primera que
+    no pertenece a una librería.
+    """
+    frame = sys._getframe(1)
+    in_app = outside = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename != __file__:
+            if filename.startswith(SERVICES_DIR):
+                return code_name(frame)
+            if in_app is None and filename.startswith(APP_DIR):
+                in_app = f'{os.path.basename(filename)}:{frame.f_lineno} {code_name(frame)}'
+            elif outside is None and not filename.startswith(LIBRARY_DIRS) and not filename.startswith('<'):
+                outside = f'{os.path.basename(filename)}:{frame.f_lineno} {code_name(frame)}'
+        frame = frame.f_back
+    return in_app or outside or '<desconocido>'
+
+
+def format_parameters(statement, parameters, executemany, limit=200):
+    """Parámetros de una sentencia para el log, acortados y sin columnas sensibles"""
+    if any(column in statement for column in SENSITIVE_COLUMNS):
+        return '<omitidos>'
+    if executemany:
+        shown = ', '.join(repr(row)[:limit] for row in list(parameters)[:3])
+        return f'[{shown}{", ..." if len(parameters) > 3 else ""}] ({len(parameters)} filas)'
+    return repr(parameters)[:limit]
+
+
+def get_request_sql():
+    """(sentencias, segundos) ejecutadas hasta ahora en el request actual"""
+    return g.get('sql_queries', 0), g.get('sql_time', 0.0)
+
+
+def _start_request():
+    g.sql_queries = 0
+    g.sql_time = 0.0
+    g.sql_log = [] if current_app.config['SQL_QUERY_BUDGET_ENFORCE'] else None
+
+
+def _check_budget(response):
+    view = current_app.view_functions.get(request.endpoint)
+    budget = getattr(view, 'query_budget', None)
+    queries = g.get('sql_queries', 0)
+    if budget is None or queries <= budget:
+        return response
+
+    message = f'{request.endpoint} ejecutó {queries} sentencias SQL (presupuesto: {budget})'
+    if g.get('sql_log') is not None:
+        details = '\n'.join(f'  {caller}: {statement}' for caller, statement in g.sql_log)
+        raise QueryBudgetExceeded(f'{message}\n{details}')
+    current_app.logger.warning(message)
+    return response
+
+
+def init_sql_monitor(app, engine):
+    """Cuenta y cronometra las sentencias de cada request y registra las lentas
+
+    Las sentencias que superan SQL_SLOW_QUERY_MS se escriben en el log con
+    sus parámetros y el método de servicio que las lanzó. Las vistas
+    decoradas con query_budget se comprueban al terminar el request.
+    """
+    if not app.config['SQL_MONITOR_ENABLED']:
+        return
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started_at'].pop()
+        in_request = has_request_context() and 'sql_queries' in g
+        if in_request:
+            g.sql_queries += 1
+            g.sql_time += elapsed
+            if g.sql_log is not None:
+                g.sql_log.append((find_caller(), statement))
+        if elapsed * 1000 >= app.config['SQL_SLOW_QUERY_MS']:
+            app.logger.warning(
+                'Consulta lenta (%.1f ms) en %s%s: %s | parámetros: %s',
+                elapsed * 1000, find_caller(), f' [{request.endpoint}]' if in_request else '',
+                ' '.join(statement.split()), format_parameters(statement, parameters, executemany)
+            )
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(context):
+        started = context.connection.info.get('query_started_at') if context.connection else None
+        if started:
+            started.pop()
+
+    app.before_request(_start_request)
+    app.after_request(_check_budget)
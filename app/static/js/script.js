@@ -307,6 +307,55 @@ function initAutoSave() {
 // Initialize auto-save when DOM is loaded
 document.addEventListener('DOMContentLoaded', initAutoSave);
 
+// Assignee typeahead: the select only ships the selected user and is
+// filled from the JSON search endpoint as the admin types
+function initAssigneeTypeahead() {
+    var selects = document.querySelectorAll('select[data-typeahead-url]');
+    selects.forEach(function(select) {
+        var input = document.createElement('input');
+        input.type = 'search';
+        input.className = 'form-control form-control-sm mb-1';
+        input.placeholder = 'Buscar usuario...';
+        select.parentNode.insertBefore(input, select);
+
+        var searchTimeout;
+        var loadUsers = function() {
+            var url = select.dataset.typeaheadUrl + '?q=' + encodeURIComponent(input.value);
+            fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) {
+                        return;
+                    }
+                    // Keep the empty option and the current selection
+                    Array.from(select.options).forEach(function(option) {
+                        if (option.value !== '' && option.value !== 'None' && !option.selected) {
+                            option.remove();
+                        }
+                    });
+                    data.users.forEach(function(user) {
+                        if (!select.querySelector(`option[value="${user.id}"]`)) {
+                            select.add(new Option(user.name, user.id));
+                        }
+                    });
+                })
+                .catch(error => console.error('Error loading users:', error));
+        };
+
+        input.addEventListener('input', function() {
+            clearTimeout(searchTimeout);
+            searchTimeout = setTimeout(loadUsers, 250);
+        });
+        select.addEventListener('focus', function() {
+            if (select.options.length <= 2) {
+                loadUsers();
+            }
+        }, { once: true });
+    });
+}
+
+document.addEventListener('DOMContentLoaded', initAssigneeTypeahead);
+
 // Export functionality
 function exportTasks(format) {
     var url = `/tasks/export?format=${format}`;
@@ -1,14 +1,20 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, session, jsonify
+from flask import (Blueprint, render_template, request, flash, redirect, url_for, session, jsonify,
+                   current_app, g, make_response, Response, stream_with_context)
+from app.fragment_cache import cached_fragment, render_fragment
+from app.http_cache import add_validators, compute_etag, not_modified_response
 from app.forms import TaskForm, TaskFilterForm
+from app.services.bulk_task_service import BULK_ACTIONS, BulkTaskService
+from app.services.export_service import ExportService
 from app.services.task_service import TaskService
-from app.models import User, Task
-from datetime import datetime
+from app.read_models import request_today
+from app.sql_monitor import query_budget
 
 tasks_bp = Blueprint('tasks', __name__)
 
 def require_login():
     """Decorator para requerir autenticación"""
-    if 'user_id' not in session:
+    if g.user is None:
+        session.clear()
         flash('Debes iniciar sesión para acceder a esta página.', 'error')
         return redirect(url_for('auth.login'))
     return None
@@ -20,41 +26,109 @@ def before_request():
     if redirect_response:
         return redirect_response
 
-@tasks_bp.route('/')
-def list_tasks():
-    user = User.query.get(session['user_id'])
-    filter_form = TaskFilterForm(current_user=user)
-
-    # Obtener filtros de la URL
+def get_filters_from_request():
+    """Obtiene los filtros del listado a partir de los parámetros de la URL"""
     filters = {}
-    if request.args.get('search'):
-        filters['search'] = request.args.get('search')
-        filter_form.search.data = filters['search']
-
-    if request.args.get('status'):
-        filters['status'] = request.args.get('status')
-        filter_form.status.data = filters['status']
-
-    if request.args.get('priority'):
-        filters['priority'] = request.args.get('priority')
-        filter_form.priority.data = filters['priority']
+    for name in ('search', 'status', 'priority'):
+        if request.args.get(name):
+            filters[name] = request.args.get(name)
 
     assigned_to_param = request.args.get('assigned_to')
     if assigned_to_param and assigned_to_param.isdigit():
-        try:
-            filters['assigned_to'] = int(assigned_to_param)
-            filter_form.assigned_to.data = filters['assigned_to']
-        except (ValueError, TypeError):
-            pass
+        filters['assigned_to'] = int(assigned_to_param)
+
+    return filters
+
+def get_per_page_from_request():
+    """Tamaño de página configurable, limitado por TASKS_MAX_PER_PAGE"""
+    per_page = current_app.config['TASKS_PER_PAGE']
+    per_page_param = request.args.get('per_page')
+    if per_page_param and per_page_param.isdigit() and int(per_page_param) > 0:
+        per_page = min(int(per_page_param), current_app.config['TASKS_MAX_PER_PAGE'])
+    return per_page
+
+def task_row_fragment(task, user):
+    """Fila del listado ya renderizada, reutilizada mientras la tarea no cambie
+
+    La clave incluye la versión de la tarea (updated_at), el rol y los
+    permisos del usuario sobre ella, y lo que cambia sin tocar updated_at:
+    el vencimiento, el nombre del asignado y el fragmento de búsqueda.
+    """
+    can_edit = task.created_by == user.id or user.role == 'admin'
+    is_assignee = task.assignee.id == user.id
+    key = (task.id, task.updated_at, user.role, can_edit, is_assignee,
+           task.overdue, task.assignee.name, task.search_snippet)
+    return cached_fragment(
+        'task_row', key,
+        lambda: render_fragment('tasks/_task_row.html', task=task, can_edit=can_edit, is_assignee=is_assignee),
+        tags=(f'task:{task.id}',)
+    )
 
-    # Obtener tareas con filtros
-    tasks = TaskService.get_user_tasks(user, filters)
+@tasks_bp.route('/')
+@query_budget(4)
+def list_tasks():
+    user = g.user
+
+    # Si nada ha cambiado desde la última visita, responder 304 sin renderizar
+    count, last_modified, users_version = TaskService.get_tasks_version(user)
+    etag = compute_etag(
+        'tasks.list', user.id, user.role, session.get('user_name'), request_today(),
+        count, last_modified, users_version, sorted(request.args.items(multi=True))
+    )
+    not_modified = not_modified_response(etag, last_modified)
+    if not_modified:
+        return not_modified
 
-    return render_template('tasks/list.html', tasks=tasks, filter_form=filter_form, user=user)
+    filter_form = TaskFilterForm(current_user=user)
+
+    # Obtener filtros de la URL
+    filters = get_filters_from_request()
+    for name, value in filters.items():
+        getattr(filter_form, name).data = value
+
+    # Obtener una página de tareas con filtros
+    page = TaskService.paginate_user_tasks(
+        user, filters,
+        cursor=request.args.get('cursor'),
+        per_page=get_per_page_from_request(),
+        read_only=True
+    )
+
+    # Parámetros a conservar en los enlaces de paginación
+    page_args = {key: value for key, value in request.args.items() if key != 'cursor' and value}
+
+    task_rows = [task_row_fragment(task, user) for task in page['items']]
+
+    response = make_response(render_template('tasks/list.html', tasks=page['items'], task_rows=task_rows,
+                                             page=page, page_args=page_args, filter_form=filter_form,
+                                             user=user, bulk_actions=BULK_ACTIONS))
+    return add_validators(response, etag, last_modified)
+
+@tasks_bp.route('/export.csv')
+def export_tasks_csv():
+    user = g.user
+    chunks = ExportService.iter_csv(
+        user, get_filters_from_request(),
+        batch_size=current_app.config['TASKS_EXPORT_BATCH_SIZE']
+    )
+    return Response(stream_with_context(chunks), mimetype='text/csv', headers={
+        'Content-Disposition': 'attachment; filename=tareas.csv'
+    })
+
+@tasks_bp.route('/export.ndjson')
+def export_tasks_ndjson():
+    user = g.user
+    chunks = ExportService.iter_ndjson(
+        user, get_filters_from_request(),
+        batch_size=current_app.config['TASKS_EXPORT_BATCH_SIZE']
+    )
+    return Response(stream_with_context(chunks), mimetype='application/x-ndjson', headers={
+        'Content-Disposition': 'attachment; filename=tareas.ndjson'
+    })
 
 @tasks_bp.route('/new', methods=['GET', 'POST'])
 def create_task():
-    user = User.query.get(session['user_id'])
+    user = g.user
     form = TaskForm(current_user=user)
 
     if form.validate_on_submit():
@@ -89,7 +163,7 @@ def create_task():
 
 @tasks_bp.route('/<int:task_id>/edit', methods=['GET', 'POST'])
 def edit_task(task_id):
-    user = User.query.get(session['user_id'])
+    user = g.user
     task = TaskService.get_task_by_id(task_id, user)
 
     if not task:
@@ -131,7 +205,7 @@ def edit_task(task_id):
 
 @tasks_bp.route('/<int:task_id>/delete', methods=['POST'])
 def delete_task(task_id):
-    user = User.query.get(session['user_id'])
+    user = g.user
     task = TaskService.get_task_by_id(task_id, user)
 
     if not task:
@@ -149,31 +223,88 @@ def delete_task(task_id):
 
 @tasks_bp.route('/<int:task_id>/toggle', methods=['POST'])
 def toggle_task(task_id):
-    user = User.query.get(session['user_id'])
-    task = TaskService.get_task_by_id(task_id, user)
+    user = g.user
+    new_status, error = TaskService.toggle_task_status_by_id(task_id, user)
 
-    if not task:
+    if new_status is None and error is None:
         return jsonify({'success': False, 'message': 'Tarea no encontrada'}), 404
 
-    success, message = TaskService.toggle_task_status(task)
+    success = new_status is not None
+    message = f"Tarea marcada como {new_status}" if success else error
 
     if request.headers.get('Content-Type') == 'application/json':
         return jsonify({
             'success': success,
             'message': message,
-            'new_status': task.status if success else None
+            'new_status': new_status
         })
 
     flash(message, 'success' if success else 'error')
     return redirect(url_for('tasks.list_tasks'))
 
+@tasks_bp.route('/bulk', methods=['POST'])
+def bulk_tasks():
+    """Aplica una acción a varias tareas (formulario del listado o JSON)
+
+    JSON: {"ids": [1, 2], "action": "priority", "value": "high"}. En el
+    formulario los ids llegan como task_ids y el valor en el campo de la
+    acción (priority o assigned_to).
+    """
+    user = g.user
+    if request.is_json:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'message': 'Se esperaba un objeto JSON'}), 400
+        task_ids, action, value = data.get('ids'), data.get('action'), data.get('value')
+    else:
+        task_ids = request.form.getlist('task_ids')
+        action = request.form.get('action')
+        value = request.form.get({'priority': 'priority', 'reassign': 'assigned_to'}.get(action, 'value'))
+
+    if task_ids is not None and not isinstance(task_ids, list):
+        task_ids = [task_ids]
+    task_ids, value, errors = BulkTaskService.validate(
+        user, action, task_ids, value, max_ids=current_app.config['TASKS_BULK_MAX']
+    )
+
+    report, error = (None, None) if errors else BulkTaskService.execute(user, action, task_ids, value)
+
+    if request.is_json:
+        if errors:
+            return jsonify({'success': False, 'message': 'Operación masiva inválida', 'errors': errors}), 400
+        if error:
+            return jsonify({'success': False, 'message': error}), 500
+        return jsonify({'success': True, **report})
+
+    if errors or error:
+        for message in errors or [error]:
+            flash(message, 'error')
+    else:
+        skipped = len(report['results']) - report['processed']
+        message = f"{BULK_ACTIONS[action]}: {report['processed']} tarea(s) procesada(s)."
+        if skipped:
+            message += f' {skipped} omitida(s) por no existir o no tener permisos.'
+        flash(message, 'success' if report['processed'] else 'warning')
+    return redirect(url_for('tasks.list_tasks', **request.args))
+
 @tasks_bp.route('/<int:task_id>')
+@query_budget(2)
 def view_task(task_id):
-    user = User.query.get(session['user_id'])
-    task = TaskService.get_task_by_id(task_id, user)
+    user = g.user
+    task = TaskService.get_task_by_id(task_id, user, eager=True)
 
     if not task:
         flash('Tarea no encontrada o no tienes permisos para verla.', 'error')
         return redirect(url_for('tasks.list_tasks'))
 
-    return render_template('tasks/detail.html', task=task, user=user)
\ No newline at end of file
+    # Los nombres de creador y asignado ya están cargados (eager) y pueden cambiar sin tocar la tarea
+    etag = compute_etag(
+        'tasks.view', task.id, task.updated_at, user.id, user.role,
+        session.get('user_name'), request_today(), task.creator.name, task.assignee.name
+    )
+    not_modified = not_modified_response(etag, task.updated_at)
+    if not_modified:
+        return not_modified
+
+    response = make_response(render_template('tasks/detail.html', task=task, user=user))
+    return add_validators(response, etag, task.updated_at)
\ No newline at end of file
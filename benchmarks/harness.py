@@ -0,0 +1,169 @@
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import time
+import tracemalloc
+from datetime import date
+from sqlalchemy import event
+from app import create_app, db
+from app.services.seed_service import SeedService
+
+# Fecha base fija: con la misma semilla todos los datasets son idénticos entre ejecuciones
+BASE_DATE = date(2024, 1, 1)
+SEED = 1234
+
+
+def percentile(samples, fraction):
+    """Percentil por interpolación lineal entre las muestras ordenadas"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def dataset_path(data_dir, tasks):
+    return os.path.join(data_dir, f'tasks-{tasks}-seed{SEED}.db')
+
+
+def users_for(tasks):
+    """Usuarios del dataset: uno por cada 100 tareas, entre 10 y 5000"""
+    return max(10, min(5000, tasks // 100))
+
+
+def ensure_dataset(data_dir, tasks, log=print):
+    """Crea (una sola vez) el dataset sembrado de tasks tareas y devuelve su ruta"""
+    path = dataset_path(data_dir, tasks)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(data_dir, exist_ok=True)
+    partial = path + '.partial'
+    if os.path.exists(partial):
+        os.remove(partial)
+    log(f'Generando dataset de {tasks} tareas en {path}...')
+    app = create_benchmark_app(partial)
+    with app.app_context():
+        SeedService.seed(users_for(tasks), tasks, 'benchmark', seed=SEED, base_date=BASE_DATE)
+        db.session.remove()
+        db.engine.dispose()
+    os.replace(partial, path)
+    return path
+
+
+def working_copy(path, work_dir):
+    """Copia del dataset sobre la que se ejecutan los casos (las escrituras no lo alteran)"""
+    os.makedirs(work_dir, exist_ok=True)
+    copy = os.path.join(work_dir, os.path.basename(path))
+    shutil.copyfile(path, copy)
+    return copy
+
+
+def create_benchmark_app(path):
+    """App con la configuración de producción (BenchmarkConfig) sobre el dataset de path
+
+    El hashing se hace en línea: PASSWORD_HASH_WORKERS tiene que valer 0 antes
+    de create_app, que es cuando se construye el hasher. Con millones de filas
+    muchas consultas superan el umbral de consulta lenta, así que el log
+    queda en ERROR.
+    """
+    return create_app(config_name='benchmark', database_uri='sqlite:///' + os.path.abspath(path))
+
+
+class QueryCounter:
+    """Cuenta las sentencias ejecutadas por el motor mientras está activo"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'after_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'after_cursor_execute', self._count)
+
+
+def measure(engine, func, repeat, warmup=1):
+    """Ejecuta func warmup + repeat veces; devuelve percentiles, consultas y memoria pico
+
+    Los tiempos se toman sin tracemalloc (que ralentiza la asignación de
+    memoria); la memoria pico se mide en una ejecución adicional.
+    """
+    for _ in range(warmup):
+        func()
+
+    durations = []
+    with QueryCounter(engine) as counter:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            durations.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'p50_ms': round(percentile(durations, 0.50), 3),
+        'p95_ms': round(percentile(durations, 0.95), 3),
+        'p99_ms': round(percentile(durations, 0.99), 3),
+        'queries': round(counter.count / repeat, 2),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'machine': platform.machine(),
+    }
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as stream:
+        return json.load(stream)
+
+
+def save_baseline(path, results):
+    with open(path, 'w', encoding='utf-8') as stream:
+        json.dump({'environment': environment(), 'results': results}, stream, indent=2, sort_keys=True)
+        stream.write('\n')
+
+
+def compare(results, baseline, threshold=0.5, min_delta_ms=2.0):
+    """Regresiones respecto a la línea base
+
+    Un caso empeora si su p50 supera el de la línea base en más de threshold
+    (y en más de min_delta_ms, para ignorar ruido en casos de microsegundos)
+    o si ejecuta más consultas que entonces. Se compara la mediana y no el
+    p95 porque con pocas repeticiones la cola depende demasiado de la carga
+    de la máquina. Devuelve una lista de mensajes.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        limit = previous['p50_ms'] * (1 + threshold)
+        if result['p50_ms'] > limit and result['p50_ms'] - previous['p50_ms'] > min_delta_ms:
+            regressions.append(
+                f"{name}: p50 {result['p50_ms']:.2f} ms > {previous['p50_ms']:.2f} ms (+{threshold:.0%})"
+            )
+        if result['queries'] > previous['queries']:
+            regressions.append(f"{name}: {result['queries']} consultas > {previous['queries']}")
+    return regressions
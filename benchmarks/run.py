@@ -0,0 +1,162 @@
+"""Benchmarks de TaskService y de las páginas principales
+
+    python -m benchmarks.run                       # 10k, 100k y 1M tareas
+    python -m benchmarks.run --sizes 10k --repeat 50
+    python -m benchmarks.run --save-baseline       # fijar la línea base actual
+
+Cada tamaño usa un dataset sembrado con SeedService (se genera la primera vez
+en benchmarks/data/) y los casos se ejecutan sobre una copia. Termina con
+código 1 si algún caso empeora respecto a benchmarks/baseline.json.
+"""
+import argparse
+import os
+import shutil
+import sys
+from itertools import count
+from app import db
+from app.models import Task, User
+from app.services.task_service import TaskService
+from benchmarks.harness import (BASE_DATE, compare, create_benchmark_app, ensure_dataset, load_baseline,
+                                measure, save_baseline, working_copy)
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+DEFAULT_DATA_DIR = os.path.join(BENCHMARKS_DIR, 'data')
+
+FILTERS = {
+    'none': {},
+    'status': {'status': 'pending'},
+    'priority': {'priority': 'high'},
+    'search': {'search': 'informe'},
+    'assigned_to': None,  # se completa con el propio usuario
+    'due_range': {'due_from': BASE_DATE, 'due_to': BASE_DATE.replace(month=2)},
+    'combined': {'status': 'pending', 'priority': 'high', 'search': 'revisar'},
+}
+
+
+def parse_size(value):
+    """'10k' -> 10000, '1m' -> 1000000"""
+    value = value.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(value[-1:], 1)
+    return int(float(value.rstrip('km')) * multiplier)
+
+
+def pick_user():
+    """Usuario representativo: el décimo con más tareas creadas (no el más cargado)"""
+    ranked = db.session.query(Task.created_by, db.func.count()) \
+        .group_by(Task.created_by).order_by(db.func.count().desc()).limit(10).all()
+    return db.session.get(User, ranked[-1][0])
+
+
+def service_cases(user, admin, task):
+    """(nombre, función) de los casos de TaskService; se ejecutan en el contexto de la app"""
+    cases = []
+    for name, filters in FILTERS.items():
+        filters = {'assigned_to': user.id} if filters is None else filters
+        cases.append((f'get_user_tasks[{name}]',
+                      lambda filters=filters: TaskService.get_user_tasks(user, filters)))
+    cases.append(('get_task_statistics[user]', lambda: TaskService.get_task_statistics(user)))
+    cases.append(('get_task_statistics[admin]', lambda: TaskService.get_task_statistics(admin)))
+
+    numbers = count()
+    cases.append(('create_task', lambda: TaskService.create_task(
+        f'Benchmark {next(numbers)}', 'Tarea creada por el benchmark', 'medium', None, user.id, user.id
+    )))
+    cases.append(('toggle_task_status', lambda: TaskService.toggle_task_status(task)))
+    return cases
+
+
+def request_cases(client, task_id):
+    """(nombre, función) de las peticiones completas con el cliente de pruebas
+
+    Se ejecutan fuera de cualquier contexto de aplicación, de modo que cada
+    petición tiene su propio g como en producción.
+    """
+    def get(url):
+        def request():
+            response = client.get(url)
+            assert response.status_code == 200, f'{url}: {response.status_code}'
+        return request
+
+    return [
+        ('GET /', get('/')),
+        ('GET /tasks/', get('/tasks/')),
+        ('GET /tasks/<id>', get(f'/tasks/{task_id}')),
+    ]
+
+
+def run_size(tasks, data_dir, repeat, only=None, log=print):
+    """Ejecuta los casos sobre el dataset de tasks tareas; devuelve {nombre: resultado}"""
+    path = working_copy(ensure_dataset(data_dir, tasks, log=log), os.path.join(data_dir, 'work'))
+    app = create_benchmark_app(path)
+    results = {}
+
+    def run(cases):
+        for name, func in cases:
+            if only and only not in name:
+                continue
+            results[f'{tasks}/{name}'] = result = measure(engine, func, repeat)
+            log(f"{tasks:>8} {name:<32} p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  "
+                f"p99 {result['p99_ms']:>9.2f} ms  {result['queries']:>5} q  {result['peak_kib']:>9.1f} KiB")
+
+    try:
+        with app.app_context():
+            engine = db.engine
+            user = pick_user()
+            admin = User.query.filter_by(role='admin').first()
+            task = Task.query.filter(Task.created_by == user.id).order_by(Task.id).first()
+            session_values = {'user_id': user.id, 'user_name': user.name, 'user_role': user.role}
+            run(service_cases(user, admin, task))
+            task_id = task.id
+            db.session.remove()
+
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session.update(session_values)
+        run(request_cases(client, task_id))
+        with app.app_context():
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks de TaskService y endpoints principales')
+    parser.add_argument('--sizes', default='10k,100k,1m', help='Tamaños de dataset separados por comas')
+    parser.add_argument('--repeat', type=int, default=20, help='Mediciones por caso')
+    parser.add_argument('--only', help='Ejecutar sólo los casos cuyo nombre contenga este texto')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='Directorio de los datasets generados')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Fichero JSON de la línea base')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='Empeoramiento relativo del p50 tolerado (0.5 = 50%%)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Guardar los resultados como nueva línea base en lugar de comparar')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for size in args.sizes.split(','):
+        results.update(run_size(parse_size(size), args.data_dir, args.repeat, args.only))
+
+    if args.save_baseline:
+        baseline = load_baseline(args.baseline) or {}
+        merged = dict(baseline.get('results', {}), **results)
+        save_baseline(args.baseline, merged)
+        print(f'Línea base guardada en {args.baseline} ({len(results)} casos)')
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f'Sin línea base en {args.baseline}; usa --save-baseline para crearla')
+        return 0
+
+    regressions = compare(results, baseline['results'], args.threshold)
+    for message in regressions:
+        print(f'REGRESIÓN {message}')
+    if not regressions:
+        print(f'Sin regresiones respecto a {args.baseline}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
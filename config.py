@@ -9,8 +9,83 @@ class Config:
     PERMANENT_SESSION_LIFETIME = timedelta(hours=2)
     WTF_CSRF_ENABLED = True
     WTF_CSRF_TIME_LIMIT = None
+    TASKS_PER_PAGE = int(os.environ.get('TASKS_PER_PAGE', 20))
+    TASKS_MAX_PER_PAGE = 100
+    TASKS_EXPORT_BATCH_SIZE = 1000  # filas por lote al exportar (yield_per)
+    TASKS_BULK_MAX = 500  # tareas por operación masiva
+    TASKS_IMPORT_CHUNK_SIZE = 1000  # filas por executemany/commit al importar
+    TASKS_IMPORT_MAX_ERRORS = 100  # errores detallados en el informe de importación
+    TASK_SEARCH_FTS = True  # usar SQLite FTS5 para la búsqueda si está disponible
+    SQLITE_PRAGMAS = {}  # PRAGMAs aplicados a cada conexión SQLite nueva
+    CURRENT_USER_CACHE_SIZE = 1024  # usuarios cacheados por proceso
+    CURRENT_USER_CACHE_TTL = 60  # segundos
+    ASSIGNEE_CHOICES_CACHE_TTL = 300  # segundos que se reutiliza la lista de usuarios asignables
+    ASSIGNEE_SEARCH_LIMIT = 20  # resultados máximos de la búsqueda de usuarios
+    FRAGMENT_CACHE_ENABLED = True  # caché de filas del listado y panel del dashboard ya renderizados
+    FRAGMENT_CACHE_SIZE = 5000  # fragmentos cacheados por proceso (LRU)
+    # Hash de contraseñas: método de werkzeug y pool de procesos (0 = en línea)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+    PASSWORD_HASH_TIMEOUT = 5  # segundos de espera por un hueco en la cola y por el resultado
+    # Límite de intentos de login (cubos de tokens): ráfaga máxima e intentos recuperados por minuto
+    LOGIN_RATE_LIMIT_ENABLED = True
+    LOGIN_RATE_LIMIT_IP_BURST = 20
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE = 10
+    LOGIN_RATE_LIMIT_EMAIL_BURST = 5  # por email y IP
+    LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE = 2
+    LOGIN_RATE_LIMIT_EMAIL_GLOBAL_BURST = 50  # por email, sumando todas las IPs
+    LOGIN_RATE_LIMIT_EMAIL_GLOBAL_PER_MINUTE = 20
+    LOGIN_RATE_LIMIT_MAX_KEYS = 10000  # claves (IP o email) recordadas por proceso
+    LOGIN_RATE_LIMIT_STORAGE = os.environ.get('LOGIN_RATE_LIMIT_STORAGE')  # fichero SQLite compartido entre workers
+    # Proxies inversos de confianza delante de la app: con N > 0 la IP del cliente
+    # (límite de login, logs) se toma del X-Forwarded-For que añadieron (ProxyFix)
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    METRICS_ENABLED = True  # métricas por endpoint en /metrics (formato Prometheus)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # si se define, /metrics exige 'Authorization: Bearer <token>'
+    # Instrumentación SQL: sentencias por request, log de consultas lentas y presupuestos por vista
+    SQL_MONITOR_ENABLED = True
+    SQL_SLOW_QUERY_MS = int(os.environ.get('SQL_SLOW_QUERY_MS', 200))
+    SQL_QUERY_BUDGET_ENFORCE = False  # True: superar el presupuesto de query_budget hace fallar el request
+    LOG_LEVEL = None
+
+class ProductionConfig(Config):
+    DEBUG = False
+    LOG_LEVEL = 'INFO'
+    # WAL permite lecturas concurrentes con una escritura y busy_timeout
+    # espera al bloqueo en lugar de fallar con "database is locked"
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),
+        'synchronous': 'NORMAL',
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'cache_size': -64000,  # negativo = KiB (64 MB)
+        'temp_store': 'MEMORY',
+    }
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('SQLALCHEMY_POOL_SIZE', 10)),
+        'max_overflow': 20,
+        'pool_timeout': 30,
+        'pool_recycle': 3600,
+        'pool_pre_ping': True,
+    }
 
 class TestConfig(Config):
     TESTING = True
     WTF_CSRF_ENABLED = False
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
\ No newline at end of file
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    PASSWORD_HASH_WORKERS = 0
+    SQL_QUERY_BUDGET_ENFORCE = True
+
+class BenchmarkConfig(ProductionConfig):
+    """Producción para python -m benchmarks.run: hashing en línea y sin logs de consultas lentas"""
+    PASSWORD_HASH_WORKERS = 0
+    LOG_LEVEL = 'ERROR'
+
+config_by_name = {
+    'development': Config,
+    'production': ProductionConfig,
+    'testing': TestConfig,
+    'benchmark': BenchmarkConfig,
+}
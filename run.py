@@ -1,6 +1,9 @@
 from app import create_app
 
-app = create_app()
+# Los procesos de hashing de contraseñas (multiprocessing con spawn) vuelven a
+# importar este módulo como __mp_main__: sólo el proceso principal crea la app
+if __name__ != '__mp_main__':
+    app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5000)
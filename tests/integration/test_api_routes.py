@@ -0,0 +1,240 @@
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import event
+from app.models import Task
+from app import db
+
+
+def add_task(user, title, **kwargs):
+    values = dict(title=title, created_by=user.id, assigned_to=user.id,
+                  priority='medium', status='pending')
+    values.update(kwargs)
+    task = Task(**values)
+    db.session.add(task)
+    db.session.commit()
+    return task.id
+
+
+class TestTaskApi:
+    """Test cases for the /api/v1 task endpoints."""
+
+    def test_requires_login(self, client):
+        """Test the API answers 401 JSON without a session."""
+        response = client.get('/api/v1/tasks')
+        assert response.status_code == 401
+        assert response.get_json()['success'] is False
+
+    def test_list_tasks_full_fields(self, authenticated_client, app, regular_user, second_user):
+        """Test listing returns every field for the user's tasks only."""
+        with app.app_context():
+            add_task(regular_user, 'Mine', description='desc', assigned_to=second_user.id,
+                     due_date=date.today() - timedelta(days=1))
+            add_task(second_user, 'Other')
+
+        response = authenticated_client.get('/api/v1/tasks')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [task['title'] for task in data['tasks']] == ['Mine']
+
+        task = data['tasks'][0]
+        assert task['creator_name'] == 'User Test'
+        assert task['assignee_name'] == 'User Two'
+        assert task['is_overdue'] is True
+        assert task['due_date'] == (date.today() - timedelta(days=1)).isoformat()
+
+    def test_list_tasks_sparse_fieldset(self, authenticated_client, app, regular_user):
+        """Test ?fields= only returns and selects the requested columns."""
+        with app.app_context():
+            add_task(regular_user, 'Sparse', description='very long text')
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = authenticated_client.get('/api/v1/tasks?fields=title,status')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+        assert response.status_code == 200
+        assert response.get_json()['tasks'] == [{'title': 'Sparse', 'status': 'pending'}]
+
+        task_selects = [s for s in statements if 'FROM tasks' in s and 'task_stats' not in s]
+        assert task_selects
+        assert all('tasks.description' not in s for s in task_selects)
+        assert all('JOIN users' not in s for s in task_selects)
+
+    def test_list_tasks_unknown_field(self, authenticated_client):
+        """Test unknown fields are rejected."""
+        response = authenticated_client.get('/api/v1/tasks?fields=title,password_hash')
+        assert response.status_code == 400
+        assert 'password_hash' in response.get_json()['message']
+
+    def test_list_tasks_cursor_pagination(self, authenticated_client, app, regular_user):
+        """Test the API pages through tasks with cursors."""
+        with app.app_context():
+            ids = [add_task(regular_user, f'Page {i}') for i in range(5)]
+
+        seen = []
+        url = '/api/v1/tasks?fields=id&per_page=2'
+        while url:
+            data = authenticated_client.get(url).get_json()
+            seen.extend(task['id'] for task in data['tasks'])
+            url = f"/api/v1/tasks?fields=id&per_page=2&cursor={data['next_cursor']}" if data['next_cursor'] else None
+
+        assert seen == list(reversed(ids))
+
+    def test_get_task(self, authenticated_client, app, regular_user, second_user):
+        """Test getting a single task and hiding other users' tasks."""
+        with app.app_context():
+            mine = add_task(regular_user, 'Detail')
+            other = add_task(second_user, 'Hidden')
+
+        response = authenticated_client.get(f'/api/v1/tasks/{mine}?fields=id,title')
+        assert response.status_code == 200
+        assert response.get_json()['task'] == {'id': mine, 'title': 'Detail'}
+
+        response = authenticated_client.get(f'/api/v1/tasks/{other}')
+        assert response.status_code == 404
+        assert response.get_json()['success'] is False
+
+    def test_create_task(self, authenticated_client, app, regular_user, second_user):
+        """Test creating a task; regular users can only assign themselves."""
+        due_date = (date.today() + timedelta(days=3)).isoformat()
+        response = authenticated_client.post('/api/v1/tasks', json={
+            'title': 'From API',
+            'priority': 'high',
+            'due_date': due_date,
+            'assigned_to': second_user.id
+        })
+
+        assert response.status_code == 201
+        task = response.get_json()['task']
+        assert task['title'] == 'From API'
+        assert task['priority'] == 'high'
+        assert task['due_date'] == due_date
+        assert task['assigned_to'] == regular_user.id
+
+    def test_create_task_validation(self, authenticated_client):
+        """Test invalid payloads return 400 with the validation errors."""
+        response = authenticated_client.post('/api/v1/tasks', json={
+            'title': '',
+            'priority': 'urgent'
+        })
+        assert response.status_code == 400
+        assert 'La prioridad debe ser low, medium o high' in response.get_json()['errors']
+
+        response = authenticated_client.post('/api/v1/tasks', json={'title': 'x', 'due_date': '31/12/2030'})
+        assert response.status_code == 400
+
+        response = authenticated_client.post('/api/v1/tasks', data='not json')
+        assert response.status_code == 400
+
+    def test_admin_assigns_task(self, admin_client, regular_user):
+        """Test admins can assign tasks to other users."""
+        response = admin_client.post('/api/v1/tasks', json={
+            'title': 'Assigned by admin',
+            'assigned_to': regular_user.id
+        })
+        assert response.status_code == 201
+        assert response.get_json()['task']['assignee_name'] == 'User Test'
+
+    def test_update_task_partial(self, authenticated_client, app, regular_user):
+        """Test PATCH keeps fields that are not sent."""
+        with app.app_context():
+            task_id = add_task(regular_user, 'Before', description='keep me', priority='low')
+
+        response = authenticated_client.patch(f'/api/v1/tasks/{task_id}', json={'title': 'After'})
+        assert response.status_code == 200
+        task = response.get_json()['task']
+        assert task['title'] == 'After'
+        assert task['description'] == 'keep me'
+        assert task['priority'] == 'low'
+
+    def test_update_task_rejects_non_string_fields(self, authenticated_client, app, regular_user):
+        """Test non-string titles and descriptions are rejected instead of coerced."""
+        with app.app_context():
+            task_id = add_task(regular_user, 'Typed', description='keep me')
+
+        response = authenticated_client.patch(f'/api/v1/tasks/{task_id}', json={'title': 123})
+        assert response.status_code == 400
+        assert 'El título debe ser un texto' in response.get_json()['errors']
+
+        response = authenticated_client.patch(f'/api/v1/tasks/{task_id}', json={'description': 5})
+        assert response.status_code == 400
+        assert 'La descripción debe ser un texto' in response.get_json()['errors']
+
+        response = authenticated_client.post('/api/v1/tasks', json={'title': ['a'], 'description': {}})
+        assert response.status_code == 400
+        assert len(response.get_json()['errors']) == 2
+
+        task = authenticated_client.get(f'/api/v1/tasks/{task_id}').get_json()['task']
+        assert (task['title'], task['description']) == ('Typed', 'keep me')
+
+    def test_toggle_task(self, authenticated_client, app, regular_user):
+        """Test toggling a task through the API."""
+        with app.app_context():
+            task_id = add_task(regular_user, 'Toggle me')
+
+        response = authenticated_client.post(f'/api/v1/tasks/{task_id}/toggle')
+        assert response.status_code == 200
+        assert response.get_json()['new_status'] == 'done'
+
+    def test_delete_task_permissions(self, authenticated_client, app, regular_user, second_user):
+        """Test only the creator (or an admin) can delete a task."""
+        with app.app_context():
+            assigned = add_task(second_user, 'Assigned to me', assigned_to=regular_user.id)
+            mine = add_task(regular_user, 'Delete me')
+
+        response = authenticated_client.delete(f'/api/v1/tasks/{assigned}')
+        assert response.status_code == 403
+
+        response = authenticated_client.delete(f'/api/v1/tasks/{mine}')
+        assert response.status_code == 200
+        with app.app_context():
+            assert db.session.get(Task, mine) is None
+
+    def test_search_users_admin_only(self, authenticated_client):
+        """Test regular users cannot list users."""
+        response = authenticated_client.get('/api/v1/users?q=a')
+        assert response.status_code == 403
+
+    def test_search_users_by_prefix(self, admin_client, regular_user, second_user):
+        """Test admins get a bounded prefix search over user names."""
+        response = admin_client.get('/api/v1/users?q=user')
+        assert response.status_code == 200
+        names = [user['name'] for user in response.get_json()['users']]
+        assert names == ['User Test', 'User Two']
+
+        response = admin_client.get('/api/v1/users?q=user&limit=1')
+        assert len(response.get_json()['users']) == 1
+
+    def test_import_tasks(self, authenticated_client, app):
+        """Test importing a CSV body returns the import report."""
+        body = 'title,priority\nImportada,high\n,low\n'
+        response = authenticated_client.post('/api/v1/tasks/import', data=body, content_type='text/csv')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert (data['imported'], data['failed']) == (1, 1)
+        assert data['errors'][0]['line'] == 3
+
+        response = authenticated_client.post('/api/v1/tasks/import', data=body, content_type='text/plain')
+        assert response.status_code == 415
+
+    def test_import_tasks_invalid_utf8(self, authenticated_client, app):
+        """Test lines that are not valid UTF-8 are reported instead of failing the request."""
+        body = b'title,priority\nBuena,high\nMala \xff\xfe,low\nOtra,low\n'
+        response = authenticated_client.post('/api/v1/tasks/import', data=body, content_type='text/csv')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert (data['imported'], data['failed']) == (2, 1)
+        assert data['errors'] == [{'line': 3, 'errors': ['Codificación inválida: el texto debe estar en UTF-8']}]
+
+        body = b'{"title": "Buena"}\n{"title": "\xc3("}\n'
+        response = authenticated_client.post('/api/v1/tasks/import', data=body,
+                                             content_type='application/x-ndjson')
+        data = response.get_json()
+        assert (data['imported'], data['failed']) == (1, 1)
+        assert data['errors'][0]['line'] == 2
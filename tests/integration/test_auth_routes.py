@@ -1,7 +1,8 @@
 import pytest
 from flask import url_for
+from app.password_hasher import PasswordHashingUnavailable
 from app.models import User
-from app import db
+from app import create_app, db
 
 class TestAuthRoutes:
     """Test cases for authentication routes."""
@@ -126,6 +127,75 @@ class TestAuthRoutes:
         assert response.status_code == 200
         assert b'Email o contrase\xc3\xb1a incorrectos' in response.data
 
+    def test_login_hashing_saturated(self, client, app, regular_user, monkeypatch):
+        """Test login answers 503 when the hashing pool is saturated."""
+        def unavailable(pwhash, password):
+            raise PasswordHashingUnavailable('Cola de hashing llena')
+        monkeypatch.setattr(app.extensions['password_hasher'], 'verify', unavailable)
+
+        response = client.post('/auth/login', data={
+            'email': 'user@test.com',
+            'password': 'user123'
+        })
+        assert response.status_code == 503
+        assert 'saturado'.encode() in response.data
+
+    def test_login_throttled_per_email(self, client, app, regular_user, monkeypatch):
+        """Test excess attempts get 429 without checking the password."""
+        burst = app.config['LOGIN_RATE_LIMIT_EMAIL_BURST']
+        for _ in range(burst):
+            response = client.post('/auth/login', data={
+                'email': 'user@test.com',
+                'password': 'wrong'
+            })
+            assert response.status_code == 200
+
+        def fail(pwhash, password):
+            raise AssertionError('password should not be checked')
+        monkeypatch.setattr(app.extensions['password_hasher'], 'verify', fail)
+
+        response = client.post('/auth/login', data={
+            'email': 'user@test.com',
+            'password': 'user123'
+        })
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) > 0
+        assert b'Demasiados intentos' in response.data
+
+    def test_login_throttle_other_ip_not_locked_out(self, client, app, regular_user):
+        """Test exhausting an email from one IP does not block its owner elsewhere."""
+        for _ in range(app.config['LOGIN_RATE_LIMIT_EMAIL_BURST'] + 1):
+            response = client.post('/auth/login', data={'email': 'user@test.com', 'password': 'wrong'},
+                                   environ_base={'REMOTE_ADDR': '6.6.6.6'})
+        assert response.status_code == 429
+
+        response = client.post('/auth/login', data={'email': 'user@test.com', 'password': 'user123'},
+                               environ_base={'REMOTE_ADDR': '10.0.0.8'})
+        assert response.status_code == 302
+
+    def test_login_throttle_behind_proxy(self, monkeypatch):
+        """Test PROXY_FIX_X_FOR makes the throttle key on the forwarded client IP."""
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        from config import TestConfig
+        monkeypatch.setattr(TestConfig, 'PROXY_FIX_X_FOR', 1)
+        proxied = create_app(testing=True)
+        assert isinstance(proxied.wsgi_app, ProxyFix)
+
+        client = proxied.test_client()
+        burst = proxied.config['LOGIN_RATE_LIMIT_EMAIL_BURST']
+        for forwarded, expected in [('6.6.6.6', 200)] * burst + [('6.6.6.6', 429), ('10.0.0.8', 200)]:
+            response = client.post('/auth/login', data={'email': 'user@test.com', 'password': 'wrong'},
+                                   headers={'X-Forwarded-For': forwarded})
+            assert response.status_code == expected
+
+    def test_login_throttle_stats_admin_only(self, client, admin_client):
+        """Test the limiter counters are exposed to admins."""
+        response = admin_client.get('/api/v1/login-throttle')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['enabled'] is True
+        assert set(data['stats']) >= {'allowed', 'rejected_ip', 'rejected_email', 'tracked_keys'}
+
     def test_login_redirect_authenticated_user(self, authenticated_client):
         """Test that authenticated users are redirected from login page."""
         response = authenticated_client.get('/auth/login', follow_redirects=True)
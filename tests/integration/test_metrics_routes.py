@@ -0,0 +1,26 @@
+class TestMetricsRoute:
+    """Test cases for the /metrics endpoint."""
+
+    def test_metrics_record_endpoints(self, authenticated_client, sample_task):
+        """Test requests, status codes and SQL counts are exported per endpoint."""
+        authenticated_client.get('/tasks/')
+        authenticated_client.get(f'/tasks/{sample_task.id}')
+        authenticated_client.get('/does-not-exist')
+
+        response = authenticated_client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+        text = response.get_data(as_text=True)
+        assert 'http_requests_total{endpoint="tasks.list_tasks",method="GET",status="200"} 1' in text
+        assert 'http_requests_total{endpoint="tasks.view_task",method="GET",status="200"} 1' in text
+        assert 'http_requests_total{endpoint="<unmatched>",method="GET",status="404"} 1' in text
+        assert 'http_request_db_queries_count{endpoint="tasks.list_tasks"} 1' in text
+        assert 'http_request_db_queries_sum{endpoint="tasks.list_tasks"} 0' not in text
+        assert 'http_requests_in_flight 1' in text
+
+    def test_metrics_token(self, app, client):
+        """Test METRICS_TOKEN requires a matching bearer token."""
+        app.config['METRICS_TOKEN'] = 'secret'
+        assert client.get('/metrics').status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
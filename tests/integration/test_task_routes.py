@@ -1,9 +1,35 @@
-import pytest
+import csv
+import io
 import json
+import pytest
 from datetime import date, timedelta
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
 from app.models import Task, User
 from app import db
 
+
+def count_list_queries(client, app, url='/tasks/'):
+    """Cuenta las sentencias SQL ejecutadas al pedir una URL"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # Vaciar el identity map y la caché de usuarios para medir siempre lo mismo
+    engine = db.engine
+    db.session.remove()
+    app.extensions['user_cache'].clear()
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    assert response.status_code == 200
+    return len(statements)
+
 class TestTaskRoutes:
     """Test cases for task routes."""
 
@@ -96,6 +122,241 @@ class TestTaskRoutes:
         assert b'Other Task' not in response.data
         assert b'Assigned to Me' in response.data
 
+    def test_task_list_pagination(self, authenticated_client, app, regular_user):
+        """Test task list renders one page and links to the next one."""
+        with app.app_context():
+            for i in range(5):
+                db.session.add(Task(
+                    title=f'Paged Task {i}',
+                    created_by=regular_user.id,
+                    assigned_to=regular_user.id,
+                    priority='medium',
+                    status='pending'
+                ))
+            db.session.commit()
+
+        response = authenticated_client.get('/tasks/?per_page=2&status=pending')
+        assert response.status_code == 200
+        assert response.data.count(b'Paged Task') == 2
+        assert b'Siguiente' in response.data
+
+        html = response.data.decode('utf-8')
+        marker = '/tasks/?cursor='
+        start = html.index(marker)
+        next_url = html[start:html.index('"', start)].replace('&amp;', '&')
+        assert 'status=pending' in next_url
+        assert 'per_page=2' in next_url
+
+        response = authenticated_client.get(next_url)
+        assert response.status_code == 200
+        assert response.data.count(b'Paged Task') == 2
+        assert b'Anterior' in response.data
+
+    def test_task_list_query_count_is_constant(self, authenticated_client, app, regular_user):
+        """Test task list issues the same number of queries regardless of row count."""
+        def add_tasks(count, offset):
+            with app.app_context():
+                for i in range(count):
+                    assignee = User(
+                        name=f'Assignee {offset + i}',
+                        email=f'assignee{offset + i}@test.com',
+                        password_hash=generate_password_hash('x', method='pbkdf2:sha256:1'),
+                        role='user'
+                    )
+                    db.session.add(assignee)
+                    db.session.flush()
+                    db.session.add(Task(
+                        title=f'Counted Task {offset + i}',
+                        created_by=regular_user.id,
+                        assigned_to=assignee.id,
+                        priority='medium',
+                        status='pending'
+                    ))
+                db.session.commit()
+
+        add_tasks(1, 0)
+        few = count_list_queries(authenticated_client, app)
+
+        add_tasks(8, 1)
+        many = count_list_queries(authenticated_client, app)
+
+        assert many == few
+
+    def test_dashboard_query_count_is_constant(self, authenticated_client, app, regular_user, second_user):
+        """Test dashboard recent tasks do not lazy load assignees per row."""
+        with app.app_context():
+            db.session.add(Task(title='Dash 0', created_by=regular_user.id,
+                                assigned_to=regular_user.id, priority='low', status='pending'))
+            db.session.commit()
+        few = count_list_queries(authenticated_client, app, '/')
+
+        with app.app_context():
+            db.session.add(Task(title='Dash 1', created_by=regular_user.id,
+                                assigned_to=second_user.id, priority='low', status='pending'))
+            db.session.commit()
+        many = count_list_queries(authenticated_client, app, '/')
+
+        assert many == few
+
+    def test_task_export_csv(self, authenticated_client, app, regular_user, second_user):
+        """Test CSV export streams the filtered, authorized tasks."""
+        with app.app_context():
+            db.session.add_all([
+                Task(title='Export pending', description='a, "quoted" value', created_by=regular_user.id,
+                     assigned_to=second_user.id, priority='high', status='pending'),
+                Task(title='Export done', created_by=regular_user.id,
+                     assigned_to=regular_user.id, priority='low', status='done'),
+                Task(title='Not mine', created_by=second_user.id,
+                     assigned_to=second_user.id, priority='low', status='pending'),
+            ])
+            db.session.commit()
+
+        response = authenticated_client.get('/tasks/export.csv?status=pending')
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+        assert 'attachment' in response.headers['Content-Disposition']
+
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert [row['title'] for row in rows] == ['Export pending']
+        assert rows[0]['description'] == 'a, "quoted" value'
+        assert rows[0]['assignee_name'] == 'User Two'
+        assert rows[0]['creator_name'] == 'User Test'
+
+    def test_task_export_ndjson(self, authenticated_client, app, regular_user):
+        """Test NDJSON export emits one JSON object per task in several chunks."""
+        app.config['TASKS_EXPORT_BATCH_SIZE'] = 2
+        with app.app_context():
+            for i in range(5):
+                db.session.add(Task(title=f'Line {i}', created_by=regular_user.id,
+                                    assigned_to=regular_user.id, priority='medium', status='pending'))
+            db.session.commit()
+
+        response = authenticated_client.get('/tasks/export.ndjson')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+
+        chunks = list(response.response)
+        assert len(chunks) == 3
+        lines = b''.join(chunks).decode('utf-8').splitlines()
+        records = [json.loads(line) for line in lines]
+        assert [record['title'] for record in records] == [f'Line {i}' for i in reversed(range(5))]
+        assert records[0]['is_overdue'] is False
+
+    def test_task_list_conditional_get(self, authenticated_client, app, regular_user):
+        """Test the task list answers 304 until the user's tasks change."""
+        with app.app_context():
+            task = Task(title='Cached Task', created_by=regular_user.id,
+                        assigned_to=regular_user.id, priority='medium', status='pending')
+            db.session.add(task)
+            db.session.commit()
+            task_id = task.id
+
+        response = authenticated_client.get('/tasks/?status=pending')
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        assert response.headers['Last-Modified']
+
+        response = authenticated_client.get('/tasks/?status=pending', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+        # Otro conjunto de filtros tiene otro ETag
+        response = authenticated_client.get('/tasks/?status=done', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+
+        # Borrar una tarea invalida el ETag aunque no cambie max(updated_at)
+        with app.app_context():
+            db.session.delete(db.session.get(Task, task_id))
+            db.session.commit()
+        response = authenticated_client.get('/tasks/?status=pending', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+
+    def test_task_detail_conditional_get(self, authenticated_client, app, regular_user):
+        """Test the task detail answers 304 until the task is updated."""
+        with app.app_context():
+            task = Task(title='Detail Cache', created_by=regular_user.id,
+                        assigned_to=regular_user.id, priority='medium', status='pending')
+            db.session.add(task)
+            db.session.commit()
+            task_id = task.id
+
+        response = authenticated_client.get(f'/tasks/{task_id}')
+        etag = response.headers['ETag']
+
+        response = authenticated_client.get(f'/tasks/{task_id}', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+
+        authenticated_client.post(f'/tasks/{task_id}/toggle', headers={'Content-Type': 'application/json'})
+        response = authenticated_client.get(f'/tasks/{task_id}', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+
+    def test_conditional_get_invalidated_by_user_rename(self, authenticated_client, app,
+                                                        regular_user, second_user):
+        """Test renaming another user invalidates the pages that show their name."""
+        with app.app_context():
+            task = Task(title='Shared Task', created_by=second_user.id,
+                        assigned_to=regular_user.id, priority='medium', status='pending')
+            db.session.add(task)
+            db.session.commit()
+            task_id = task.id
+
+        paths = ['/', '/tasks/', f'/tasks/{task_id}']
+        etags = {path: authenticated_client.get(path).headers['ETag'] for path in paths}
+        for path in paths:
+            assert authenticated_client.get(path, headers={'If-None-Match': etags[path]}).status_code == 304
+
+        # Las fixtures de usuario mantienen abierto el contexto de aplicación que
+        # reutilizan las peticiones; se renombra en esa misma sesión
+        db.session.get(User, second_user.id).name = 'Renamed Creator'
+        db.session.commit()
+
+        for path in paths:
+            response = authenticated_client.get(path, headers={'If-None-Match': etags[path]})
+            assert response.status_code == 200
+        assert b'Renamed Creator' in authenticated_client.get(f'/tasks/{task_id}').data
+
+    def test_conditional_get_renders_pending_flashes(self, authenticated_client):
+        """Test a pending flash message forces a full render."""
+        response = authenticated_client.get('/')
+        etag = response.headers['ETag']
+        assert authenticated_client.get('/', headers={'If-None-Match': etag}).status_code == 304
+
+        with authenticated_client.session_transaction() as sess:
+            sess['_flashes'] = [('success', 'Aviso pendiente')]
+        response = authenticated_client.get('/', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert b'Aviso pendiente' in response.data
+
+    def test_deleted_user_session_is_cleared(self, authenticated_client, app, regular_user):
+        """Test a session pointing to a deleted user is sent back to login."""
+        with app.app_context():
+            db.session.delete(db.session.get(User, regular_user.id))
+            db.session.commit()
+            app.extensions['user_cache'].clear()
+
+        response = authenticated_client.get('/tasks/')
+        assert response.status_code == 302
+        assert '/auth/login' in response.headers['Location']
+        with authenticated_client.session_transaction() as sess:
+            assert 'user_id' not in sess
+
+    def test_task_list_description_preview(self, authenticated_client, app, regular_user):
+        """Test the list shows a truncated preview and the detail the full text."""
+        with app.app_context():
+            task = Task(title='Logs', description='a' * 100 + 'TAIL-OF-THE-LOG', created_by=regular_user.id,
+                        assigned_to=regular_user.id)
+            db.session.add(task)
+            db.session.commit()
+            task_id = task.id
+
+        response = authenticated_client.get('/tasks/')
+        assert ('a' * 100 + '...').encode() in response.data
+        assert b'TAIL-OF-THE-LOG' not in response.data
+
+        response = authenticated_client.get(f'/tasks/{task_id}')
+        assert b'TAIL-OF-THE-LOG' in response.data
+
     def test_task_create_page(self, authenticated_client):
         """Test task creation page."""
         response = authenticated_client.get('/tasks/new')
@@ -105,6 +366,19 @@ class TestTaskRoutes:
         assert b'description' in response.data
         assert b'priority' in response.data
 
+    def test_admin_form_embeds_only_selected_assignee(self, admin_client, app, admin_user,
+                                                      regular_user, second_user):
+        """Test the admin assignee select is filled lazily from the user search."""
+        response = admin_client.get('/tasks/new')
+        assert response.status_code == 200
+        assert b'data-typeahead-url="/api/v1/users"' in response.data
+        assert f'<option selected value="{admin_user.id}">'.encode() in response.data
+        assert b'User Two' not in response.data
+
+        response = admin_client.get(f'/tasks/?assigned_to={second_user.id}')
+        assert f'<option selected value="{second_user.id}">User Two'.encode() in response.data
+        assert b'User Test</option>' not in response.data
+
     def test_task_create_success(self, authenticated_client, app, regular_user):
         """Test successful task creation."""
         due_date = (date.today() + timedelta(days=7)).strftime('%Y-%m-%d')
@@ -300,6 +574,137 @@ class TestTaskRoutes:
             task = Task.query.get(task_id)
             assert task.status == 'done'
 
+    def test_task_toggle_json(self, authenticated_client, app, regular_user, second_user):
+        """Test the JSON toggle flips twice and hides other users' tasks."""
+        with app.app_context():
+            mine = Task(title='Mine', created_by=regular_user.id, assigned_to=regular_user.id)
+            other = Task(title='Other', created_by=second_user.id, assigned_to=second_user.id)
+            db.session.add_all([mine, other])
+            db.session.commit()
+            mine_id, other_id = mine.id, other.id
+
+        headers = {'Content-Type': 'application/json'}
+        statuses = [
+            authenticated_client.post(f'/tasks/{mine_id}/toggle', headers=headers).get_json()['new_status']
+            for _ in range(2)
+        ]
+        assert statuses == ['done', 'pending']
+
+        response = authenticated_client.post(f'/tasks/{other_id}/toggle', headers=headers)
+        assert response.status_code == 404
+        with app.app_context():
+            assert db.session.get(Task, other_id).status == 'pending'
+
+    def test_bulk_json(self, authenticated_client, app, regular_user, second_user):
+        """Test the JSON bulk endpoint returns a per-id report."""
+        with app.app_context():
+            mine = Task(title='Mine', created_by=regular_user.id, assigned_to=regular_user.id)
+            other = Task(title='Other', created_by=second_user.id, assigned_to=second_user.id)
+            db.session.add_all([mine, other])
+            db.session.commit()
+            mine_id, other_id = mine.id, other.id
+
+        response = authenticated_client.post('/tasks/bulk', json={
+            'ids': [mine_id, other_id], 'action': 'priority', 'value': 'high'
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['processed'] == 1
+        assert data['results'] == [{'id': mine_id, 'result': 'ok'}, {'id': other_id, 'result': 'not_found'}]
+
+        response = authenticated_client.post('/tasks/bulk', json={'ids': [mine_id], 'action': 'reassign',
+                                                                   'value': second_user.id})
+        assert response.status_code == 400
+
+        for body in ([mine_id], 'delete', 3):
+            response = authenticated_client.post('/tasks/bulk', json=body)
+            assert response.status_code == 400
+            assert response.get_json()['success'] is False
+
+    def test_bulk_form(self, authenticated_client, app, regular_user):
+        """Test the list checkboxes post to the bulk endpoint."""
+        with app.app_context():
+            tasks = [Task(title=f'Bulk {i}', created_by=regular_user.id, assigned_to=regular_user.id)
+                     for i in range(3)]
+            db.session.add_all(tasks)
+            db.session.commit()
+            ids = [task.id for task in tasks]
+
+        response = authenticated_client.get('/tasks/')
+        assert b'id="bulk-form"' in response.data
+        assert f'value="{ids[0]}" form="bulk-form"'.encode() in response.data
+
+        response = authenticated_client.post('/tasks/bulk?status=pending', data={
+            'task_ids': [str(task_id) for task_id in ids[:2]], 'action': 'complete'
+        })
+        assert response.status_code == 302
+        assert 'status=pending' in response.headers['Location']
+
+        response = authenticated_client.get('/tasks/')
+        assert 'Marcar como completadas: 2 tarea(s) procesada(s).'.encode() in response.data
+        with app.app_context():
+            assert [db.session.get(Task, task_id).status for task_id in ids] == ['done', 'done', 'pending']
+
+    def test_task_rows_served_from_fragment_cache(self, authenticated_client, app, regular_user):
+        """Test unchanged rows are reused and a status change re-renders its row."""
+        with app.app_context():
+            task = Task(title='Cached row', created_by=regular_user.id, assigned_to=regular_user.id)
+            db.session.add(task)
+            db.session.commit()
+            task_id = task.id
+            cache = app.extensions['fragment_cache']
+
+        first = authenticated_client.get('/tasks/')
+        second = authenticated_client.get('/tasks/')
+        assert first.data == second.data
+        assert cache.stats()['fragments']['task_row'] == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+
+        response = authenticated_client.post(f'/tasks/{task_id}/toggle', json={})
+        assert response.get_json()['new_status'] == 'done'
+
+        response = authenticated_client.get('/tasks/')
+        assert b'fa-undo' in response.data
+        assert cache.stats()['fragments']['task_row']['misses'] == 2
+
+    def test_dashboard_stats_panel_cached(self, authenticated_client, admin_client, app, regular_user):
+        """Test the stats panel is reused until the user's tasks change."""
+        with app.app_context():
+            cache = app.extensions['fragment_cache']
+
+        authenticated_client.get('/')
+        authenticated_client.get('/')
+        assert cache.stats()['fragments']['dashboard_stats']['hits'] == 1
+
+        with app.app_context():
+            db.session.add(Task(title='New', created_by=regular_user.id, assigned_to=regular_user.id))
+            db.session.commit()
+
+        response = authenticated_client.get('/')
+        assert b'<h2 class="mb-0">1</h2>' in response.data
+        assert cache.stats()['fragments']['dashboard_stats'] == {'hits': 1, 'misses': 2, 'hit_ratio': 1 / 3}
+
+    def test_list_query_budget_independent_of_rows(self, admin_client, app, admin_user):
+        """Test list and dashboard stay within their query budgets with many assignees."""
+        with app.app_context():
+            users = [User(name=f'Budget {i}', email=f'budget{i}@test.com',
+                          password_hash=generate_password_hash('x', method='pbkdf2:sha256:1000'))
+                     for i in range(10)]
+            db.session.add_all(users)
+            db.session.commit()
+            db.session.add_all([Task(title=f'Row {i}', created_by=admin_user.id, assigned_to=users[i % 10].id)
+                                for i in range(40)])
+            db.session.commit()
+
+        # Con SQL_QUERY_BUDGET_ENFORCE, superar query_budget haría fallar la petición
+        assert admin_client.get('/tasks/?per_page=40').status_code == 200
+        assert admin_client.get('/').status_code == 200
+        assert admin_client.get('/api/v1/tasks?per_page=40').status_code == 200
+
+    def test_fragment_cache_stats_admin_only(self, authenticated_client, app):
+        """Test the hit ratios are only exposed to admins."""
+        response = authenticated_client.get('/api/v1/fragment-cache')
+        assert response.status_code == 403
+
     def test_task_delete(self, authenticated_client, app, regular_user):
         """Test task deletion by creator."""
         with app.app_context():
@@ -26,6 +26,21 @@ class TestAuthService:
             user = AuthService.validate_user_credentials('nonexistent@test.com', 'password')
             assert user is None
 
+    def test_validate_user_credentials_rehashes_outdated_hash(self, app, regular_user):
+        """Test a login with an outdated hash upgrades it to the configured method."""
+        with app.app_context():
+            old_hash = db.session.get(User, regular_user.id).password_hash
+            assert not old_hash.startswith(app.config['PASSWORD_HASH_METHOD'] + '$')
+
+            user = AuthService.validate_user_credentials('user@test.com', 'user123')
+            assert user.password_hash.startswith(app.config['PASSWORD_HASH_METHOD'] + '$')
+            assert check_password_hash(user.password_hash, 'user123')
+
+            # La siguiente validación ya no necesita recalcular el hash
+            new_hash = user.password_hash
+            AuthService.validate_user_credentials('user@test.com', 'user123')
+            assert db.session.get(User, regular_user.id).password_hash == new_hash
+
     def test_create_user_success(self, app):
         """Test successful user creation."""
         with app.app_context():
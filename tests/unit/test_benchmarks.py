@@ -0,0 +1,60 @@
+from benchmarks.harness import compare, create_benchmark_app, percentile
+from benchmarks.run import main, parse_size, run_size
+
+
+class TestBenchmarks:
+    """Test cases for the benchmark harness."""
+
+    def test_percentile_interpolates(self):
+        """Test percentiles interpolate between sorted samples."""
+        samples = [5, 1, 4, 2, 3]
+        assert percentile(samples, 0.5) == 3
+        assert percentile(samples, 0.95) == 4.8
+        assert percentile([7], 0.99) == 7
+        assert percentile([], 0.5) == 0.0
+
+    def test_parse_size(self):
+        """Test dataset sizes accept k and m suffixes."""
+        assert parse_size('10k') == 10000
+        assert parse_size('1M') == 1000000
+        assert parse_size('2500') == 2500
+
+    def test_compare_flags_slower_p50_and_extra_queries(self):
+        """Test regressions beyond the threshold or with more queries are reported."""
+        baseline = {
+            'a': {'p50_ms': 10.0, 'queries': 2},
+            'b': {'p50_ms': 10.0, 'queries': 2},
+            'c': {'p50_ms': 0.1, 'queries': 1},
+        }
+        results = {
+            'a': {'p50_ms': 12.0, 'queries': 2},
+            'b': {'p50_ms': 14.0, 'queries': 3},
+            'c': {'p50_ms': 0.5, 'queries': 1},
+            'new': {'p50_ms': 99.0, 'queries': 9},
+        }
+        regressions = compare(results, baseline, threshold=0.25)
+        assert len(regressions) == 2
+        assert all(message.startswith('b:') for message in regressions)
+
+    def test_benchmark_app_hashes_inline(self, tmp_path):
+        """Test the benchmark app is built with inline hashing rather than a process pool."""
+        app = create_benchmark_app(str(tmp_path / 'bench.db'))
+        assert app.extensions['password_hasher'].workers == 0
+        assert app.config['SQLITE_PRAGMAS']['journal_mode'] == 'WAL'
+
+    def test_run_small_dataset(self, tmp_path):
+        """Test every case runs against a tiny seeded dataset and a baseline round-trips."""
+        results = run_size(300, str(tmp_path), repeat=2, log=lambda message: None)
+
+        assert {name.split('/', 1)[1] for name in results} >= {
+            'get_user_tasks[none]', 'get_user_tasks[search]', 'get_task_statistics[admin]',
+            'create_task', 'toggle_task_status', 'GET /', 'GET /tasks/', 'GET /tasks/<id>',
+        }
+        assert all(result['queries'] >= 1 and result['p50_ms'] > 0 for result in results.values())
+        assert not (tmp_path / 'work').exists()
+
+        baseline = tmp_path / 'baseline.json'
+        args = ['--sizes', '300', '--repeat', '2', '--data-dir', str(tmp_path), '--baseline', str(baseline),
+                '--only', 'get_task_statistics']
+        assert main(args + ['--save-baseline']) == 0
+        assert main(args + ['--threshold', '100']) == 0
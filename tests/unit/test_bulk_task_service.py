@@ -0,0 +1,139 @@
+import pytest
+from sqlalchemy import event, update
+from app.services.bulk_task_service import TASKS, BulkTaskService
+from app.services.task_stats_service import TaskStatsService
+from app.models import Task
+from app import db
+
+
+def add_tasks(creator, assignee, count, **kwargs):
+    tasks = [Task(title=f'Task {i}', created_by=creator.id, assigned_to=assignee.id, **kwargs)
+             for i in range(count)]
+    db.session.add_all(tasks)
+    db.session.commit()
+    return [task.id for task in tasks]
+
+
+def results(report):
+    return {item['id']: item['result'] for item in report['results']}
+
+
+class TestBulkTaskService:
+    """Test cases for BulkTaskService."""
+
+    def test_validate(self, app, regular_user, admin_user):
+        """Test ids are normalized and invalid requests rejected."""
+        with app.app_context():
+            ids, value, errors = BulkTaskService.validate(regular_user, 'complete', ['3', 1, '3'])
+            assert (ids, errors) == ([3, 1], [])
+
+            assert BulkTaskService.validate(regular_user, 'complete', [])[2]
+            assert BulkTaskService.validate(regular_user, 'complete', ['x'])[2]
+            assert BulkTaskService.validate(regular_user, 'explode', [1])[2]
+            assert BulkTaskService.validate(regular_user, 'priority', [1], 'urgent')[2]
+            assert BulkTaskService.validate(regular_user, 'complete', list(range(5)), max_ids=4)[2]
+            assert BulkTaskService.validate(regular_user, 'complete', [1] * 5, max_ids=4)[2]
+
+            # Muchos ids inválidos: sólo se detallan los primeros
+            ids, value, errors = BulkTaskService.validate(regular_user, 'complete', ['x'] * 200 + [7])
+            assert ids == [7]
+            assert len(errors) == 6 and errors[-1] == '... y 195 ids inválidos más'
+            assert BulkTaskService.validate(regular_user, 'reassign', [1], regular_user.id)[2]
+            assert BulkTaskService.validate(admin_user, 'reassign', [1], 9999)[2]
+
+            ids, value, errors = BulkTaskService.validate(admin_user, 'reassign', [1], str(regular_user.id))
+            assert (value, errors) == (regular_user.id, [])
+
+    def test_complete_reports_per_id(self, app, regular_user, second_user):
+        """Test one UPDATE completes accessible tasks and reports the rest."""
+        with app.app_context():
+            mine = add_tasks(regular_user, regular_user, 3)
+            others = add_tasks(second_user, second_user, 1)
+            statements = []
+
+            def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            try:
+                report, error = BulkTaskService.execute(regular_user, 'complete', mine + others + [9999])
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+            assert error is None
+            assert report['processed'] == 3
+            assert results(report) == {mine[0]: 'ok', mine[1]: 'ok', mine[2]: 'ok',
+                                       others[0]: 'not_found', 9999: 'not_found'}
+            assert len([sql for sql in statements if sql.startswith('UPDATE tasks')]) == 1
+            assert {task.status for task in Task.query.filter(Task.id.in_(mine))} == {'done'}
+            assert db.session.get(Task, others[0]).status == 'pending'
+            assert TaskStatsService.verify() == []
+
+    def test_delete_only_own_tasks(self, app, regular_user, second_user):
+        """Test tasks assigned to (but not created by) the user are not deleted."""
+        with app.app_context():
+            mine = add_tasks(regular_user, regular_user, 2)
+            assigned = add_tasks(second_user, regular_user, 1)
+
+            report, error = BulkTaskService.execute(regular_user, 'delete', mine + assigned)
+
+            assert results(report) == {mine[0]: 'ok', mine[1]: 'ok', assigned[0]: 'forbidden'}
+            assert Task.query.filter(Task.id.in_(mine)).count() == 0
+            assert db.session.get(Task, assigned[0]) is not None
+            assert TaskStatsService.verify() == []
+
+    def test_toggle_priority_and_reassign(self, app, admin_user, regular_user, second_user):
+        """Test the remaining actions keep the counters consistent."""
+        with app.app_context():
+            ids = add_tasks(regular_user, regular_user, 2)
+            done = add_tasks(regular_user, regular_user, 1, status='done')
+
+            BulkTaskService.execute(admin_user, 'toggle', ids + done)
+            assert [db.session.get(Task, i).status for i in ids + done] == ['done', 'done', 'pending']
+
+            BulkTaskService.execute(admin_user, 'priority', ids, 'high')
+            BulkTaskService.execute(admin_user, 'reassign', ids, second_user.id)
+            for task_id in ids:
+                task = db.session.get(Task, task_id)
+                assert (task.priority, task.assigned_to) == ('high', second_user.id)
+            assert TaskStatsService.verify() == []
+
+    @pytest.mark.parametrize('action, value, column, concurrent', [
+        ('complete', None, 'status', 'done'),
+        ('toggle', None, 'status', 'done'),
+        ('priority', 'high', 'priority', 'low'),
+        ('reassign', 'second', 'assigned_to', 'second'),
+        ('delete', None, 'priority', 'high'),
+    ])
+    @pytest.mark.parametrize('returning', [True, False])
+    def test_counters_follow_rows_changed_after_select(self, app, admin_user, regular_user, second_user,
+                                                      monkeypatch, action, value, column, concurrent, returning):
+        """Test a change committed between the SELECT and the write does not skew task_stats."""
+        with app.app_context():
+            monkeypatch.setattr(db.engine.dialect, 'update_returning', returning)
+            monkeypatch.setattr(db.engine.dialect, 'delete_returning', returning)
+            ids = add_tasks(regular_user, regular_user, 2, priority='medium')
+            value = second_user.id if value == 'second' else value
+            concurrent = second_user.id if concurrent == 'second' else concurrent
+
+            def after_select(conn, cursor, statement, parameters, context, executemany):
+                # Otro request modifica la primera tarea justo después de la SELECT del informe
+                if statement.startswith('SELECT tasks.id') and not after_select.done:
+                    after_select.done = True
+                    task = db.session.get(Task, ids[0])
+                    old = (task.status, task.priority, task.created_by, task.assigned_to)
+                    new = dict(zip(('status', 'priority', 'created_by', 'assigned_to'), old), **{column: concurrent})
+                    conn.execute(update(TASKS).where(TASKS.c.id == ids[0]).values({column: concurrent}))
+                    changes = TaskStatsService.deltas(tuple(new.values()), 1)
+                    changes.subtract(TaskStatsService.deltas(old, 1))
+                    TaskStatsService.apply(conn, changes)
+            after_select.done = False
+
+            event.listen(db.engine, 'after_cursor_execute', after_select)
+            try:
+                report, error = BulkTaskService.execute(admin_user, action, ids, value)
+            finally:
+                event.remove(db.engine, 'after_cursor_execute', after_select)
+
+            assert error is None and after_select.done
+            assert TaskStatsService.verify() == []
@@ -0,0 +1,38 @@
+import logging
+import pytest
+from app import create_app, db
+from app.database import get_sqlite_pragmas
+from config import ProductionConfig
+
+
+class TestProductionConfig:
+    """Test cases for the production configuration profile."""
+
+    def test_create_app_uses_environment_config(self, tmp_path, monkeypatch, caplog):
+        """Test APP_CONFIG selects ProductionConfig and its pragmas are applied."""
+        db_path = tmp_path / 'production.db'
+        monkeypatch.setattr(ProductionConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{db_path}')
+        monkeypatch.setenv('APP_CONFIG', 'production')
+
+        with caplog.at_level(logging.INFO):
+            app = create_app()
+
+        assert app.config['SQLITE_PRAGMAS'] == ProductionConfig.SQLITE_PRAGMAS
+        assert app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_pre_ping'] is True
+        assert 'PRAGMAs SQLite efectivos' in caplog.text
+
+        with app.app_context():
+            pragmas = get_sqlite_pragmas(db.engine, ProductionConfig.SQLITE_PRAGMAS)
+            db.session.remove()
+            db.engine.dispose()
+
+        assert pragmas['journal_mode'] == 'wal'
+        assert pragmas['busy_timeout'] == ProductionConfig.SQLITE_PRAGMAS['busy_timeout']
+        assert pragmas['synchronous'] == 1  # NORMAL
+        assert pragmas['temp_store'] == 2  # MEMORY
+        assert pragmas['cache_size'] == -64000
+
+    def test_testing_app_has_no_pragmas(self, app):
+        """Test the testing profile keeps SQLite defaults."""
+        assert app.config['SQLITE_PRAGMAS'] == {}
+        assert app.config['TESTING'] is True
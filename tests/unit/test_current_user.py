@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import event
+from app.current_user import UserCache, UserSnapshot, get_user_snapshot
+from app.services.auth_service import AuthService
+from app.models import Task, User
+from app import db
+
+
+class TestUserCache:
+    """Test cases for the current-user snapshot cache."""
+
+    def test_snapshot_is_immutable(self):
+        """Test snapshots cannot be modified."""
+        snapshot = UserSnapshot(1, 'Ana', 'user')
+        with pytest.raises(AttributeError):
+            snapshot.role = 'admin'
+
+    def test_snapshot_authorization(self):
+        """Test snapshots apply the same rules as User."""
+        task = Task(created_by=2, assigned_to=1)
+        assert UserSnapshot(1, 'Ana', 'user').can_access_task(task) is True
+        assert UserSnapshot(3, 'Eva', 'user').can_access_task(task) is False
+        assert UserSnapshot(3, 'Eva', 'admin').can_access_task(task) is True
+        assert UserSnapshot(3, 'Eva', 'admin').can_assign_tasks() is True
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = UserCache(maxsize=2, ttl=60)
+        cache.set(UserSnapshot(1, 'a', 'user'))
+        cache.set(UserSnapshot(2, 'b', 'user'))
+        cache.get(1)
+        cache.set(UserSnapshot(3, 'c', 'user'))
+
+        assert cache.get(2) is None
+        assert cache.get(1).name == 'a'
+        assert cache.get(3).name == 'c'
+        assert len(cache) == 2
+
+    def test_ttl_expiry(self, monkeypatch):
+        """Test entries expire after the TTL."""
+        now = [100.0]
+        monkeypatch.setattr('app.current_user.time.monotonic', lambda: now[0])
+        cache = UserCache(maxsize=10, ttl=5)
+        cache.set(UserSnapshot(1, 'a', 'user'))
+
+        now[0] = 104.0
+        assert cache.get(1) is not None
+        now[0] = 106.0
+        assert cache.get(1) is None
+
+    def test_snapshot_cached_until_profile_update(self, app, regular_user):
+        """Test the cached snapshot avoids queries and is invalidated on update."""
+        with app.app_context():
+            statements = []
+
+            def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            assert get_user_snapshot(regular_user.id).name == 'User Test'
+
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            try:
+                assert get_user_snapshot(regular_user.id).name == 'User Test'
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+            assert statements == []
+
+            user = db.session.get(User, regular_user.id)
+            success, message = AuthService.update_user_profile(user, 'Renamed', user.email)
+            assert success is True
+            assert get_user_snapshot(regular_user.id).name == 'Renamed'
+
+    def test_unknown_user(self, app):
+        """Test unknown ids resolve to None."""
+        with app.app_context():
+            assert get_user_snapshot(9999) is None
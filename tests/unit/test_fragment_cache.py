@@ -0,0 +1,68 @@
+from app.fragment_cache import FragmentCache, get_fragment_cache
+from app.services.task_service import TaskService
+from app import db
+
+
+class TestFragmentCache:
+    """Test cases for the rendered-fragment LRU cache."""
+
+    def test_hits_misses_and_ratio_per_kind(self):
+        """Test lookups are counted separately for each fragment type."""
+        cache = FragmentCache()
+        assert cache.get('task_row', 1) is None
+        cache.set('task_row', 1, '<tr>1</tr>')
+        assert cache.get('task_row', 1) == '<tr>1</tr>'
+        assert cache.get('task_row', 1) == '<tr>1</tr>'
+        assert cache.get('dashboard_stats', 1) is None
+
+        fragments = cache.stats()['fragments']
+        assert fragments['task_row'] == {'hits': 2, 'misses': 1, 'hit_ratio': 2 / 3}
+        assert fragments['dashboard_stats'] == {'hits': 0, 'misses': 1, 'hit_ratio': 0.0}
+
+    def test_lru_eviction(self):
+        """Test the least recently used fragment is evicted beyond maxsize."""
+        cache = FragmentCache(maxsize=2)
+        cache.set('task_row', 1, 'a', tags=('task:1',))
+        cache.set('task_row', 2, 'b', tags=('task:2',))
+        cache.get('task_row', 1)
+        cache.set('task_row', 3, 'c', tags=('task:3',))
+
+        assert cache.get('task_row', 2) is None
+        assert cache.get('task_row', 1) == 'a'
+        assert len(cache) == 2
+        assert cache.stats()['evicted'] == 1
+        # Las etiquetas de la entrada expulsada también se liberan
+        assert cache.invalidate('task:2') == 0
+
+    def test_invalidate_by_tag(self):
+        """Test every entry carrying a tag is dropped at once."""
+        cache = FragmentCache()
+        cache.set('task_row', (1, 'user'), 'a', tags=('task:1',))
+        cache.set('task_row', (1, 'admin'), 'b', tags=('task:1',))
+        cache.set('task_row', (2, 'user'), 'c', tags=('task:2',))
+
+        assert cache.invalidate('task:1', 'task:9') == 2
+        assert cache.get('task_row', (1, 'user')) is None
+        assert cache.get('task_row', (2, 'user')) == 'c'
+        assert cache.stats()['invalidated'] == 2
+
+    def test_task_writes_invalidate_fragments(self, app, regular_user, sample_task):
+        """Test TaskService write methods drop the task rows and dashboard panels."""
+        with app.app_context():
+            cache = get_fragment_cache()
+            cache.set('task_row', sample_task.id, 'row', tags=(f'task:{sample_task.id}',))
+            cache.set('dashboard_stats', regular_user.id, 'panel', tags=(f'user:{regular_user.id}',))
+            cache.set('dashboard_stats', 'admin', 'panel', tags=('admins',))
+
+            status, error = TaskService.toggle_task_status_by_id(sample_task.id, regular_user)
+            assert status == 'done' and error is None
+            assert len(cache) == 0
+
+            cache.set('dashboard_stats', regular_user.id, 'panel', tags=(f'user:{regular_user.id}',))
+            TaskService.create_task('New', None, 'low', None, regular_user.id, regular_user.id)
+            assert cache.get('dashboard_stats', regular_user.id) is None
+
+            cache.set('task_row', sample_task.id, 'row', tags=(f'task:{sample_task.id}',))
+            task = db.session.get(type(sample_task), sample_task.id)
+            TaskService.update_task(task, 'Renamed', None, 'high', None)
+            assert cache.get('task_row', sample_task.id) is None
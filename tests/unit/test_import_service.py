@@ -0,0 +1,91 @@
+import io
+import json
+from datetime import date, timedelta
+from sqlalchemy import event
+from app.services.import_service import ImportService
+from app.services.task_stats_service import TaskStatsService
+from app.models import Task
+from app import db
+
+
+def csv_stream(*lines):
+    return io.StringIO('\n'.join(('title,description,priority,status,due_date,assigned_to_email',) + lines) + '\n')
+
+
+class TestImportService:
+    """Test cases for ImportService."""
+
+    def test_import_csv_reports_line_errors(self, app, regular_user):
+        """Test invalid lines are reported while valid ones are imported."""
+        with app.app_context():
+            future = (date.today() + timedelta(days=3)).isoformat()
+            stream = csv_stream(
+                f'Primera,desc,high,pending,{future},',
+                ',sin título,low,pending,,',
+                'Segunda,,urgent,pending,,',
+                'Tercera,,low,done,31/12/2030,',
+                'Cuarta,,,,,user@test.com',
+            )
+            report = ImportService.import_records(regular_user, ImportService.iter_csv(stream))
+
+            assert report['imported'] == 2
+            assert report['failed'] == 3
+            assert [error['line'] for error in report['errors']] == [3, 4, 5]
+            assert report['errors'][0]['errors'] == ['El título es obligatorio']
+
+            tasks = Task.query.order_by(Task.id).all()
+            assert [(t.title, t.priority, t.status) for t in tasks] == [
+                ('Primera', 'high', 'pending'), ('Cuarta', 'medium', 'pending')
+            ]
+            assert tasks[0].due_date.isoformat() == future
+            assert {t.created_by for t in tasks} == {regular_user.id}
+            assert TaskStatsService.verify() == []
+
+    def test_import_ndjson_assignees(self, app, admin_user, regular_user):
+        """Test assignee emails are resolved with one query per chunk."""
+        with app.app_context():
+            lines = [json.dumps({'title': f'T{i}', 'assigned_to_email': 'user@test.com'}) for i in range(5)]
+            lines += ['{no es json', json.dumps({'title': 'X', 'assigned_to_email': 'nobody@test.com'}), '[1]']
+            statements = []
+
+            def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            try:
+                report = ImportService.import_records(
+                    admin_user, ImportService.iter_ndjson(io.StringIO('\n'.join(lines))), chunk_size=100
+                )
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+            assert report['imported'] == 5
+            assert [error['line'] for error in report['errors']] == [6, 7, 8]
+            assert len([sql for sql in statements if 'FROM users' in sql]) == 1
+            assert len([sql for sql in statements if sql.startswith('INSERT INTO tasks')]) == 1
+            assert {t.assigned_to for t in Task.query} == {regular_user.id}
+            assert TaskStatsService.verify() == []
+
+    def test_import_rules_and_chunks(self, app, regular_user, second_user):
+        """Test non-admins cannot assign to others and chunks commit independently."""
+        with app.app_context():
+            stream = csv_stream(*[f'T{i},,low,pending,,' for i in range(5)], 'Otra,,low,pending,,user2@test.com')
+            report = ImportService.import_records(
+                regular_user, ImportService.iter_csv(stream), chunk_size=2, max_errors=0
+            )
+
+            assert (report['imported'], report['failed'], report['errors']) == (5, 1, [])
+            assert Task.query.count() == 5
+
+    def test_import_command(self, app, runner, regular_user, tmp_path):
+        """Test the CLI imports a file and prints a summary."""
+        path = tmp_path / 'tareas.ndjson'
+        path.write_text('\n'.join(json.dumps({'title': f'T{i}'}) for i in range(3)) + '\n{}\n', encoding='utf-8')
+
+        result = runner.invoke(args=['import-tasks', str(path), '--as', 'user@test.com'])
+        assert result.exit_code == 0
+        assert 'Importadas 3 tareas' in result.output
+        assert 'Línea 4: El título es obligatorio' in result.output
+
+        result = runner.invoke(args=['import-tasks', str(path), '--as', 'nobody@test.com'])
+        assert result.exit_code != 0
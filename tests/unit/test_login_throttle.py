@@ -0,0 +1,122 @@
+import sqlite3
+import threading
+from app.login_throttle import LoginThrottle, MemoryBucketStore, SQLiteBucketStore
+
+
+def make_throttle(store=None, ip_burst=10, email_burst=3, email_global_burst=8):
+    if store is None:
+        store = MemoryBucketStore()
+    return LoginThrottle(store, ip_burst=ip_burst, ip_per_minute=60,
+                         email_burst=email_burst, email_per_minute=6,
+                         email_global_burst=email_global_burst, email_global_per_minute=12)
+
+
+class TestLoginThrottle:
+    """Test cases for the token-bucket login limiter."""
+
+    def test_email_burst_then_reject(self):
+        """Test an email is rejected after its burst and refills over time."""
+        throttle = make_throttle()
+        for _ in range(3):
+            assert throttle.check('1.1.1.1', 'user@test.com', now=100)[0] is True
+
+        allowed, retry_after = throttle.check('1.1.1.1', ' USER@test.com ', now=100)
+        assert allowed is False
+        assert retry_after == 10
+
+        assert throttle.check('1.1.1.1', 'user@test.com', now=105)[0] is False
+        assert throttle.check('1.1.1.1', 'user@test.com', now=111)[0] is True
+        assert throttle.stats()['rejected_email'] == 2
+
+    def test_email_exhausted_from_one_ip_does_not_lock_out_owner(self):
+        """Test draining an email from one IP leaves the owner's IP usable, up to a global cap."""
+        throttle = make_throttle(ip_burst=100)
+        for _ in range(5):
+            throttle.check('6.6.6.6', 'victim@test.com', now=100)
+        assert throttle.check('6.6.6.6', 'victim@test.com', now=100)[0] is False
+        assert throttle.check('1.1.1.1', 'victim@test.com', now=100)[0] is True
+
+        # Intentos repartidos entre muchas IPs: los frena el cubo global del email
+        results = [throttle.check(f'7.7.7.{i}', 'victim@test.com', now=100)[0] for i in range(10)]
+        assert results.count(True) == 4
+        assert throttle.stats()['rejected_email_global'] == 6
+
+    def test_ip_rejection_does_not_consume_email(self):
+        """Test a blocked IP does not drain the tokens of the probed email."""
+        throttle = make_throttle(ip_burst=2, email_burst=3)
+        throttle.check('1.1.1.1', 'a@test.com', now=100)
+        throttle.check('1.1.1.1', 'b@test.com', now=100)
+        assert throttle.check('1.1.1.1', 'victim@test.com', now=100)[0] is False
+
+        for i in range(3):
+            assert throttle.check(f'2.2.2.{i}', 'victim@test.com', now=100)[0] is True
+        assert throttle.stats()['rejected_ip'] == 1
+
+    def test_memory_store_is_bounded(self):
+        """Test the least recently used buckets are evicted."""
+        store = MemoryBucketStore(maxsize=3)
+        for i in range(5):
+            store.consume(f'ip:10.0.0.{i}', 10, 1, now=100)
+        store.consume('ip:10.0.0.2', 10, 1, now=100)
+        store.consume('ip:10.0.0.5', 10, 1, now=100)
+
+        assert len(store) == 3
+        assert store.evicted == 3
+        assert list(store._buckets) == ['ip:10.0.0.4', 'ip:10.0.0.2', 'ip:10.0.0.5']
+
+    def test_sqlite_store_is_shared(self, tmp_path):
+        """Test two workers sharing the SQLite store see the same buckets."""
+        path = str(tmp_path / 'buckets.db')
+        first = make_throttle(SQLiteBucketStore(path))
+        second = make_throttle(SQLiteBucketStore(path))
+
+        assert first.check('1.1.1.1', 'user@test.com', now=100)[0] is True
+        assert second.check('1.1.1.1', 'user@test.com', now=100)[0] is True
+        assert first.check('1.1.1.1', 'user@test.com', now=100)[0] is True
+        assert second.check('1.1.1.1', 'user@test.com', now=100)[0] is False
+
+    def test_sqlite_store_sweep(self, tmp_path):
+        """Test idle buckets are removed and the table is bounded."""
+        store = SQLiteBucketStore(str(tmp_path / 'buckets.db'), maxsize=2, max_idle=60)
+        store.consume('ip:old', 10, 1, now=0)
+        for i in range(3):
+            store.consume(f'ip:{i}', 10, 1, now=100 + i)
+
+        store.sweep(now=102)
+        assert len(store) == 2
+        assert store.evicted == 2
+
+    def test_locked_store_fails_open(self, app, tmp_path):
+        """Test a store locked past its timeout lets the attempt through instead of raising."""
+        path = str(tmp_path / 'buckets.db')
+        store = SQLiteBucketStore(path)
+        store._connect().execute('PRAGMA busy_timeout = 0')
+        throttle = make_throttle(store)
+
+        holder = sqlite3.connect(path, isolation_level=None)
+        holder.execute('BEGIN IMMEDIATE')
+        try:
+            with app.app_context():
+                assert throttle.check('1.1.1.1', 'user@test.com', now=100) == (True, 0)
+        finally:
+            holder.execute('ROLLBACK')
+            holder.close()
+
+        assert throttle.stats()['store_errors'] == 1
+        assert not store._connect().in_transaction
+        assert throttle.check('1.1.1.1', 'user@test.com', now=100)[0] is True
+
+    def test_sqlite_store_sweeps_across_threads(self, tmp_path):
+        """Test the sweep counter advances once per call from any thread."""
+        store = SQLiteBucketStore(str(tmp_path / 'buckets.db'), sweep_every=10 ** 9)
+
+        def work(n):
+            for i in range(50):
+                store.consume(f'ip:{n}.{i}', 10, 1, now=100)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert next(store._calls) == 201
@@ -0,0 +1,87 @@
+import threading
+from app.metrics import LATENCY_BUCKETS, RequestMetrics
+
+
+def sample(text, line_start):
+    """Value of the first exposition line starting with line_start"""
+    for line in text.splitlines():
+        if line.startswith(line_start + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+class TestRequestMetrics:
+    """Test cases for the per-thread request metrics."""
+
+    def test_render_prometheus_text(self):
+        """Test counters and cumulative histogram buckets are exported."""
+        metrics = RequestMetrics()
+        for duration in (0.003, 0.02, 3.0):
+            metrics.request_started()
+            metrics.request_finished('tasks.list_tasks', 'GET', '200', duration, 0.001, 3)
+        metrics.request_started()
+
+        text = metrics.render()
+        assert '# TYPE http_request_duration_seconds histogram' in text
+        assert sample(text, 'http_requests_total{endpoint="tasks.list_tasks",method="GET",status="200"}') == 3
+        assert sample(text, 'http_requests_in_flight') == 1
+        prefix = 'http_request_duration_seconds_bucket{endpoint="tasks.list_tasks",method="GET",'
+        assert sample(text, prefix + 'le="0.005"}') == 1
+        assert sample(text, prefix + 'le="0.025"}') == 2
+        assert sample(text, prefix + 'le="2.5"}') == 2
+        assert sample(text, prefix + 'le="+Inf"}') == 3
+        assert sample(text, 'http_request_duration_seconds_count{endpoint="tasks.list_tasks",method="GET"}') == 3
+        assert sample(text, 'http_request_db_queries_sum{endpoint="tasks.list_tasks"}') == 9
+
+    def test_label_values_are_escaped(self):
+        """Test quotes and backslashes in labels keep the format valid."""
+        metrics = RequestMetrics()
+        metrics.request_started()
+        metrics.request_finished('a"b\\c', 'GET', '200', 0.1, 0, 0)
+        assert 'endpoint="a\\"b\\\\c"' in metrics.render()
+
+    def test_threads_aggregate_and_retire(self):
+        """Test shards written by finished threads are still counted."""
+        metrics = RequestMetrics()
+
+        def work():
+            for _ in range(100):
+                metrics.request_started()
+                metrics.request_finished('main.index', 'GET', '200', 0.01, 0, 1)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        total = metrics.snapshot()
+        assert total.requests[('main.index', 'GET', '200')] == 800
+        assert total.in_flight == 0
+        assert sum(total.latency[('main.index', 'GET')][:len(LATENCY_BUCKETS) + 1]) == 800
+        assert metrics._shards == []
+
+    def test_snapshot_while_owner_adds_keys(self):
+        """Test scraping does not iterate a shard dict its owner thread is growing."""
+        class GrowingDict(dict):
+            """Adds a key on every iteration step, like a request finishing mid-scrape"""
+            def items(self):
+                for item in super().items():
+                    yield item
+                    self[('new', len(self))] = 1
+
+        metrics = RequestMetrics()
+        metrics.request_started()
+        metrics.request_finished('main.index', 'GET', '200', 0.01, 0, 1)
+        shard = metrics._shards[0]
+        shard.requests = GrowingDict(shard.requests)
+
+        assert metrics.snapshot().requests[('main.index', 'GET', '200')] == 1
+
+    def test_collectors(self):
+        """Test extra metric families are appended to the export."""
+        metrics = RequestMetrics()
+        metrics.collectors.append(lambda: [('cache_entries', 'gauge', 'Entries', [({}, 7)])])
+        text = metrics.render()
+        assert '# TYPE cache_entries gauge' in text
+        assert sample(text, 'cache_entries') == 7
@@ -0,0 +1,46 @@
+import pytest
+from werkzeug.security import check_password_hash, generate_password_hash
+from app.password_hasher import PasswordHasher, PasswordHashingUnavailable, normalize_method
+
+
+class TestPasswordHasher:
+    """Test cases for the password hashing executor."""
+
+    def test_normalize_method(self):
+        """Test werkzeug defaults are filled in."""
+        assert normalize_method('pbkdf2') == 'pbkdf2:sha256:600000'
+        assert normalize_method('pbkdf2:sha512') == 'pbkdf2:sha512:600000'
+        assert normalize_method('pbkdf2:sha256:1000') == 'pbkdf2:sha256:1000'
+        assert normalize_method('scrypt') == 'scrypt:32768:8:1'
+        assert normalize_method('scrypt:16384') == 'scrypt:16384:8:1'
+
+    def test_inline_hash_and_verify(self):
+        """Test hashing without workers uses the configured method."""
+        hasher = PasswordHasher('pbkdf2:sha256:1000')
+        pwhash = hasher.hash('secret')
+        assert pwhash.startswith('pbkdf2:sha256:1000$')
+        assert hasher.verify(pwhash, 'secret') is True
+        assert hasher.verify(pwhash, 'wrong') is False
+
+    def test_needs_rehash(self):
+        """Test hashes with other parameters are flagged for rehashing."""
+        hasher = PasswordHasher('pbkdf2:sha256:2000')
+        assert hasher.needs_rehash(generate_password_hash('x', method='pbkdf2:sha256:1000')) is True
+        assert hasher.needs_rehash(generate_password_hash('x', method='pbkdf2:sha256:2000')) is False
+
+    def test_process_pool(self):
+        """Test hashes computed in a worker process verify in this one."""
+        hasher = PasswordHasher('pbkdf2:sha256:1000', workers=1, timeout=30)
+        try:
+            pwhash = hasher.hash('secret')
+            assert check_password_hash(pwhash, 'secret')
+            assert hasher.verify(pwhash, 'secret') is True
+        finally:
+            hasher.shutdown()
+
+    def test_full_queue_is_rejected(self):
+        """Test a saturated queue fails fast instead of piling up requests."""
+        hasher = PasswordHasher('pbkdf2:sha256:1000', workers=1, max_pending=1, timeout=0.01)
+        hasher._slots.acquire()
+        with pytest.raises(PasswordHashingUnavailable):
+            hasher.hash('secret')
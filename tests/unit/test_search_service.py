@@ -0,0 +1,110 @@
+import pytest
+from app.services.search_service import SearchService
+from app.services.task_service import TaskService
+from app.models import Task
+from app import db
+
+
+def add_task(user, title, description=None):
+    task = Task(title=title, description=description, created_by=user.id,
+                assigned_to=user.id, priority='medium', status='pending')
+    db.session.add(task)
+    db.session.commit()
+    return task
+
+
+class TestSearchService:
+    """Test cases for full-text task search."""
+
+    def test_fts_available_on_sqlite(self, app):
+        """Test the FTS5 index is created on SQLite."""
+        with app.app_context():
+            assert SearchService.is_available() is True
+
+    def test_build_match_query_quotes_terms(self, app):
+        """Test user input is turned into safe prefix phrases."""
+        assert SearchService.build_match_query('informe "final" OR') == '"informe"* "final"* "OR"*'
+        assert SearchService.build_match_query('  ') == ''
+
+    def test_search_ranked_by_bm25(self, app, regular_user):
+        """Test search results are ordered by relevance."""
+        with app.app_context():
+            add_task(regular_user, 'Unrelated', 'nothing here')
+            weak = add_task(regular_user, 'Weekly report', 'long text ' * 20 + 'deploy')
+            strong = add_task(regular_user, 'Deploy', 'deploy deploy checklist')
+
+            tasks = TaskService.get_user_tasks(regular_user, {'search': 'deploy'})
+
+            assert [t.id for t in tasks] == [strong.id, weak.id]
+            assert tasks[0].search_rank <= tasks[1].search_rank
+
+    def test_search_index_follows_updates_and_deletes(self, app, regular_user):
+        """Test the FTS index is kept in sync with the tasks table."""
+        with app.app_context():
+            task = add_task(regular_user, 'Old title', 'first text')
+            TaskService.update_task(task, 'Renamed title', 'second text', 'medium', None)
+
+            assert TaskService.get_user_tasks(regular_user, {'search': 'first'}) == []
+            assert [t.id for t in TaskService.get_user_tasks(regular_user, {'search': 'renamed'})] == [task.id]
+
+            task_id = task.id
+            TaskService.delete_task(task)
+            assert TaskService.get_user_tasks(regular_user, {'search': 'renamed'}) == []
+            assert db.session.get(Task, task_id) is None
+
+    def test_search_respects_authorization(self, app, regular_user, second_user):
+        """Test FTS search still applies the access filter."""
+        with app.app_context():
+            add_task(second_user, 'Secret plan')
+            mine = add_task(regular_user, 'My plan')
+
+            tasks = TaskService.get_user_tasks(regular_user, {'search': 'plan'})
+            assert [t.id for t in tasks] == [mine.id]
+
+    def test_search_without_terms_matches_nothing(self, app, regular_user):
+        """Test a search made only of punctuation returns no tasks instead of all of them."""
+        with app.app_context():
+            add_task(regular_user, 'Deploy - staging', '100% done')
+
+            for search in ('%%', '-', '"*"'):
+                assert TaskService.get_user_tasks(regular_user, {'search': search}) == []
+                assert TaskService.paginate_user_tasks(regular_user, {'search': search})['items'] == []
+
+    def test_search_snippet_escapes_html(self, app, regular_user):
+        """Test snippets highlight matches without injecting user HTML."""
+        with app.app_context():
+            add_task(regular_user, 'Html task', '<script>alert(1)</script> needle')
+
+            task = TaskService.get_user_tasks(regular_user, {'search': 'needle'})[0]
+            assert '<mark>needle</mark>' in task.search_snippet
+            assert '<script>' not in task.search_snippet
+
+    def test_search_pagination_by_rank(self, app, regular_user):
+        """Test cursor pagination walks ranked results without gaps."""
+        with app.app_context():
+            for i in range(5):
+                add_task(regular_user, f'Alpha {i}', 'alpha ' * (i + 1))
+
+            expected = [t.id for t in TaskService.get_user_tasks(regular_user, {'search': 'alpha'})]
+            seen = []
+            cursor = None
+            while True:
+                page = TaskService.paginate_user_tasks(
+                    regular_user, {'search': 'alpha'}, cursor=cursor, per_page=2
+                )
+                seen.extend(t.id for t in page['items'])
+                if not page['next_cursor']:
+                    break
+                cursor = page['next_cursor']
+
+            assert seen == expected
+
+    def test_like_fallback_without_fts(self, app, regular_user):
+        """Test search falls back to LIKE when FTS5 is not available."""
+        with app.app_context():
+            add_task(regular_user, 'Substring match', 'abcdef')
+            app.extensions['task_search_fts'] = False
+
+            tasks = TaskService.get_user_tasks(regular_user, {'search': 'cde'})
+            assert [t.title for t in tasks] == ['Substring match']
+            assert not hasattr(tasks[0], 'search_snippet')
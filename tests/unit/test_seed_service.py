@@ -0,0 +1,99 @@
+import random
+import sqlite3
+from collections import Counter
+from datetime import date, timedelta
+import pytest
+from app.models import Task, User
+from app.services.seed_service import SeedService, parse_mix, parse_range
+from app.services.task_service import TaskService
+from app.services.task_stats_service import TaskStatsService
+
+BASE_DATE = date(2024, 6, 1)
+
+
+def generate(seed=7, count=2000, **distribution):
+    return list(SeedService.generate_tasks(random.Random(seed), count, list(range(1, 11)), BASE_DATE,
+                                           **distribution))
+
+
+class TestSeedService:
+    """Test cases for the synthetic data generator."""
+
+    def test_generation_is_deterministic(self):
+        """Test the same seed and parameters produce the same rows."""
+        assert generate(seed=7) == generate(seed=7)
+        assert generate(seed=7) != generate(seed=8)
+
+    def test_distributions(self):
+        """Test status, priority, due dates, lengths and skew follow the options."""
+        rows = generate(done_ratio=0.25, priority_mix={'high': 1, 'low': 3}, due_spread=(-5, 5),
+                        no_due_ratio=0.5, description_length=(10, 50), skew=1.0, self_assigned_ratio=1.0)
+
+        done = sum(row['status'] == 'done' for row in rows) / len(rows)
+        assert 0.2 < done < 0.3
+        priorities = Counter(row['priority'] for row in rows)
+        assert set(priorities) == {'high', 'low'}
+        assert 2.5 < priorities['low'] / priorities['high'] < 3.5
+
+        due_dates = [row['due_date'] for row in rows if row['due_date']]
+        assert 0.4 < len(due_dates) / len(rows) < 0.6
+        assert min(due_dates) >= BASE_DATE - timedelta(days=5)
+        assert max(due_dates) <= BASE_DATE + timedelta(days=5)
+        assert all(10 <= len(row['description']) <= 50 for row in rows)
+        assert all(row['assigned_to'] == row['created_by'] for row in rows)
+
+        creators = Counter(row['created_by'] for row in rows)
+        assert creators[1] > 1.5 * creators[2] > 1.5 * 1.5 * creators[4]
+
+    def test_uniform_without_skew(self):
+        """Test skew=0 spreads tasks evenly across users."""
+        creators = Counter(row['created_by'] for row in generate(skew=0))
+        assert max(creators.values()) < 1.5 * min(creators.values())
+
+    def test_parse_options(self):
+        """Test range and priority mix options are validated."""
+        assert parse_range('-30:90') == (-30, 90)
+        assert parse_range('5') == (5, 5)
+        assert parse_mix('high=1,low=2') == {'high': 1.0, 'low': 2.0}
+        with pytest.raises(ValueError):
+            parse_range('9:1')
+        with pytest.raises(ValueError):
+            parse_mix('urgent=1')
+
+    def test_seed_inserts_users_tasks_and_counters(self, app):
+        """Test seeding keeps task_stats and the search index consistent."""
+        with app.app_context():
+            report = SeedService.seed(5, 300, 'hash', seed=3, base_date=BASE_DATE, chunk_size=64,
+                                      description_length=(0, 0))
+
+            assert report == {'users': 5, 'tasks': 300}
+            assert User.query.filter(User.email.like('seed3-%')).count() == 5
+            assert Task.query.count() == 300
+            assert TaskStatsService.verify() == []
+
+            admin = User.query.filter_by(role='admin').first()
+            matches = TaskService.get_user_tasks(admin, {'search': 'informe'})
+            assert matches and all('informe' in task.title for task in matches)
+
+            # Una tarea creada después sigue indexándose con el trigger restaurado
+            TaskService.create_task('Seeded later', None, 'low', None, admin.id, admin.id)
+            assert [t.title for t in TaskService.get_user_tasks(admin, {'search': 'later'})] == ['Seeded later']
+
+            with pytest.raises(ValueError):
+                SeedService.seed(1, 1, 'hash', seed=3)
+
+    def test_seed_command_separate_database(self, app, runner, tmp_path):
+        """Test the CLI can fill a separate SQLite file."""
+        path = tmp_path / 'seed.db'
+        result = runner.invoke(args=['seed', '--users', '3', '--tasks', '40', '--seed', '1',
+                                     '--database', str(path)])
+        assert result.exit_code == 0, result.output
+        assert 'Generados 3 usuarios y 40 tareas' in result.output
+
+        with sqlite3.connect(path) as connection:
+            assert connection.execute('SELECT COUNT(*) FROM tasks').fetchone()[0] == 40
+        with app.app_context():
+            assert Task.query.count() == 0
+
+        result = runner.invoke(args=['seed', '--priority-mix', 'urgent=1'])
+        assert result.exit_code != 0
@@ -0,0 +1,65 @@
+import logging
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import text
+from app.services.task_service import TaskService
+from app.sql_monitor import QueryBudgetExceeded, code_name, format_parameters, query_budget
+from app import db
+
+
+class TestSqlMonitor:
+    """Test cases for the SQL instrumentation hooks."""
+
+    def test_slow_query_logged_with_caller(self, app, regular_user, sample_task, caplog):
+        """Test slow statements are logged with parameters and the service method."""
+        app.config['SQL_SLOW_QUERY_MS'] = 0
+        with caplog.at_level(logging.WARNING, logger=app.logger.name):
+            TaskService.get_task_by_id(sample_task.id, regular_user)
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert any('Consulta lenta' in message and 'TaskService.get_task_by_id' in message
+                   and str(sample_task.id) in message for message in messages)
+
+    def test_code_name_without_co_qualname(self):
+        """Test callers are qualified on Pythons whose code objects lack co_qualname."""
+        code = SimpleNamespace(co_name='get_task_by_id')
+        service = type('TaskService', (), {'get_task_by_id': staticmethod(SimpleNamespace(__code__=code))})
+        frame = SimpleNamespace(f_code=code, f_locals={}, f_globals={'TaskService': service, 'db': object()})
+        assert code_name(frame) == 'TaskService.get_task_by_id'
+
+        method = SimpleNamespace(f_code=SimpleNamespace(co_name='render'), f_locals={'self': 'x'}, f_globals={})
+        assert code_name(method) == 'str.render'
+        helper = SimpleNamespace(f_code=SimpleNamespace(co_name='helper'), f_locals={}, f_globals={})
+        assert code_name(helper) == 'helper'
+
+    def test_sensitive_parameters_not_logged(self):
+        """Test statements touching password hashes hide their parameters."""
+        assert format_parameters('UPDATE users SET password_hash=?', ('pbkdf2:...',), False) == '<omitidos>'
+        assert format_parameters('SELECT 1', [(1,), (2,), (3,), (4,)], True).endswith('(4 filas)')
+
+    def test_query_budget_enforced(self, app, client):
+        """Test a view over its declared budget fails listing the statements."""
+        @query_budget(1)
+        def chatty():
+            for _ in range(3):
+                db.session.execute(text('SELECT 1'))
+            return 'ok'
+
+        app.add_url_rule('/chatty', 'chatty', chatty)
+        with pytest.raises(QueryBudgetExceeded) as error:
+            client.get('/chatty')
+        assert 'chatty ejecutó 3 sentencias SQL (presupuesto: 1)' in str(error.value)
+        assert 'test_sql_monitor.py' in str(error.value)
+
+    def test_query_budget_warns_when_not_enforced(self, app, client, caplog):
+        """Test the budget only logs a warning outside enforcing mode."""
+        @query_budget(0)
+        def one_query():
+            db.session.execute(text('SELECT 1'))
+            return 'ok'
+
+        app.add_url_rule('/one-query', 'one_query', one_query)
+        app.config['SQL_QUERY_BUDGET_ENFORCE'] = False
+        with caplog.at_level(logging.WARNING, logger=app.logger.name):
+            assert client.get('/one-query').status_code == 200
+        assert any('presupuesto: 0' in record.getMessage() for record in caplog.records)
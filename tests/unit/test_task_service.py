@@ -1,9 +1,21 @@
 import pytest
 from datetime import date, datetime, timedelta
+from sqlalchemy import event
 from app.services.task_service import TaskService
+from app.services.task_stats_service import TaskStatsService
 from app.models import Task, User
+from app.read_models import TaskRow
 from app import db
 
+def explain_query_plan(query):
+    """Devuelve las líneas de EXPLAIN QUERY PLAN de una consulta ORM"""
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with db.engine.connect() as connection:
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), params)
+        return [row[3] for row in rows]
+
+
 class TestTaskService:
     """Test cases for TaskService."""
 
@@ -102,6 +114,46 @@ class TestTaskService:
             assert message == "Tarea marcada como pending"
             assert sample_task.status == 'pending'
 
+    def test_toggle_task_status_by_id_single_statement(self, app, sample_task, regular_user):
+        """Test the fast toggle flips the status with one UPDATE and keeps counters."""
+        with app.app_context():
+            task_id = sample_task.id
+            db.session.expunge_all()
+            statements = []
+
+            def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            try:
+                new_status, error = TaskService.toggle_task_status_by_id(task_id, regular_user)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+            assert (new_status, error) == ('done', None)
+            task_statements = [sql for sql in statements if 'task_stats' not in sql]
+            assert len(task_statements) == 1
+            assert task_statements[0].startswith('UPDATE tasks')
+            assert 'RETURNING' in task_statements[0]
+
+            assert db.session.get(Task, task_id).status == 'done'
+            assert TaskService.toggle_task_status_by_id(task_id, regular_user) == ('pending', None)
+            assert TaskStatsService.verify() == []
+
+    def test_toggle_task_status_by_id_authorization(self, app, sample_task, second_user, admin_user):
+        """Test the fast toggle only matches tasks the user can access."""
+        with app.app_context():
+            assert TaskService.toggle_task_status_by_id(sample_task.id, second_user) == (None, None)
+            assert TaskService.toggle_task_status_by_id(9999, admin_user) == (None, None)
+            assert TaskService.toggle_task_status_by_id(sample_task.id, admin_user) == ('done', None)
+
+    def test_toggle_task_status_by_id_without_returning(self, app, sample_task, regular_user, monkeypatch):
+        """Test the fallback for engines without UPDATE ... RETURNING."""
+        with app.app_context():
+            monkeypatch.setattr(db.engine.dialect, 'update_returning', False)
+            assert TaskService.toggle_task_status_by_id(sample_task.id, regular_user) == ('done', None)
+            assert TaskStatsService.verify() == []
+
     def test_delete_task_success(self, app, sample_task):
         """Test successful task deletion."""
         with app.app_context():
@@ -226,6 +278,157 @@ class TestTaskService:
             assert len(search_tasks) == 1
             assert search_tasks[0].title == 'Search Test Task'
 
+    def test_paginate_user_tasks_walks_forward_and_back(self, app, regular_user):
+        """Test keyset pagination visits every task once in both directions."""
+        with app.app_context():
+            same_time = datetime(2024, 1, 1, 12, 0, 0)
+            tasks = [
+                Task(
+                    title=f'Paged Task {i}',
+                    created_by=regular_user.id,
+                    assigned_to=regular_user.id,
+                    priority='medium',
+                    status='pending',
+                    # Varias tareas comparten created_at para probar el desempate por id
+                    created_at=same_time if i < 3 else same_time + timedelta(minutes=i)
+                )
+                for i in range(7)
+            ]
+            db.session.add_all(tasks)
+            db.session.commit()
+
+            expected = [t.id for t in sorted(tasks, key=lambda t: (t.created_at, t.id), reverse=True)]
+
+            seen = []
+            pages = []
+            cursor = None
+            while True:
+                page = TaskService.paginate_user_tasks(regular_user, cursor=cursor, per_page=3)
+                pages.append(page)
+                seen.extend(task.id for task in page['items'])
+                if not page['next_cursor']:
+                    break
+                cursor = page['next_cursor']
+
+            assert seen == expected
+            assert [len(p['items']) for p in pages] == [3, 3, 1]
+            assert pages[0]['prev_cursor'] is None
+
+            # Volver hacia atrás desde la última página
+            previous = TaskService.paginate_user_tasks(
+                regular_user, cursor=pages[-1]['prev_cursor'], per_page=3
+            )
+            assert [t.id for t in previous['items']] == expected[3:6]
+            assert previous['next_cursor'] is not None
+            assert previous['prev_cursor'] is not None
+
+            first = TaskService.paginate_user_tasks(
+                regular_user, cursor=previous['prev_cursor'], per_page=3
+            )
+            assert [t.id for t in first['items']] == expected[:3]
+            assert first['prev_cursor'] is None
+
+    def test_paginate_user_tasks_invalid_cursor(self, app, regular_user, sample_task):
+        """Test an invalid cursor falls back to the first page."""
+        with app.app_context():
+            page = TaskService.paginate_user_tasks(regular_user, cursor='not-a-cursor', per_page=5)
+            assert [t.id for t in page['items']] == [sample_task.id]
+            assert page['next_cursor'] is None
+            assert page['prev_cursor'] is None
+
+    def test_user_tasks_query_plan_uses_indexes(self, app, regular_user):
+        """Test the authorization filter is resolved with index searches, not scans."""
+        with app.app_context():
+            query = TaskService._build_user_tasks_query(regular_user, {'status': 'pending'})
+            plan = explain_query_plan(query.order_by(Task.created_at.desc(), Task.id.desc()))
+
+            assert not any(line.startswith('SCAN tasks') for line in plan)
+            assert any('idx_created_by_status_created (created_by=? AND status=?)' in line for line in plan)
+            assert any('idx_assigned_status (assigned_to=? AND status=?)' in line for line in plan)
+
+            plan = explain_query_plan(TaskService._build_user_tasks_query(regular_user))
+            assert not any(line.startswith('SCAN tasks') for line in plan)
+            assert any('idx_created_by_status_created (created_by=?)' in line for line in plan)
+
+    def test_user_tasks_union_deduplicates(self, app, regular_user):
+        """Test a task both created by and assigned to the user is returned once."""
+        with app.app_context():
+            db.session.add(Task(title='Own task', created_by=regular_user.id,
+                                assigned_to=regular_user.id, priority='low', status='pending'))
+            db.session.commit()
+
+            tasks = TaskService.get_user_tasks(regular_user)
+            assert [t.title for t in tasks] == ['Own task']
+
+    def test_paginate_defers_description(self, app, regular_user):
+        """Test list pages carry a SQL-side preview instead of the full description."""
+        with app.app_context():
+            long_text = 'x' * 99 + 'ñ' + 'y' * 5000
+            db.session.add_all([
+                Task(title='Long', description=long_text, created_by=regular_user.id,
+                     assigned_to=regular_user.id),
+                Task(title='Short', description='short text', created_by=regular_user.id,
+                     assigned_to=regular_user.id),
+            ])
+            db.session.commit()
+            db.session.expunge_all()
+            statements = []
+
+            def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            try:
+                items = TaskService.paginate_user_tasks(regular_user)['items']
+                ranked = TaskService.paginate_user_tasks(regular_user, {'search': 'Long'})['items']
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+            assert all('tasks.description AS' not in sql for sql in statements)
+            previews = {t.title: (t.description_preview, t.description_truncated) for t in items}
+            assert previews == {'Long': ('x' * 99 + 'ñ', True), 'Short': ('short text', False)}
+            assert [(t.title, t.description_truncated) for t in ranked] == [('Long', True)]
+            assert ranked[0].search_rank is not None
+
+            # La descripción completa se sigue pudiendo cargar bajo demanda
+            long_task = next(t for t in items if t.title == 'Long')
+            assert long_task.description == long_text
+
+    def test_read_only_tasks_are_slotted_rows(self, app, regular_user, admin_user):
+        """Test read-only listings return frozen TaskRow objects built from columns."""
+        with app.app_context():
+            today = date.today()
+            db.session.add_all([
+                Task(title='Late', description='report', due_date=today - timedelta(days=1),
+                     created_by=regular_user.id, assigned_to=admin_user.id),
+                Task(title='Later', due_date=today + timedelta(days=1),
+                     created_by=regular_user.id, assigned_to=regular_user.id),
+            ])
+            db.session.commit()
+            db.session.expunge_all()
+
+            items = TaskService.paginate_user_tasks(regular_user, read_only=True, today=today)['items']
+            tasks = {t.title: t for t in items}
+
+            assert all(isinstance(t, TaskRow) for t in items)
+            assert not hasattr(items[0], '__dict__')
+            with pytest.raises(AttributeError):
+                items[0].title = 'changed'
+            assert len(db.session.identity_map) == 0
+
+            assert tasks['Late'].is_overdue() and not tasks['Later'].is_overdue()
+            assert tasks['Late'].assignee.name == admin_user.name
+            assert tasks['Late'].assigned_to == admin_user.id
+            assert tasks['Late'].description_preview == 'report'
+
+            # El vencimiento se calcula respecto a la fecha indicada
+            tomorrow = today + timedelta(days=2)
+            later = TaskService.get_user_tasks(regular_user, {'search': 'Later'}, read_only=True,
+                                               today=tomorrow)
+            assert [t.title for t in later] == ['Later']
+            assert later[0].is_overdue()
+            assert later[0].search_rank is not None
+
     def test_get_task_by_id_authorized(self, app, regular_user, sample_task):
         """Test getting task by ID with proper authorization."""
         with app.app_context():
@@ -246,6 +449,65 @@ class TestTaskService:
             assert task is not None
             assert task.id == sample_task.id
 
+    def test_get_task_by_id_single_query(self, app, regular_user, second_user, sample_task):
+        """Test authorization and eager loading happen in one SELECT."""
+        with app.app_context():
+            db.session.expunge_all()
+            statements = []
+
+            def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            try:
+                assert TaskService.get_task_by_id(sample_task.id, second_user) is None
+                assert TaskService.get_task_by_id(9999, regular_user) is None
+                task = TaskService.get_task_by_id(sample_task.id, regular_user, eager=True)
+                assert (task.creator.name, task.assignee.name) == ('User Test', 'User Test')
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+            assert len(statements) == 3
+            assert 'created_by' in statements[0] and 'assigned_to' in statements[0]
+
+    def test_get_task_by_id_request_cache(self, app, regular_user, sample_task):
+        """Test repeated lookups in one request do not query again."""
+        with app.test_request_context():
+            task = TaskService.get_task_by_id(sample_task.id, regular_user)
+            statements = []
+
+            def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            try:
+                assert TaskService.get_task_by_id(sample_task.id, regular_user) is task
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+            assert statements == []
+
+            TaskService.delete_task(task)
+            assert TaskService.get_task_by_id(sample_task.id, regular_user) is None
+
+    def test_get_task_by_id_request_cache_respects_eager(self, app, regular_user, sample_task):
+        """Test an eager lookup after a lazy one loads the relations, and not the other way round."""
+        with app.test_request_context():
+            db.session.expunge_all()
+            TaskService.get_task_by_id(sample_task.id, regular_user)
+            statements = []
+
+            def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            try:
+                task = TaskService.get_task_by_id(sample_task.id, regular_user, eager=True)
+                assert (task.creator.name, task.assignee.name) == ('User Test', 'User Test')
+                assert TaskService.get_task_by_id(sample_task.id, regular_user) is task
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+            assert len(statements) == 1 and 'JOIN' in statements[0]
+
     def test_get_task_statistics(self, app, regular_user):
         """Test getting task statistics."""
         with app.app_context():
@@ -282,6 +544,50 @@ class TestTaskService:
             assert stats['pending'] == 2
             assert stats['completed'] == 1
             assert stats['overdue'] == 1
+            assert stats['by_priority']['medium'] == {
+                'total': 3, 'pending': 2, 'completed': 1, 'overdue': 1
+            }
+            assert stats['by_priority']['high']['total'] == 0
+
+    def test_get_task_statistics_reads_counters(self, app, regular_user, second_user):
+        """Test statistics read the counter table plus one overdue query."""
+        with app.app_context():
+            db.session.add_all([
+                Task(title='High overdue', created_by=regular_user.id, assigned_to=regular_user.id,
+                     priority='high', status='pending', due_date=date.today() - timedelta(days=2)),
+                Task(title='High done', created_by=second_user.id, assigned_to=regular_user.id,
+                     priority='high', status='done', due_date=date.today() - timedelta(days=2)),
+                Task(title='Low pending', created_by=regular_user.id, assigned_to=second_user.id,
+                     priority='low', status='pending'),
+                Task(title='Not visible', created_by=second_user.id, assigned_to=second_user.id,
+                     priority='low', status='pending'),
+            ])
+            db.session.commit()
+
+            statements = []
+
+            def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            try:
+                stats = TaskService.get_task_statistics(regular_user)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+            assert len(statements) == 2
+            assert any('task_stats' in statement for statement in statements)
+            assert stats['total'] == 3
+            assert stats['pending'] == 2
+            assert stats['completed'] == 1
+            assert stats['overdue'] == 1
+            assert stats['by_priority']['high'] == {
+                'total': 2, 'pending': 1, 'completed': 1, 'overdue': 1
+            }
+            assert stats['by_priority']['low'] == {
+                'total': 1, 'pending': 1, 'completed': 0, 'overdue': 0
+            }
+            assert stats['by_priority']['medium']['total'] == 0
 
     def test_validate_task_data_valid(self, app):
         """Test task data validation with valid data."""
@@ -0,0 +1,96 @@
+import pytest
+from datetime import date, timedelta
+from app.services.task_service import TaskService
+from app.services.task_stats_service import TaskStatsService
+from app.models import Task, TaskStat
+from app import db
+
+
+def stored_counters(user_id):
+    """Contadores no nulos almacenados para un usuario"""
+    return {
+        (stat.status, stat.priority): stat.count
+        for stat in TaskStat.query.filter_by(user_id=user_id)
+        if stat.count
+    }
+
+
+class TestTaskStatsService:
+    """Test cases for the task_stats counter table."""
+
+    def test_counters_follow_service_writes(self, app, regular_user, second_user):
+        """Test create, update, toggle and delete keep counters in sync."""
+        with app.app_context():
+            task, error = TaskService.create_task(
+                title='Counted', description=None, priority='high',
+                due_date=None, created_by=regular_user.id, assigned_to=regular_user.id
+            )
+            assert error is None
+            assert stored_counters(regular_user.id) == {('pending', 'high'): 1}
+            assert stored_counters(TaskStat.GLOBAL_SCOPE) == {('pending', 'high'): 1}
+
+            TaskService.update_task(task, 'Counted', None, 'low', None, assigned_to=second_user.id)
+            assert stored_counters(regular_user.id) == {('pending', 'low'): 1}
+            assert stored_counters(second_user.id) == {('pending', 'low'): 1}
+
+            TaskService.toggle_task_status(task)
+            assert stored_counters(regular_user.id) == {('done', 'low'): 1}
+            assert stored_counters(second_user.id) == {('done', 'low'): 1}
+            assert stored_counters(TaskStat.GLOBAL_SCOPE) == {('done', 'low'): 1}
+
+            TaskService.delete_task(task)
+            assert stored_counters(regular_user.id) == {}
+            assert stored_counters(second_user.id) == {}
+            assert stored_counters(TaskStat.GLOBAL_SCOPE) == {}
+            assert TaskStatsService.verify() == []
+
+    def test_self_assigned_task_counted_once(self, app, regular_user):
+        """Test a task created by and assigned to the same user counts once."""
+        with app.app_context():
+            db.session.add(Task(title='Mine', created_by=regular_user.id, assigned_to=regular_user.id))
+            db.session.commit()
+
+            assert stored_counters(regular_user.id) == {('pending', 'medium'): 1}
+
+    def test_verify_and_rebuild(self, app, regular_user, second_user):
+        """Test verify detects drift and rebuild repairs it."""
+        with app.app_context():
+            db.session.add_all([
+                Task(title='A', created_by=regular_user.id, assigned_to=second_user.id,
+                     priority='high', status='pending'),
+                Task(title='B', created_by=second_user.id, assigned_to=second_user.id,
+                     priority='low', status='done'),
+            ])
+            db.session.commit()
+            assert TaskStatsService.verify() == []
+
+            # Simular contadores desincronizados (por ejemplo, SQL manual)
+            db.session.execute(TaskStat.__table__.delete())
+            db.session.commit()
+            assert len(TaskStatsService.verify()) > 0
+
+            TaskStatsService.rebuild()
+            assert TaskStatsService.verify() == []
+            assert stored_counters(second_user.id) == {('pending', 'high'): 1, ('done', 'low'): 1}
+            assert stored_counters(TaskStat.GLOBAL_SCOPE) == {('pending', 'high'): 1, ('done', 'low'): 1}
+
+    def test_rebuild_command(self, app, runner, regular_user):
+        """Test the flask CLI command verifies and rebuilds counters."""
+        with app.app_context():
+            db.session.add(Task(title='CLI', created_by=regular_user.id, assigned_to=regular_user.id,
+                                due_date=date.today() + timedelta(days=1)))
+            db.session.commit()
+            db.session.execute(TaskStat.__table__.delete())
+            db.session.commit()
+
+        result = runner.invoke(args=['rebuild-task-stats', '--verify'])
+        assert result.exit_code != 0
+        assert 'no coinciden' in result.output
+
+        result = runner.invoke(args=['rebuild-task-stats'])
+        assert result.exit_code == 0
+        assert 'Contadores reconstruidos' in result.output
+
+        result = runner.invoke(args=['rebuild-task-stats', '--verify'])
+        assert result.exit_code == 0
+        assert 'Contadores correctos' in result.output
@@ -0,0 +1,105 @@
+from sqlalchemy import event
+from app.services.user_service import UserService
+from app.models import User
+from app import db
+from tests.unit.test_task_service import explain_query_plan
+
+
+def add_user(name, email):
+    user = User(name=name, email=email, password_hash='x', role='user')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+class TestUserService:
+    """Test cases for UserService."""
+
+    def test_assignee_choices_sorted_by_name(self, app, regular_user, admin_user):
+        """Test choices are (id, name) pairs ordered by name."""
+        with app.app_context():
+            choices = UserService.get_assignee_choices()
+            names = [name for user_id, name in choices]
+            assert names == sorted(names, key=str.lower)
+            assert (admin_user.id, 'Admin Test') in choices
+            assert (regular_user.id, 'User Test') in choices
+
+    def test_assignee_choices_are_cached(self, app, regular_user):
+        """Test a second read does not hit the database."""
+        with app.app_context():
+            UserService.get_assignee_choices()
+            statements = []
+
+            def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            try:
+                UserService.get_assignee_choices()
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+            assert statements == []
+
+    def test_assignee_choices_invalidated_on_changes(self, app, regular_user):
+        """Test creating or renaming a user bumps the cached list."""
+        with app.app_context():
+            count = len(UserService.get_assignee_choices())
+
+            user = add_user('Zoe', 'zoe@test.com')
+            assert len(UserService.get_assignee_choices()) == count + 1
+            assert UserService.get_assignee_choices()[-1] == (user.id, 'Zoe')
+
+            user.name = 'Aaron'
+            db.session.commit()
+            assert UserService.get_assignee_choices()[0] == (user.id, 'Aaron')
+
+            version = UserService.get_choices_cache().version
+            user.email = 'aaron@test.com'
+            db.session.commit()
+            assert UserService.get_choices_cache().version == version
+
+    def test_users_version_tracks_name_changes(self, app, regular_user):
+        """Test the shared users version moves on inserts, renames and deletes only."""
+        def users_version():
+            return db.session.query(UserService.users_version()).scalar()
+
+        with app.app_context():
+            version = users_version()
+
+            user = add_user('Zoe', 'zoe@test.com')
+            assert users_version() == version + 1
+
+            user.email = 'zoe2@test.com'
+            db.session.commit()
+            assert users_version() == version + 1
+
+            user.name = 'Zoe Renamed'
+            db.session.commit()
+            assert users_version() == version + 2
+
+            db.session.delete(user)
+            db.session.commit()
+            assert users_version() == version + 3
+
+    def test_search_assignees_by_prefix(self, app, regular_user):
+        """Test prefix search is case-insensitive and escapes wildcards."""
+        with app.app_context():
+            add_user('Alberto', 'alberto@test.com')
+            add_user('alicia', 'alicia@test.com')
+            add_user('100% real', 'real@test.com')
+
+            assert [u['name'] for u in UserService.search_assignees('al')] == ['Alberto', 'alicia']
+            assert [u['name'] for u in UserService.search_assignees('ALI')] == ['alicia']
+            assert [u['name'] for u in UserService.search_assignees('100%')] == ['100% real']
+            assert UserService.search_assignees('%') == []
+            assert len(UserService.search_assignees('', limit=2)) == 2
+
+    def test_search_assignees_uses_name_index(self, app):
+        """Test the prefix search is a range scan on idx_users_name."""
+        with app.app_context():
+            query = db.session.query(User.id, User.name).filter(
+                User.name.like('al%', escape='\\')
+            ).order_by(User.name.collate('NOCASE'), User.id)
+            plan = ' '.join(explain_query_plan(query))
+            assert 'idx_users_name' in plan
+            assert 'SCAN users' not in plan